@@ -0,0 +1,84 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.database import get_db
+from app.services import sharding
+from app.services.profiler import profile_store
+from app.services.rate_limit import rate_limiter
+
+router = APIRouter()
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """
+    Exigir o header X-Admin-Token igual a ADMIN_TOKEN
+    (sem ADMIN_TOKEN configurado, as rotas de admin ficam fechadas)
+    """
+    if not settings.ADMIN_TOKEN or not x_admin_token or not hmac.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso restrito"
+        )
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    """
+    Listar perfis salvos pelo profiler, do mais recente para o mais antigo
+    """
+    profiles = profile_store.list()
+    return {
+        "enabled": settings.PROFILING_ENABLED,
+        "total": len(profiles),
+        "profiles": profiles
+    }
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_admin)])
+def get_profile(name: str):
+    """
+    Baixar um perfil (formato folded: abrir no speedscope ou flamegraph.pl)
+    """
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Perfil não encontrado"
+        )
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+@router.get("/nodes", dependencies=[Depends(require_admin)])
+def list_nodes(db: Session = Depends(get_db)):
+    """
+    Instâncias vivas do gerador distribuído e os pares de cada uma
+    """
+    nodes = sharding.alive_nodes(db)
+    return {
+        "total": len(nodes),
+        "ttl_seconds": settings.NODE_TTL_SECONDS,
+        "nodes": [
+            {
+                "node_id": node.node_id,
+                "hostname": node.hostname,
+                "pid": node.pid,
+                "iniciado_em": node.iniciado_em,
+                "heartbeat_em": node.heartbeat_em,
+                "jobs": node.jobs,
+                "ultimo_ciclo_ms": node.ultimo_ciclo_ms
+            }
+            for node in nodes
+        ]
+    }
+
+@router.get("/rate-limit", dependencies=[Depends(require_admin)])
+def rate_limit_metrics():
+    """
+    Métricas do limite de requisições: aceitas/recusadas e custo por rota,
+    clientes mais recusados
+    """
+    return {
+        "enabled": settings.RATE_LIMIT_ENABLED,
+        **rate_limiter.metrics()
+    }
\ No newline at end of file
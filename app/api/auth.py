@@ -1,16 +1,35 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, Token, UserResponse
-from app.services.auth_service import verify_password, get_password_hash, create_access_token
+from app.services.auth_service import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+    verify_token,
+    get_user_cached,
+    invalidate_user
+)
 
 router = APIRouter()
 
+def _get_user_by_email(db: Session, email: str):
+    return db.query(User).filter(User.email == email).first()
+
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+# Rotas async: o Argon2 roda no pool de processos e o banco na threadpool,
+# então um pico de logins não prende as threads da API esperando hash
 @router.post("/register", response_model=Token)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     # Verificar se email já existe
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await run_in_threadpool(_get_user_by_email, db, user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -18,15 +37,13 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Criar novo usuário
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     new_user = User(
         email=user.email,
         hashed_password=hashed_password
     )
     
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await run_in_threadpool(_save_user, db, new_user)
     
     # Criar token
     access_token = create_access_token(data={"sub": str(new_user.id), "email": new_user.email})
@@ -38,16 +55,26 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=Token)
-def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: Session = Depends(get_db)):
     # Buscar usuário
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await run_in_threadpool(_get_user_by_email, db, user.email)
     
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    valid, new_hash = False, None
+    if db_user:
+        valid, new_hash = await verify_password_async(user.password, db_user.hashed_password)
+    
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos"
         )
     
+    # Parâmetros do Argon2 mudaram: salvar hash novo
+    if new_hash:
+        db_user.hashed_password = new_hash
+        db_user = await run_in_threadpool(_save_user, db, db_user)
+        invalidate_user(db_user.id)
+    
     # Criar token
     access_token = create_access_token(data={"sub": str(db_user.id), "email": db_user.email})
     
@@ -59,8 +86,6 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user(token: str, db: Session = Depends(get_db)):
-    from app.services.auth_service import verify_token
-    
     payload = verify_token(token)
     if not payload:
         raise HTTPException(
@@ -69,7 +94,7 @@ def get_current_user(token: str, db: Session = Depends(get_db)):
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = get_user_cached(db, int(user_id))
     
     if not user:
         raise HTTPException(
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, HTTPException, status
+from datetime import datetime
+from typing import Optional
+from app.config import settings
+from app.services.charts import build_chart, to_ms, ChartError, ChartNotFound
+from app.services.downsampling import METHOD_LTTB
+
+router = APIRouter()
+
+@router.get("/")
+def get_chart(
+    moeda: str,
+    timeframe: str = "1h",
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None,
+    pontos: int = settings.CHART_DEFAULT_POINTS,
+    indicadores: Optional[str] = None,
+    metodo: str = METHOD_LTTB
+):
+    """
+    Candles (OHLCV) e séries de indicadores para gráfico
+    
+    Query params:
+    - moeda: Par como gravado pelo backfill (ex: BTC/USDT:USDT)
+    - desde / ate: Intervalo (ISO 8601; ate exclusivo). Padrão: tudo
+    - pontos: Máximo de pontos por série (intervalos longos são reduzidos)
+    - indicadores: Lista separada por vírgula (ex: rsi,ema_20). Padrão: todos
+    - metodo: Redução das linhas de indicador: lttb ou minmax
+    
+    Lê do arquivo local de candles (python -m app.tasks.backfill). Os
+    candles reduzidos são agregados em OHLC (máxima/mínima preservadas).
+    """
+    names = [name.strip() for name in indicadores.split(",") if name.strip()] if indicadores is not None else None
+    try:
+        return build_chart(
+            moeda,
+            timeframe,
+            start=to_ms(desde),
+            end=to_ms(ate),
+            points=pontos,
+            indicators=names,
+            method=metodo.lower()
+        )
+    except ChartNotFound as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except ChartError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
\ No newline at end of file
@@ -0,0 +1,33 @@
+from typing import Dict, Optional
+from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.auth_service import verify_token, get_user_cached
+
+def get_current_user(
+    token: Optional[str] = None,
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Dict:
+    """
+    Usuário autenticado pelo JWT (query param token, como em /me,
+    ou header Authorization: Bearer)
+    """
+    if not token and authorization and authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    
+    payload = verify_token(token) if token else None
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido"
+        )
+    
+    user = get_user_cached(db, int(payload.get("sub")))
+    if not user or not user["is_active"]:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuário não encontrado"
+        )
+    
+    return user
\ No newline at end of file
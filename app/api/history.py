@@ -1,6 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime, timedelta
+from typing import Dict, Optional
 import random
+from app.api.deps import get_current_user
+from app.database import engine
+from app.services.signal_export import stream_export, ExportError, MEDIA_TYPES, FORMAT_CSV
 
 router = APIRouter()
 
@@ -62,4 +67,50 @@ def get_history(
     return {
         "total": len(history),
         "history": history
-    }
\ No newline at end of file
+    }
+
+@router.get("/export")
+def export_history(
+    formato: str = FORMAT_CSV,
+    moeda: Optional[str] = None,
+    tipo: Optional[str] = None,
+    timeframe: Optional[str] = None,
+    status_sinal: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None,
+    user: Dict = Depends(get_current_user)
+):
+    """
+    Exportar o histórico completo de sinais (streaming)
+    
+    Query params:
+    - formato: csv ou parquet (parquet requer pyarrow no servidor)
+    - moeda, tipo, timeframe: Filtros
+    - status_sinal: ATIVO, TP1, TP2, TP3, SL ou EXPIRADO
+    - desde / ate: Intervalo em criado_em (ISO 8601; ate exclusivo)
+    
+    As linhas são lidas e codificadas em lotes enquanto a resposta é
+    enviada, sem montar a lista inteira em memória.
+    """
+    formato = formato.lower()
+    try:
+        body = stream_export(engine, formato, {
+            "moeda": moeda,
+            "tipo": tipo,
+            "timeframe": timeframe,
+            "status": status_sinal,
+            "desde": desde,
+            "ate": ate
+        })
+    except ExportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    filename = f"signals-{datetime.now():%Y%m%d-%H%M%S}.{formato}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[formato],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
\ No newline at end of file
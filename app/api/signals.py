@@ -1,16 +1,95 @@
-from fastapi import APIRouter, Query
+import logging
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.config import settings
+from app.database import get_db, SessionLocal
 from app.services.binance_service import binance_service
 from app.services.signal_generator import signal_generator
+from app.services.screener import screener
+from app.services.request_scheduler import PRIORITY_LIVE
+from app.services.resilience import StaleWhileRevalidate, CircuitOpenError
+from app.services.tracing import tracer
+from app.services import signal_store
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Geração de sinais por timeframe: fresca por SIGNALS_REFRESH_SECONDS;
+# depois disso a rota responde na hora com os sinais salvos (marcados
+# como velhos) e a geração roda em segundo plano
+signal_refresh = StaleWhileRevalidate(
+    fresh_seconds=settings.SIGNALS_REFRESH_SECONDS,
+    max_stale_seconds=settings.SIGNALS_MAX_STALE_SECONDS,
+    retry_seconds=settings.SIGNALS_RETRY_SECONDS
+)
+
+# Timeframes aceitos na rota: cada um vira uma chave do signal_refresh e
+# uma geração própria, então nada de valores livres da query string
+ALLOWED_TIMEFRAMES = {"1h", "4h", "1d"} | {
+    tf.strip() for tf in settings.GENERATOR_TIMEFRAMES.split(",") if tf.strip()
+}
+
+def refresh_signals(timeframe: str) -> int:
+    """
+    Rodar o pipeline (screener -> geração -> gravação) para um timeframe
+    
+    Com a exchange degradada (circuito aberto) não grava nada: os
+    candles seriam os últimos bons, não os atuais.
+    
+    Returns:
+        Sinais gerados
+    """
+    with tracer.span("signals.refresh", root=True, timeframe=timeframe):
+        return _refresh_signals(timeframe)
+
+def _refresh_signals(timeframe: str) -> int:
+    if binance_service.degraded():
+        raise CircuitOpenError("Exchange indisponível")
+    
+    # Pré-filtro sobre todos os pares USDT (um único fetch_tickers)
+    tickers = binance_service.get_tickers(priority=PRIORITY_LIVE)
+    candidates = screener.screen(tickers)
+    
+    # Se o snapshot falhar, cair para a lista de maior volume
+    if not candidates:
+        candidates = binance_service.get_top_volume_pairs(limit=15, priority=PRIORITY_LIVE)
+    
+    # Nem isso: falhar para o signal_refresh servir a última geração boa
+    if not candidates:
+        raise CircuitOpenError("Sem pares candidatos (tickers indisponíveis)")
+    
+    # Gerar sinais só para os candidatos
+    signals = signal_generator.generate_signals_batch(candidates, timeframe)
+    
+    if binance_service.degraded():
+        raise CircuitOpenError("Exchange ficou indisponível durante a geração")
+    
+    # Salvar (sinais ativos equivalentes mantêm o mesmo ID)
+    db = SessionLocal()
+    try:
+        signal_store.save_signals(db, signals)
+    finally:
+        db.close()
+    
+    return len(signals)
 
 @router.get("/")
 def get_signals(
     moeda: Optional[str] = None,
     tipo: Optional[str] = None,
     probabilidade_min: Optional[int] = 0,
-    timeframe: str = "1h"
+    timeframe: str = "1h",
+    rsi_min: Optional[float] = None,
+    rsi_max: Optional[float] = None,
+    rsi_status: Optional[str] = None,
+    macd_status: Optional[str] = None,
+    macd_histograma_min: Optional[float] = None,
+    macd_histograma_max: Optional[float] = None,
+    tendencia: Optional[str] = None,
+    volume_status: Optional[str] = None,
+    db: Session = Depends(get_db)
 ):
     """
     Buscar sinais ativos
@@ -20,47 +99,76 @@ def get_signals(
     - tipo: Filtrar por tipo (LONG ou SHORT)
     - probabilidade_min: Probabilidade mínima (0-100)
     - timeframe: Timeframe (1h, 4h, 1d)
-    """
-    # Buscar top moedas
-    top_symbols = binance_service.get_top_volume_pairs(limit=15)
-    
-    # Gerar sinais
-    signals = signal_generator.generate_signals_batch(top_symbols, timeframe)
+    - rsi_min / rsi_max: Faixa do RSI (ex: rsi_max=30)
+    - rsi_status: SOBREVENDIDO, SOBRECOMPRADO ou NEUTRO
+    - macd_status: COMPRA, VENDA, ALTA, BAIXA ou NEUTRO
+    - macd_histograma_min / macd_histograma_max: Faixa do histograma do MACD
+    - tendencia: ALTA_FORTE, ALTA, NEUTRO, BAIXA ou BAIXA_FORTE
+    - volume_status: ALTO, NORMAL ou BAIXO
     
-    # Aplicar filtros
-    if moeda:
-        signals = [s for s in signals if s['moeda'] == moeda]
-    
-    if tipo:
-        signals = [s for s in signals if s['tipo'] == tipo.upper()]
+    Resposta inclui "stale" (sinais da última geração bem-sucedida
+    enquanto uma nova está pendente ou a exchange está fora do ar) e
+    "atualizado_em" (horário dessa geração).
+    """
+    if timeframe not in ALLOWED_TIMEFRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Timeframe inválido. Use: {', '.join(sorted(ALLOWED_TIMEFRAMES))}"
+        )
     
-    if probabilidade_min:
-        signals = [s for s in signals if s['probabilidade'] >= probabilidade_min]
+    try:
+        _, stale, updated_at = signal_refresh.get(timeframe, lambda: refresh_signals(timeframe))
+    except Exception as e:
+        # Nunca gerou para o timeframe e a exchange falhou: sinais já salvos
+        logger.warning("Erro ao gerar sinais %s: %s", timeframe, e)
+        stale, updated_at = True, None
     
-    # Ordenar por probabilidade (maior primeiro)
-    signals = sorted(signals, key=lambda x: x['probabilidade'], reverse=True)
+    # Sinais ativos com filtros, ordenados por probabilidade (maior primeiro)
+    signals = signal_store.list_active(
+        db,
+        moeda=moeda,
+        tipo=tipo,
+        probabilidade_min=probabilidade_min,
+        timeframe=timeframe,
+        rsi_min=rsi_min,
+        rsi_max=rsi_max,
+        rsi_status=rsi_status,
+        macd_status=macd_status,
+        macd_histograma_min=macd_histograma_min,
+        macd_histograma_max=macd_histograma_max,
+        tendencia=tendencia,
+        volume_status=volume_status
+    )
     
     return {
         "total": len(signals),
+        "stale": stale,
+        "atualizado_em": datetime.fromtimestamp(updated_at).isoformat() if updated_at else None,
         "signals": signals
     }
 
 @router.get("/{signal_id}")
-def get_signal_detail(signal_id: str):
+def get_signal_detail(signal_id: str, db: Session = Depends(get_db)):
     """
     Buscar detalhes de um sinal específico
     
-    Por enquanto, gera o sinal novamente
-    (no futuro, buscar do banco de dados)
+    Busca pela chave primária do sinal salvo (com cache em memória),
+    sem chamar a exchange. IDs antigos no formato "BTC-USDT-1h" devolvem
+    o sinal ativo mais recente da moeda/timeframe.
     """
-    # Extrair símbolo do ID (simplificado)
-    # Exemplo: signal_id = "BTC-USDT-1h"
+    if signal_id.isdigit():
+        signal = signal_store.get_signal(db, int(signal_id))
+        if signal:
+            return signal
+        return {"error": "Sinal não encontrado"}
+    
+    # Formato antigo: signal_id = "BTC-USDT-1h"
     parts = signal_id.split("-")
     if len(parts) >= 3:
         symbol = f"{parts[0]}/{parts[1]}"
         timeframe = parts[2]
         
-        signal = signal_generator.generate_signal(symbol, timeframe)
+        signal = signal_store.get_latest_signal(db, symbol, timeframe)
         
         if signal:
             return signal
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+from app.api.deps import get_current_user
+from app.config import settings
+from app.database import get_db
+from app.models.watchlist import Watchlist
+from app.schemas.watchlist import WatchlistCreate, WatchlistResponse
+from app.services import signal_store
+from app.services.watchlists import watchlist_index, entry_dict, list_entries, filter_signals
+
+router = APIRouter()
+
+@router.get("/", response_model=List[WatchlistResponse])
+def get_watchlist(user: Dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Itens da watchlist do usuário
+    """
+    return list_entries(db, user["id"])
+
+@router.post("/", response_model=WatchlistResponse)
+def add_watchlist_entry(
+    entry: WatchlistCreate,
+    user: Dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Adicionar item à watchlist
+    
+    Campos vazios valem para qualquer valor (ex: só moeda="BTC/USDT"
+    recebe todos os sinais de BTC). A moeda casa com ou sem o sufixo de
+    liquidação dos sinais de futuros ("BTC/USDT" = "BTC/USDT:USDT").
+    Sinais novos que casarem são enviados aos webhooks do usuário.
+    """
+    tipo = entry.tipo.upper() if entry.tipo else None
+    if tipo not in (None, "LONG", "SHORT"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tipo deve ser LONG ou SHORT"
+        )
+    if not 0 <= entry.probabilidade_min <= 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Probabilidade mínima deve estar entre 0 e 100"
+        )
+    
+    total = db.query(Watchlist).filter(Watchlist.user_id == user["id"]).count()
+    if total >= settings.WATCHLIST_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Limite de {settings.WATCHLIST_MAX_ENTRIES} itens na watchlist"
+        )
+    
+    row = Watchlist(
+        user_id=user["id"],
+        moeda=entry.moeda.upper() if entry.moeda else None,
+        timeframe=entry.timeframe,
+        tipo=tipo,
+        probabilidade_min=entry.probabilidade_min
+    )
+    db.add(row)
+    db.commit()
+    db.refresh(row)
+    
+    watchlist_index.add(entry_dict(row))
+    
+    return row
+
+@router.delete("/{entry_id}")
+def remove_watchlist_entry(entry_id: int, user: Dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Remover item da watchlist
+    """
+    row = db.query(Watchlist).filter(
+        Watchlist.id == entry_id,
+        Watchlist.user_id == user["id"]
+    ).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Item não encontrado"
+        )
+    
+    db.delete(row)
+    db.commit()
+    watchlist_index.remove(entry_id)
+    
+    return {"success": True}
+
+@router.get("/signals")
+def get_watchlist_signals(
+    timeframe: Optional[str] = None,
+    user: Dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Sinais ativos que casam com a watchlist do usuário
+    
+    Sem itens na watchlist, devolve todos os sinais ativos.
+    """
+    entries = list_entries(db, user["id"])
+    signals = signal_store.list_active(db, timeframe=timeframe)
+    if entries:
+        signals = filter_signals(entries, signals)
+    
+    return {
+        "total": len(signals),
+        "signals": signals
+    }
\ No newline at end of file
@@ -0,0 +1,126 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, List
+from app.api.deps import get_current_user
+from app.database import get_db
+from app.models.webhook import WebhookEndpoint, WebhookDelivery
+from app.schemas.webhook import WebhookCreate, WebhookResponse, DeliveryList
+from app.services.webhooks import TIPO_WEBHOOK, TIPO_TELEGRAM, invalidate_endpoints, check_public_url, UnsafeURLError
+
+router = APIRouter()
+
+TELEGRAM_URL = "https://api.telegram.org/bot{token}/sendMessage"
+MAX_CONCORRENCIA = 10
+
+def _response(endpoint: WebhookEndpoint) -> Dict:
+    data = WebhookResponse.model_validate(endpoint).model_dump()
+    # Não devolver o token do bot
+    if endpoint.tipo == TIPO_TELEGRAM:
+        data["url"] = TELEGRAM_URL.format(token="***")
+    return data
+
+def _get_endpoint(db: Session, endpoint_id: int, user: Dict) -> WebhookEndpoint:
+    endpoint = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.id == endpoint_id,
+        WebhookEndpoint.user_id == user["id"]
+    ).first()
+    if not endpoint:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook não encontrado"
+        )
+    return endpoint
+
+@router.post("/", response_model=WebhookResponse)
+def create_webhook(
+    webhook: WebhookCreate,
+    user: Dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Cadastrar destino para os sinais novos
+    
+    - webhook: POST JSON {"event": "signals.created", "signals": [...]}
+      na url, assinado em X-Signature (HMAC-SHA256) se houver secret;
+      a url precisa resolver só para endereços públicos
+    - telegram: mensagem via bot (telegram_bot_token + telegram_chat_id)
+    """
+    if webhook.tipo == TIPO_WEBHOOK:
+        try:
+            check_public_url(webhook.url or "")
+        except UnsafeURLError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        url, chat_id = webhook.url, None
+    elif webhook.tipo == TIPO_TELEGRAM:
+        if not webhook.telegram_bot_token or not webhook.telegram_chat_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe telegram_bot_token e telegram_chat_id"
+            )
+        url, chat_id = TELEGRAM_URL.format(token=webhook.telegram_bot_token), webhook.telegram_chat_id
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Tipo deve ser webhook ou telegram"
+        )
+    
+    endpoint = WebhookEndpoint(
+        user_id=user["id"],
+        tipo=webhook.tipo,
+        url=url,
+        chat_id=chat_id,
+        secret=webhook.secret,
+        max_concorrencia=max(1, min(webhook.max_concorrencia, MAX_CONCORRENCIA))
+    )
+    db.add(endpoint)
+    db.commit()
+    db.refresh(endpoint)
+    invalidate_endpoints()
+    
+    return _response(endpoint)
+
+@router.get("/", response_model=List[WebhookResponse])
+def list_webhooks(user: Dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Listar destinos do usuário
+    """
+    endpoints = db.query(WebhookEndpoint).filter(
+        WebhookEndpoint.user_id == user["id"],
+        WebhookEndpoint.is_active.is_(True)
+    ).order_by(WebhookEndpoint.id)
+    return [_response(e) for e in endpoints]
+
+@router.delete("/{endpoint_id}")
+def delete_webhook(endpoint_id: int, user: Dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Desativar destino (entregas pendentes são descartadas pelo worker)
+    """
+    endpoint = _get_endpoint(db, endpoint_id, user)
+    endpoint.is_active = False
+    db.commit()
+    invalidate_endpoints()
+    
+    return {"success": True}
+
+@router.get("/{endpoint_id}/deliveries", response_model=DeliveryList)
+def list_deliveries(
+    endpoint_id: int,
+    limit: int = 50,
+    user: Dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Entregas mais recentes de um destino (status, tentativas, último erro)
+    """
+    _get_endpoint(db, endpoint_id, user)
+    deliveries = db.query(WebhookDelivery).filter(
+        WebhookDelivery.endpoint_id == endpoint_id
+    ).order_by(WebhookDelivery.id.desc()).limit(min(limit, 500)).all()
+    
+    return {
+        "total": len(deliveries),
+        "deliveries": deliveries
+    }
\ No newline at end of file
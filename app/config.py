@@ -9,16 +9,153 @@ class Settings(BaseSettings):
     BINANCE_API_KEY: Optional[str] = None
     BINANCE_SECRET_KEY: Optional[str] = None
     
+    # Exchanges (separadas por vírgula; mais de uma ativa o fan-out)
+    EXCHANGES: str = "binance"
+    EXCHANGE_FANOUT_MODE: str = "first"  # "first" (primeira resposta) ou "merge" (ponderado por volume)
+    EXCHANGE_TIMEOUT_SECONDS: float = 10
+    EXCHANGE_UNHEALTHY_COOLDOWN: int = 30  # Segundos fora do fan-out após erros seguidos
+    
+    # Prazo por endpoint e disjuntor (falhar rápido com a exchange fora do ar)
+    EXCHANGE_TICKER_TIMEOUT_SECONDS: float = 3
+    EXCHANGE_TICKERS_TIMEOUT_SECONDS: float = 5
+    EXCHANGE_OHLCV_TIMEOUT_SECONDS: float = 5
+    EXCHANGE_BREAKER_FAILURES: int = 5  # Falhas seguidas até abrir o circuito
+    EXCHANGE_BREAKER_RESET_SECONDS: float = 30  # Tempo aberto antes de testar de novo
+    
+    # Últimas respostas boas da exchange (servidas como velhas durante quedas)
+    STALE_MAX_AGE_SECONDS: int = 3600
+    STALE_CACHE_MAX_ITEMS: int = 2000
+    
+    # Sinais: regenerar no máximo a cada SIGNALS_REFRESH_SECONDS; vencidos
+    # são servidos como velhos enquanto a atualização roda em segundo plano
+    SIGNALS_REFRESH_SECONDS: float = 30
+    SIGNALS_MAX_STALE_SECONDS: float = 3600
+    SIGNALS_RETRY_SECONDS: float = 10
+    
+    # Snapshot de todos os tickers reaproveitado por preços e rankings
+    TICKER_SNAPSHOT_TTL_SECONDS: float = 2
+    
+    # Limite de peso da exchange (Binance Futures: 2400 por minuto por IP)
+    EXCHANGE_WEIGHT_PER_MINUTE: int = 2400
+    EXCHANGE_RATE_LIMIT_COOLDOWN: int = 30  # Pausa (s) após 429/418
+    
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Argon2 (custo do hash de senha)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+    AUTH_HASH_WORKERS: int = 2  # Processos para Argon2 (0 = executar inline)
+    AUTH_CACHE_TTL_SECONDS: int = 30  # Cache de tokens verificados e usuários
+    
     # CORS
     FRONTEND_URL: str
     
     # App
     ENVIRONMENT: str = "development"
+    ADMIN_TOKEN: Optional[str] = None  # Header X-Admin-Token das rotas /admin
+    
+    # Profiler de requisições (desligado por padrão)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.01  # Fração das requisições perfiladas
+    PROFILING_ROUTES: str = ""  # Prefixos sempre perfilados (ex: "/api/signals,/test")
+    PROFILING_MIN_DURATION_MS: float = 0  # Só salvar requisições mais lentas que isso
+    PROFILING_INTERVAL_MS: float = 5  # Intervalo entre amostras
+    PROFILING_DIR: str = "data/profiles"
+    PROFILING_MAX_FILES: int = 200
+    
+    # Tracing do pipeline de sinais (desligado por padrão)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0  # Fração das requisições rastreadas
+    TRACING_SERVICE_NAME: str = "cryptosignals-api"
+    TRACING_FILE: str = "data/traces/spans.jsonl"  # Vazio = não gravar em arquivo
+    TRACING_FILE_MAX_MB: float = 100  # Rotaciona para .1 ao passar disso
+    TRACING_COLLECTOR_URL: str = ""  # Zipkin v2 (ex: http://localhost:9411/api/v2/spans)
+    TRACING_QUEUE_SIZE: int = 10000  # Spans na fila antes de descartar
+    TRACING_BATCH_SIZE: int = 512
+    TRACING_FLUSH_SECONDS: float = 1.0
+    LOG_LEVEL: str = "INFO"
+    
+    # Limite de requisições por cliente (usuário do JWT ou IP), ponderado
+    # pelo custo de cada rota; custo 0 = rota livre
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_CAPACITY: float = 60  # Saldo máximo por cliente
+    RATE_LIMIT_REFILL_PER_SECOND: float = 1  # Saldo reposto por segundo
+    RATE_LIMIT_COSTS: str = (
+        "/test/generate-signals-top10=30,/test/generate-signal=10,/test/analysis=10,"
+        "/test/top-coins=3,/test/price=2,/api/signals=5,/api/charts=3,/api/history/export=20,"
+        "/health=0"
+    )
+    RATE_LIMIT_DEFAULT_COST: float = 1
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Usar X-Forwarded-For (só atrás de proxy confiável)
+    RATE_LIMIT_TRUSTED_HOPS: int = 1  # Proxies confiáveis na frente da API (cliente = N-ésimo endereço da direita)
+    RATE_LIMIT_REDIS_URL: str = ""  # Buckets compartilhados entre processos (requer redis)
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = 10  # Redis fora: só memória por esse tempo antes de testar de novo
+    RATE_LIMIT_MAX_CLIENTS: int = 100_000  # Buckets em memória (LRU)
+    
+    # Screener (pré-filtro sobre todos os pares USDT)
+    SCREENER_MIN_QUOTE_VOLUME: float = 5_000_000  # Volume 24h mínimo em USDT
+    SCREENER_MIN_CHANGE_PCT: float = 2.0  # Variação 24h mínima (%)
+    SCREENER_MIN_RANGE_PCT: float = 4.0  # Amplitude 24h mínima (%)
+    SCREENER_MAX_CANDIDATES: int = 15  # Pares que recebem análise completa
+    
+    # Execução da análise técnica: "thread" (no processo da API) ou
+    # "process" (pool de processos, candles via memória compartilhada)
+    ANALYSIS_EXECUTION: str = "thread"
+    ANALYSIS_WORKERS: int = 0  # Processos do pool (0 = um por núcleo)
+    ANALYSIS_PROCESS_MIN_SYMBOLS: int = 8  # Lotes menores rodam no processo atual
+    
+    # Gerador distribuído (app/tasks/generate_signals.py): cada instância
+    # gera os sinais dos pares moeda x timeframe que o anel lhe atribui
+    GENERATOR_TIMEFRAMES: str = "1h,4h"  # Separados por vírgula
+    GENERATOR_INTERVAL_SECONDS: float = 60  # Intervalo entre ciclos
+    GENERATOR_MIN_QUOTE_VOLUME: float = 1_000_000  # Universo: pares USDT com volume 24h acima disso
+    NODE_HEARTBEAT_SECONDS: float = 5
+    NODE_TTL_SECONDS: float = 20  # Sem heartbeat há mais que isso = instância morta
+    NODE_VIRTUAL_NODES: int = 64  # Pontos no anel por instância
+    
+    # Deduplicação de sinais por correlação entre símbolos
+    CORRELATION_DEDUP: bool = True
+    CORRELATION_THRESHOLD: float = 0.8  # Correlação a partir da qual é o mesmo trade
+    CORRELATION_WINDOW: int = 200  # Candles fechados na janela
+    CORRELATION_MIN_PERIODS: int = 30  # Candles em comum mínimos por par
+    
+    # Sinais: validade, partições mensais e retenção
+    SIGNAL_EXPIRY_HOURS: int = 24
+    SIGNAL_PARTITIONS_AHEAD: int = 2  # Meses futuros com partição pré-criada
+    SIGNAL_RETENTION_MONTHS: int = 6  # Meses mantidos no banco (0 = sem limite)
+    SIGNAL_ARCHIVE_DIR: str = "data/archive"
+    
+    # Exportação do histórico (CSV/Parquet)
+    EXPORT_CHUNK_SIZE: int = 5000  # Linhas lidas e codificadas por vez
+    
+    # Webhooks / Telegram
+    WEBHOOKS_ENABLED: bool = True  # Rodar o worker de entregas neste processo
+    WEBHOOK_BATCH_SIZE: int = 20  # Sinais por requisição
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_RETRY_BASE_SECONDS: float = 5  # Backoff: base * 2^(tentativa-1)
+    WEBHOOK_RETRY_MAX_SECONDS: float = 3600
+    WEBHOOK_TIMEOUT_SECONDS: float = 10
+    WEBHOOK_POLL_SECONDS: float = 2  # Intervalo de leitura da fila sem notificação
+    WEBHOOK_CLAIM_LIMIT: int = 1000  # Entregas reservadas por leitura da fila
+    WEBHOOK_MAX_CONNECTIONS: int = 200
+    WEBHOOK_ALLOW_PRIVATE_URLS: bool = False  # Só desenvolvimento/testes (receptor em localhost)
+    
+    # Watchlists
+    WATCHLIST_MAX_ENTRIES: int = 100  # Itens por usuário
+    WATCHLIST_INDEX_REFRESH_SECONDS: int = 60  # Recarregar índice do banco
+    
+    # Arquivo de candles (memory-mapped)
+    CANDLE_STORE_DIR: str = "data/candles"
+    
+    # Gráficos (/api/charts): candles e indicadores reduzidos no servidor
+    CHART_DEFAULT_POINTS: int = 1000
+    CHART_MAX_POINTS: int = 5000
+    CHART_MAX_CANDLES: int = 200_000  # Candles lidos por requisição (antes da redução); acima disso, timeframe maior
+    CHART_CACHE_TTL_SECONDS: float = 30
     
     class Config:
         env_file = ".env"
@@ -2,6 +2,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.services.tracing import tracer, instrument_engine
 
 # Para psycopg3, precisa usar postgresql+psycopg
 # Substituir postgresql:// por postgresql+psycopg://
@@ -18,6 +19,10 @@ engine = create_engine(
     max_overflow=20
 )
 
+# Span por comando SQL (só com TRACING_ENABLED)
+if settings.TRACING_ENABLED:
+    instrument_engine(engine)
+
 # Session local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -26,8 +31,12 @@ Base = declarative_base()
 
 # Dependency para usar nas rotas
 def get_db():
+    # O span não vira o corrente: abertura e fechamento rodam em
+    # chamadas diferentes da threadpool (contextos diferentes)
+    span = tracer.span("db.session")
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+        span.end()
\ No newline at end of file
@@ -4,11 +4,16 @@ from app.config import settings
 from app.services.binance_service import binance_service
 from app.services.technical_analysis import technical_analysis
 from app.services.signal_generator import signal_generator
-from app.api import signals, history, stats, auth
+from app.api import signals, history, stats, auth, admin, webhooks, watchlists, charts
 from app.database import engine, Base
+from app.services.partitions import ensure_partitions
+from app.services.webhooks import webhook_dispatcher
+from app.services.analysis_pool import analysis_pool
+from app.services.auth_service import shutdown_hash_pool
 
-# Criar tabelas
+# Criar tabelas (e partições mensais de signals no Postgres)
 Base.metadata.create_all(bind=engine)
+ensure_partitions(engine)
 
 # Criar app
 app = FastAPI(
@@ -17,6 +22,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Limite por cliente ponderado pelo custo da rota (adicionado antes do
+# CORS para que as respostas 429 também levem os headers de CORS)
+if settings.RATE_LIMIT_ENABLED:
+    from app.services.rate_limit import RateLimitMiddleware
+    app.add_middleware(RateLimitMiddleware)
+
 # CORS - ATUALIZADO COM DOMÍNIO VERCEL CORRETO
 app.add_middleware(
     CORSMiddleware,
@@ -40,6 +51,40 @@ app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(signals.router, prefix="/api/signals", tags=["signals"])
 app.include_router(history.router, prefix="/api/history", tags=["history"])
 app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
+app.include_router(webhooks.router, prefix="/api/webhooks", tags=["webhooks"])
+app.include_router(watchlists.router, prefix="/api/watchlists", tags=["watchlists"])
+app.include_router(charts.router, prefix="/api/charts", tags=["charts"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+
+# Worker de entregas de webhooks (thread própria, não bloqueia a API)
+@app.on_event("startup")
+def start_webhook_dispatcher():
+    if settings.WEBHOOKS_ENABLED:
+        webhook_dispatcher.start()
+
+@app.on_event("shutdown")
+def stop_webhook_dispatcher():
+    webhook_dispatcher.stop()
+
+# Pool de processos da análise (só existe com ANALYSIS_EXECUTION=process)
+@app.on_event("shutdown")
+def stop_analysis_pool():
+    analysis_pool.shutdown()
+
+# Pool de processos do Argon2 (só existe com AUTH_HASH_WORKERS > 0)
+@app.on_event("shutdown")
+def stop_hash_pool():
+    shutdown_hash_pool()
+
+# Profiler por amostragem (só entra na pilha de middlewares se habilitado)
+if settings.PROFILING_ENABLED:
+    from app.services.profiler import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+# Span raiz por requisição (filhos: exchange, análise, estágios do gerador, SQL)
+if settings.TRACING_ENABLED:
+    from app.services.tracing import TracingMiddleware
+    app.add_middleware(TracingMiddleware)
 
 @app.get("/")
 def read_root():
@@ -51,7 +96,10 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "exchange": binance_service.status()
+    }
 
 # Endpoints de teste
 @app.get("/test/price/{symbol}")
@@ -77,8 +125,9 @@ def test_top_coins():
     """
     Testar busca dos top coins por volume
     """
+    # Ranking e preços saem do mesmo snapshot de tickers (uma chamada)
     symbols = binance_service.get_top_volume_pairs(limit=10)
-    prices = binance_service.get_multiple_prices(symbols)
+    prices = binance_service.get_prices(symbols)
     
     result = []
     for symbol, price in prices.items():
@@ -99,7 +148,11 @@ def test_analysis(symbol: str, timeframe: str = "1h"):
     Exemplo: /test/analysis/BTCUSDT?timeframe=1h
     """
     formatted_symbol = f"{symbol[:-4]}/{symbol[-4:]}"
-    df = binance_service.get_ohlcv(formatted_symbol, timeframe=timeframe, limit=200)
+    df = binance_service.get_ohlcv(
+        formatted_symbol,
+        timeframe=timeframe,
+        limit=technical_analysis.required_candles()
+    )
     
     if df is None or df.empty:
         return {"error": "Não foi possível buscar dados"}
@@ -109,6 +162,7 @@ def test_analysis(symbol: str, timeframe: str = "1h"):
     return {
         "symbol": formatted_symbol,
         "timeframe": timeframe,
+        "stale": analysis["stale"],
         "analysis": analysis
     }
 
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.database import Base
+
+class GeneratorNode(Base):
+    """
+    Instância do gerador de sinais (app/tasks/generate_signals.py)
+    
+    Cada instância renova heartbeat_em periodicamente; as vivas dividem
+    os pares moeda x timeframe por hash consistente.
+    """
+    __tablename__ = "generator_nodes"
+    
+    node_id = Column(String, primary_key=True)
+    hostname = Column(String, nullable=True)
+    pid = Column(Integer, nullable=True)
+    
+    iniciado_em = Column(DateTime(timezone=True), nullable=False)
+    heartbeat_em = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    # Último ciclo (para acompanhamento em /admin/nodes)
+    jobs = Column(Integer, default=0)  # Pares moeda x timeframe atribuídos
+    ultimo_ciclo_ms = Column(Integer, nullable=True)
\ No newline at end of file
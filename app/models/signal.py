@@ -1,11 +1,30 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, engine
+
+# No Postgres a tabela é particionada por mês em criado_em
+# (ver app/services/partitions.py). A chave de partição precisa fazer
+# parte da chave primária; no SQLite a tabela continua simples.
+PARTITIONED = engine.dialect.name == "postgresql"
+
+# JSONB no Postgres (indexável com GIN), JSON nos demais bancos
+JSONType = JSON().with_variant(JSONB(), "postgresql")
 
 class Signal(Base):
     __tablename__ = "signals"
+    __table_args__ = (
+        # Consultas de contenção (indicadores @> '{"rsi": {"status": ...}}')
+        Index(
+            "ix_signals_indicadores",
+            "indicadores",
+            postgresql_using="gin",
+            postgresql_ops={"indicadores": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+        {"postgresql_partition_by": "RANGE (criado_em)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     
     # Informações do sinal
     moeda = Column(String, nullable=False, index=True)  # BTC/USDT
@@ -27,13 +46,25 @@ class Signal(Base):
     status = Column(String, default="ATIVO")  # ATIVO, TP1, TP2, TP3, SL, EXPIRADO
     
     # Indicadores técnicos
-    indicadores = Column(JSON)  # {rsi: 62, macd: {...}, ema20: ..., etc}
+    indicadores = Column(JSONType)  # {rsi: 62, macd: {...}, ema20: ..., etc}
+    
+    # Indicadores mais filtrados, em colunas tipadas (copiados de indicadores)
+    rsi_valor = Column(Float, index=True)
+    macd_histograma = Column(Float, index=True)
+    tendencia = Column(String, index=True)  # ALTA_FORTE, ALTA, NEUTRO, BAIXA, BAIXA_FORTE
+    volume_status = Column(String, index=True)  # ALTO, NORMAL, BAIXO
     
     # Análise detalhada
-    analise = Column(JSON)  # {resumo: "...", confluencias: [...], estrategia: "..."}
+    analise = Column(JSONType)  # {resumo: "...", confluencias: [...], estrategia: "..."}
     
     # Timestamps
-    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+    criado_em = Column(
+        DateTime(timezone=True),
+        primary_key=PARTITIONED,
+        nullable=False,
+        server_default=func.now(),
+        index=True
+    )
     atualizado_em = Column(DateTime(timezone=True), onupdate=func.now())
     expira_em = Column(DateTime(timezone=True))
     
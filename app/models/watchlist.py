@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Watchlist(Base):
+    """
+    Item da watchlist de um usuário (campos vazios = qualquer valor)
+    """
+    __tablename__ = "watchlists"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # Filtros
+    moeda = Column(String, nullable=True)  # BTC/USDT ou None (todas)
+    timeframe = Column(String, nullable=True)  # 1h, 4h, 1d ou None (todos)
+    tipo = Column(String, nullable=True)  # LONG, SHORT ou None (ambos)
+    probabilidade_min = Column(Float, nullable=False, default=0)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
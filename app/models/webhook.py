@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class WebhookEndpoint(Base):
+    __tablename__ = "webhook_endpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # Destino
+    tipo = Column(String, nullable=False, default="webhook")  # webhook ou telegram
+    url = Column(String, nullable=False)  # Telegram: URL do sendMessage do bot
+    chat_id = Column(String, nullable=True)  # Só Telegram
+    secret = Column(String, nullable=True)  # Assinatura HMAC (header X-Signature)
+    
+    # Entrega
+    max_concorrencia = Column(Integer, default=2)  # Requisições simultâneas para o endpoint
+    is_active = Column(Boolean, default=True)
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class WebhookDelivery(Base):
+    """
+    Fila persistente de entregas (uma linha por sinal x endpoint)
+    """
+    __tablename__ = "webhook_deliveries"
+    __table_args__ = (
+        # Busca das entregas vencidas pelo worker
+        Index("ix_webhook_deliveries_fila", "status", "proxima_tentativa"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    endpoint_id = Column(Integer, ForeignKey("webhook_endpoints.id"), nullable=False, index=True)
+    signal_id = Column(Integer, nullable=True)
+    payload = Column(JSON, nullable=False)
+    
+    status = Column(String, nullable=False, default="PENDENTE")  # PENDENTE, ENTREGUE, FALHOU
+    tentativas = Column(Integer, nullable=False, default=0)
+    proxima_tentativa = Column(DateTime(timezone=True), nullable=False)
+    ultimo_erro = Column(String, nullable=True)
+    
+    criado_em = Column(DateTime(timezone=True), server_default=func.now())
+    entregue_em = Column(DateTime(timezone=True), nullable=True)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class WatchlistCreate(BaseModel):
+    moeda: Optional[str] = None  # None = todas as moedas
+    timeframe: Optional[str] = None  # None = todos os timeframes
+    tipo: Optional[str] = None  # LONG, SHORT ou None
+    probabilidade_min: float = 0
+
+class WatchlistResponse(WatchlistCreate):
+    id: int
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
\ No newline at end of file
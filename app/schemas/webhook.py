@@ -0,0 +1,40 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class WebhookCreate(BaseModel):
+    tipo: str = "webhook"  # webhook ou telegram
+    url: Optional[str] = None  # Obrigatório para webhook
+    secret: Optional[str] = None
+    telegram_bot_token: Optional[str] = None  # Obrigatório para telegram
+    telegram_chat_id: Optional[str] = None
+    max_concorrencia: int = 2
+
+class WebhookResponse(BaseModel):
+    id: int
+    tipo: str
+    url: str
+    chat_id: Optional[str] = None
+    max_concorrencia: int
+    is_active: bool
+    created_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class DeliveryResponse(BaseModel):
+    id: int
+    signal_id: Optional[int] = None
+    status: str
+    tentativas: int
+    proxima_tentativa: datetime
+    ultimo_erro: Optional[str] = None
+    criado_em: Optional[datetime] = None
+    entregue_em: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class DeliveryList(BaseModel):
+    total: int
+    deliveries: List[DeliveryResponse]
\ No newline at end of file
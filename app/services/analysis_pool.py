@@ -0,0 +1,198 @@
+"""
+Análise técnica em processos separados (ANALYSIS_EXECUTION=process)
+
+O cálculo dos indicadores (pandas/ta) e a pontuação são CPU puro e, numa
+thread só, não passam de um núcleo. Aqui o processo principal continua
+fazendo o I/O (candles da exchange) e manda a parte de CPU para um
+ProcessPoolExecutor:
+
+- os candles de todos os símbolos vão num único bloco de SharedMemory
+  (matriz float64 [linhas x 6]: timestamp, open, high, low, close,
+  volume), com o intervalo de linhas de cada símbolo; nada de pickle
+  de DataFrames
+- cada tarefa recebe só o nome do bloco e uma fatia de símbolos, monta
+  os DataFrames a partir da memória compartilhada, roda
+  get_full_analysis e as regras, e devolve dicionários pequenos
+- o bloco é liberado pelo processo principal quando o lote termina
+
+Os processos são criados com "spawn" (o processo da API tem threads
+rodando: scheduler, webhooks, exporter de spans).
+"""
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_THREAD = "thread"
+EXECUTION_PROCESS = "process"
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Resultado por símbolo: (symbol, análise, direção, probabilidade, erro);
+# probabilidade com o mesmo tipo do caminho em thread (int das regras padrão)
+AnalysisResult = Tuple[str, Optional[Dict], Optional[str], Optional[float], Optional[str]]
+
+# Estado de cada processo do pool (preenchido pelo initializer)
+_worker_state: Dict = {}
+
+
+def _init_worker(rule_variants: Dict, indicators: List[str]):
+    from app.services.scoring_rules import RuleEngine
+    
+    _worker_state["rules"] = RuleEngine(rule_variants)
+    _worker_state["indicators"] = indicators
+
+
+def _analyze_slice(name: str, shape: Tuple[int, int], symbols: List[Tuple[str, int, int]]) -> List[AnalysisResult]:
+    """Tarefa do worker: análise + pontuação de uma fatia de símbolos"""
+    from app.services.technical_analysis import technical_analysis
+    
+    indicators = _worker_state["indicators"]
+    # O resource tracker é o mesmo do processo principal (spawn), que
+    # é quem faz o unlink; aqui só abrir e fechar
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        analyzed = []
+        results: List[AnalysisResult] = []
+        for symbol, start, end in symbols:
+            try:
+                df = pd.DataFrame(data[start:end].copy(), columns=OHLCV_COLUMNS)
+                df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+                analyzed.append((symbol, technical_analysis.get_full_analysis(df, indicators)))
+            except Exception as e:
+                results.append((symbol, None, None, None, str(e)))
+        del data
+    finally:
+        shm.close()
+    
+    if analyzed:
+        scores = _worker_state["rules"].evaluate([analysis for _, analysis in analyzed])["default"]
+        for (symbol, analysis), direction, probability in zip(
+            analyzed, scores["direction"], scores["probability"]
+        ):
+            results.append((symbol, analysis, direction, probability.item(), None))
+    return results
+
+
+def pack_frames(frames: Dict[str, pd.DataFrame]) -> Tuple[shared_memory.SharedMemory, Tuple[int, int], List[Tuple[str, int, int]]]:
+    """
+    Copiar os candles de todos os símbolos para um bloco de SharedMemory
+    
+    Returns:
+        (bloco, formato da matriz, [(symbol, linha inicial, linha final)])
+    """
+    total = sum(len(df) for df in frames.values())
+    shape = (total, len(OHLCV_COLUMNS))
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total * len(OHLCV_COLUMNS) * 8))
+    data = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    ranges = []
+    row = 0
+    for symbol, df in frames.items():
+        end = row + len(df)
+        data[row:end, 0] = df['timestamp'].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+        data[row:end, 1:] = df[OHLCV_COLUMNS[1:]].to_numpy(dtype=np.float64)
+        ranges.append((symbol, row, end))
+        row = end
+    del data
+    return shm, shape, ranges
+
+
+class AnalysisPool:
+    """
+    Pool de processos para análise técnica + pontuação
+    
+    Args:
+        workers: Processos (0 = um por núcleo)
+        min_symbols: Abaixo disso o lote roda na thread atual (o custo de
+            ida e volta não compensa)
+    """
+    
+    def __init__(self, workers: int = 0, min_symbols: int = 8):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_symbols = min_symbols
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._config: Optional[Tuple] = None
+        self._lock = threading.Lock()
+    
+    def should_use(self, symbols: int) -> bool:
+        return settings.ANALYSIS_EXECUTION == EXECUTION_PROCESS and symbols >= self.min_symbols
+    
+    def _get_executor(self, rule_variants: Dict, indicators: List[str]) -> ProcessPoolExecutor:
+        # Regras/indicadores ficam no initializer: recriar o pool se mudarem
+        config = (repr(rule_variants), tuple(indicators))
+        with self._lock:
+            if self._executor is None or self._config != config:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(rule_variants, list(indicators))
+                )
+                self._config = config
+            return self._executor
+    
+    def analyze(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        rule_variants: Dict,
+        indicators: List[str]
+    ) -> List[AnalysisResult]:
+        """
+        Análise e pontuação de todos os símbolos nos processos do pool
+        
+        Args:
+            frames: {symbol: DataFrame OHLCV}
+            rule_variants: Regras no formato do RuleEngine ({"default": {...}})
+            indicators: Indicadores a calcular
+        
+        Returns:
+            [(symbol, análise, direção, probabilidade, erro)] na ordem de frames
+        """
+        executor = self._get_executor(rule_variants, indicators)
+        shm, shape, ranges = pack_frames(frames)
+        try:
+            # Umas 4 fatias por processo equilibram símbolos mais lentos
+            size = max(1, math.ceil(len(ranges) / (self.workers * 4)))
+            futures = [
+                executor.submit(_analyze_slice, shm.name, shape, ranges[i:i + size])
+                for i in range(0, len(ranges), size)
+            ]
+            by_symbol = {}
+            for future in futures:
+                for result in future.result():
+                    by_symbol[result[0]] = result
+        except BrokenProcessPool:
+            # Processo morreu (ex: OOM): descartar o pool, o próximo lote cria outro
+            with self._lock:
+                self._executor = None
+            raise
+        finally:
+            shm.close()
+            shm.unlink()
+        return [by_symbol[symbol] for symbol, _, _ in ranges]
+    
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+# Instância global
+analysis_pool = AnalysisPool(
+    workers=settings.ANALYSIS_WORKERS,
+    min_symbols=settings.ANALYSIS_PROCESS_MIN_SYMBOLS
+)
\ No newline at end of file
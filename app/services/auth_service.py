@@ -1,24 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from argon2.exceptions import VerifyMismatchError, InvalidHashError
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
 from app.config import settings
+from app.models.user import User
+from app.services.cache import TTLCache
 
 # Usar Argon2 ao invés de bcrypt (mais moderno e sem limite de 72 bytes)
-ph = PasswordHasher()
+HASH_PARAMS = {
+    "time_cost": settings.ARGON2_TIME_COST,
+    "memory_cost": settings.ARGON2_MEMORY_COST,
+    "parallelism": settings.ARGON2_PARALLELISM,
+}
+ph = PasswordHasher(**HASH_PARAMS)
+
+# Pool de processos para o Argon2 (criado sob demanda)
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+# Caches de curta duração para /me
+_token_cache = TTLCache(maxsize=10000, ttl=settings.AUTH_CACHE_TTL_SECONDS)
+_user_cache = TTLCache(maxsize=10000, ttl=settings.AUTH_CACHE_TTL_SECONDS)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar senha com Argon2"""
     try:
         ph.verify(hashed_password, plain_password)
         return True
-    except VerifyMismatchError:
+    except (VerifyMismatchError, InvalidHashError):
         return False
 
 def get_password_hash(password: str) -> str:
     """Hash da senha com Argon2"""
     return ph.hash(password)
 
+def _verify_and_rehash(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar senha e gerar novo hash se os parâmetros mudaram
+    
+    Returns:
+        (senha correta, novo hash ou None)
+    """
+    if not verify_password(plain_password, hashed_password):
+        return False, None
+    
+    if ph.check_needs_rehash(hashed_password):
+        return True, ph.hash(plain_password)
+    return True, None
+
+def _get_hash_pool() -> Optional[ProcessPoolExecutor]:
+    global _hash_pool
+    if _hash_pool is None and settings.AUTH_HASH_WORKERS > 0:
+        _hash_pool = ProcessPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS)
+    return _hash_pool
+
+async def _run_hash_job(func, *args):
+    pool = _get_hash_pool()
+    if pool is None:
+        # Sem processos: threadpool (o Argon2 não pode travar o event loop)
+        return await run_in_threadpool(func, *args)
+    return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+
+def shutdown_hash_pool():
+    """Encerrar o pool de processos do Argon2 (shutdown da API)"""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=True, cancel_futures=True)
+        _hash_pool = None
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar senha no pool de processos (não ocupa a threadpool da API)
+    
+    Returns:
+        (senha correta, novo hash se precisar de rehash)
+    """
+    return await _run_hash_job(_verify_and_rehash, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash da senha no pool de processos"""
+    return await _run_hash_job(get_password_hash, password)
+
 def create_access_token(data: dict) -> str:
     """Criar token JWT"""
     to_encode = data.copy()
@@ -28,9 +95,48 @@ def create_access_token(data: dict) -> str:
     return encoded_jwt
 
 def verify_token(token: str):
-    """Verificar token JWT"""
+    """Verificar token JWT (com cache até o menor entre TTL e expiração)"""
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    
+    ttl = settings.AUTH_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    _token_cache.set(token, payload, ttl=ttl)
+    
+    return payload
+
+def get_user_cached(db: Session, user_id: int) -> Optional[Dict]:
+    """
+    Buscar usuário por ID com cache de curta duração
+    
+    Returns:
+        Dicionário com os campos públicos do usuário ou None
+    """
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+    
+    db_user = db.query(User).filter(User.id == user_id).first()
+    if not db_user:
+        return None
+    
+    user = {
+        "id": db_user.id,
+        "email": db_user.email,
+        "is_active": db_user.is_active,
+        "created_at": db_user.created_at
+    }
+    _user_cache.set(user_id, user)
+    
+    return user
+
+def invalidate_user(user_id: int):
+    """Remover usuário do cache (chamar após alterações)"""
+    _user_cache.delete(user_id)
\ No newline at end of file
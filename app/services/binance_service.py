@@ -1,36 +1,190 @@
-import ccxt
+import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 import pandas as pd
+from app.config import settings
+from app.services.exchanges import create_exchange
+from app.services.cache import TTLCache
+from app.services.tracing import tracer
+from app.services.resilience import CircuitBreaker, CircuitOpenError, call_with_timeout
+from app.services.request_scheduler import (
+    RequestScheduler,
+    PRIORITY_DEFAULT,
+    PRIORITY_BACKFILL
+)
+
+logger = logging.getLogger(__name__)
+
+# Pesos das requisições no Binance Futures
+WEIGHT_TICKER = 1
+WEIGHT_ALL_TICKERS = 40
+
+def ohlcv_weight(limit: int) -> int:
+    """Peso de /fapi/v1/klines conforme o limit"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
 
 class BinanceService:
     def __init__(self):
-        # Inicializar exchange Binance (sem API keys para dados públicos)
-        self.exchange = ccxt.binance({
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future',  # Futuros
-            }
-        })
+        # Inicializar exchange (Binance Futures por padrão, sem API keys)
+        # O throttle do ccxt fica desligado: quem controla o ritmo é o scheduler
+        # Com várias em EXCHANGES, consulta todas em paralelo (MultiExchange)
+        self.exchange = create_exchange(
+            [e.strip() for e in settings.EXCHANGES.split(",") if e.strip()],
+            mode=settings.EXCHANGE_FANOUT_MODE,
+            timeout=settings.EXCHANGE_TIMEOUT_SECONDS,
+            cooldown=settings.EXCHANGE_UNHEALTHY_COOLDOWN
+        )
+        
+        # Todas as chamadas passam pelo scheduler central
+        self.scheduler = RequestScheduler(
+            capacity=settings.EXCHANGE_WEIGHT_PER_MINUTE,
+            refill_per_second=settings.EXCHANGE_WEIGHT_PER_MINUTE / 60,
+            cooldown=settings.EXCHANGE_RATE_LIMIT_COOLDOWN
+        )
+        
+        # Último snapshot de fetch_tickers (preços em lote, ranking por volume)
+        self._tickers_snapshot = TTLCache(maxsize=1, ttl=settings.TICKER_SNAPSHOT_TTL_SECONDS)
+        
+        # Prazo e disjuntor por endpoint: com a exchange lenta ou fora do ar
+        # as chamadas falham rápido em vez de esperar o timeout do ccxt
+        self.timeouts = {
+            'fetch_ticker': settings.EXCHANGE_TICKER_TIMEOUT_SECONDS,
+            'fetch_tickers': settings.EXCHANGE_TICKERS_TIMEOUT_SECONDS,
+            'fetch_ohlcv': settings.EXCHANGE_OHLCV_TIMEOUT_SECONDS,
+        }
+        self.breakers = {
+            endpoint: CircuitBreaker(
+                endpoint,
+                failure_threshold=settings.EXCHANGE_BREAKER_FAILURES,
+                reset_timeout=settings.EXCHANGE_BREAKER_RESET_SECONDS
+            )
+            for endpoint in self.timeouts
+        }
+        
+        # Últimas respostas boas, servidas (marcadas como velhas) se a exchange falhar
+        self._last_good = TTLCache(maxsize=settings.STALE_CACHE_MAX_ITEMS, ttl=settings.STALE_MAX_AGE_SECONDS)
+    
+    def _call(self, endpoint: str, func, weight: float, priority: int, key: tuple):
+        """
+        Chamada à exchange via scheduler, com prazo e disjuntor do endpoint
+        
+        O disjuntor é conferido antes de entrar na fila (circuito aberto
+        falha na hora) e registra o resultado só da chamada que de fato
+        foi à exchange (não das coalescidas).
+        """
+        breaker = self.breakers[endpoint]
+        if breaker.is_open:
+            breaker.stats["rejected"] += 1
+            raise CircuitOpenError(f"Circuito {endpoint} aberto")
+        timeout = self.timeouts[endpoint]
+        return self.scheduler.submit(
+            lambda: breaker.call(lambda: call_with_timeout(func, timeout)),
+            weight=weight,
+            priority=priority,
+            key=key
+        )
+    
+    def _fetch_ticker(self, symbol: str, priority: int) -> Dict:
+        with tracer.span("exchange.fetch_ticker", symbol=symbol, priority=priority):
+            return self._call(
+                'fetch_ticker',
+                lambda: self.exchange.fetch_ticker(symbol),
+                weight=WEIGHT_TICKER,
+                priority=priority,
+                key=('fetch_ticker', symbol)
+            )
+    
+    def _fetch_tickers(self, priority: int) -> Dict[str, Dict]:
+        with tracer.span("exchange.fetch_tickers", priority=priority) as span:
+            tickers = self._call(
+                'fetch_tickers',
+                lambda: self.exchange.fetch_tickers(),
+                weight=WEIGHT_ALL_TICKERS,
+                priority=priority,
+                key=('fetch_tickers',)
+            )
+            span.set_attribute("tickers", len(tickers))
+            return tickers
     
-    def get_price(self, symbol: str) -> float:
+    def _ticker_snapshot(self, priority: int) -> Dict[str, Dict]:
+        """
+        Todos os tickers, reaproveitando o snapshot se ainda estiver fresco
+        
+        Se a exchange falhar, devolve o último snapshot bom (até
+        STALE_MAX_AGE_SECONDS); sem nenhum, propaga o erro.
+        """
+        tickers = self._tickers_snapshot.get('all')
+        if tickers is None:
+            try:
+                tickers = self._fetch_tickers(priority)
+            except Exception as e:
+                tickers = self._last_good.get('tickers')
+                if tickers is None:
+                    raise
+                logger.warning("Usando snapshot de tickers velho: %s", e)
+                return tickers
+            self._tickers_snapshot.set('all', tickers)
+            self._last_good.set('tickers', tickers)
+        return tickers
+    
+    def _fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str,
+        since: Optional[int],
+        limit: int,
+        priority: int
+    ) -> List[List[float]]:
+        with tracer.span(
+            "exchange.fetch_ohlcv",
+            symbol=symbol,
+            timeframe=timeframe,
+            limit=limit,
+            priority=priority
+        ) as span:
+            ohlcv = self._call(
+                'fetch_ohlcv',
+                lambda: self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit),
+                weight=ohlcv_weight(limit),
+                priority=priority,
+                key=('fetch_ohlcv', symbol, timeframe, since, limit)
+            )
+            span.set_attribute("candles", len(ohlcv))
+            return ohlcv
+    
+    def get_price(self, symbol: str, priority: int = PRIORITY_DEFAULT) -> float:
         """
         Buscar preço atual de um par
         
         Args:
             symbol: Par de trading (ex: 'BTC/USDT')
+            priority: Prioridade no scheduler
         
         Returns:
             Preço atual
         """
         try:
-            ticker = self.exchange.fetch_ticker(symbol)
+            ticker = self._fetch_ticker(symbol, priority)
+            self._last_good.set(('price', symbol), ticker['last'])
             return ticker['last']
         except Exception as e:
-            print(f"Erro ao buscar preço de {symbol}: {e}")
-            return None
+            logger.warning("Erro ao buscar preço de %s: %s", symbol, e)
+            # Último preço bom (None se não houver)
+            return self._last_good.get(('price', symbol))
     
-    def get_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> pd.DataFrame:
+    def get_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = '1h',
+        limit: int = 100,
+        priority: int = PRIORITY_DEFAULT
+    ) -> pd.DataFrame:
         """
         Buscar dados OHLCV (Open, High, Low, Close, Volume)
         
@@ -38,27 +192,92 @@ class BinanceService:
             symbol: Par de trading (ex: 'BTC/USDT')
             timeframe: Timeframe ('1m', '5m', '15m', '1h', '4h', '1d')
             limit: Número de candles
+            priority: Prioridade no scheduler
         
         Returns:
-            DataFrame com dados OHLCV
+            DataFrame com dados OHLCV; se a exchange falhar, os últimos
+            candles bons com df.attrs['stale'] = True (None se não houver)
         """
+        stale = False
         try:
-            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            
-            # Converter para DataFrame
-            df = pd.DataFrame(
-                ohlcv,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            )
-            
-            # Converter timestamp para datetime
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
-            return df
+            ohlcv = self._fetch_ohlcv(symbol, timeframe, None, limit, priority)
+            self._last_good.set(('ohlcv', symbol, timeframe, limit), ohlcv)
+        except Exception as e:
+            logger.warning("Erro ao buscar OHLCV de %s: %s", symbol, e)
+            ohlcv = self._last_good.get(('ohlcv', symbol, timeframe, limit))
+            if ohlcv is None:
+                return None
+            stale = True
+        
+        # Converter para DataFrame
+        df = pd.DataFrame(
+            ohlcv,
+            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        )
+        
+        # Converter timestamp para datetime
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df.attrs['stale'] = stale
+        
+        return df
+    
+    def fetch_ohlcv_page(
+        self,
+        symbol: str,
+        timeframe: str = '1h',
+        since: Optional[int] = None,
+        limit: int = 1500,
+        priority: int = PRIORITY_BACKFILL
+    ) -> List[List[float]]:
+        """
+        Buscar uma página de candles a partir de um timestamp (para backfill)
+        
+        Diferente de get_ohlcv, não engole erros: quem chama decide
+        se tenta de novo.
         
+        Args:
+            symbol: Par de trading (ex: 'BTC/USDT')
+            timeframe: Timeframe
+            since: Timestamp inicial em ms
+            limit: Número máximo de candles (1500 no Binance Futures)
+            priority: Prioridade no scheduler
+        
+        Returns:
+            Lista OHLCV no formato do ccxt
+        """
+        return self._fetch_ohlcv(symbol, timeframe, since, limit, priority)
+    
+    def get_prices(self, symbols: List[str], priority: int = PRIORITY_DEFAULT) -> Dict[str, float]:
+        """
+        Buscar preços de vários pares com uma única chamada (fetch_tickers)
+        
+        Usa o snapshot em memória se tiver menos de TICKER_SNAPSHOT_TTL_SECONDS.
+        Aceita tanto 'BTC/USDT' quanto o símbolo do perpétuo 'BTC/USDT:USDT'.
+        
+        Args:
+            symbols: Lista de pares
+            priority: Prioridade no scheduler
+        
+        Returns:
+            Dicionário {symbol: price} (pares sem preço ficam de fora)
+        """
+        if not symbols:
+            return {}
+        
+        try:
+            tickers = self._ticker_snapshot(priority)
         except Exception as e:
-            print(f"Erro ao buscar OHLCV de {symbol}: {e}")
-            return None
+            logger.warning("Erro ao buscar preços: %s", e)
+            return {}
+        
+        prices = {}
+        for symbol in symbols:
+            ticker = tickers.get(symbol)
+            if ticker is None and ':' not in symbol and '/' in symbol:
+                ticker = tickers.get(f"{symbol}:{symbol.split('/')[1]}")
+            if ticker and ticker.get('last'):
+                prices[symbol] = ticker['last']
+        return prices
     
     def get_multiple_prices(self, symbols: List[str]) -> Dict[str, float]:
         """
@@ -70,25 +289,48 @@ class BinanceService:
         Returns:
             Dicionário {symbol: price}
         """
-        prices = {}
-        for symbol in symbols:
-            price = self.get_price(symbol)
-            if price:
-                prices[symbol] = price
-        return prices
+        return self.get_prices(symbols)
+    
+    def get_tickers(self, priority: int = PRIORITY_DEFAULT) -> Dict[str, Dict]:
+        """
+        Buscar snapshot de todos os tickers em uma única chamada
+        
+        Args:
+            priority: Prioridade no scheduler
+        
+        Returns:
+            Dicionário {symbol: ticker} (vazio se falhar)
+        """
+        try:
+            return self._ticker_snapshot(priority)
+        except Exception as e:
+            logger.warning("Erro ao buscar tickers: %s", e)
+            return {}
+    
+    def degraded(self) -> bool:
+        """Algum endpoint da exchange com o circuito aberto"""
+        return any(breaker.is_open for breaker in self.breakers.values())
+    
+    def status(self) -> Dict:
+        """Estado dos disjuntores por endpoint"""
+        return {
+            "degraded": self.degraded(),
+            "breakers": [breaker.status() for breaker in self.breakers.values()]
+        }
     
-    def get_top_volume_pairs(self, limit: int = 10) -> List[str]:
+    def get_top_volume_pairs(self, limit: int = 10, priority: int = PRIORITY_DEFAULT) -> List[str]:
         """
         Buscar pares com maior volume
         
         Args:
             limit: Número de pares a retornar
+            priority: Prioridade no scheduler
         
         Returns:
-            Lista de símbolos
+            Lista de símbolos (vazia se não houver snapshot de tickers)
         """
         try:
-            tickers = self.exchange.fetch_tickers()
+            tickers = self._ticker_snapshot(priority)
             
             # Filtrar apenas USDT pairs
             usdt_pairs = {
@@ -107,12 +349,10 @@ class BinanceService:
             return [pair[0] for pair in sorted_pairs[:limit]]
         
         except Exception as e:
-            print(f"Erro ao buscar pares por volume: {e}")
-            # Retornar pares padrão se falhar
-            return [
-                'BTC/USDT', 'ETH/USDT', 'BNB/USDT', 
-                'SOL/USDT', 'ADA/USDT'
-            ]
+            # Sem nenhum snapshot, nem velho: lista vazia em vez de pares
+            # inventados (e de spot, que não batem com os perpétuos)
+            logger.warning("Erro ao buscar pares por volume: %s", e)
+            return []
 
 # Instância global
 binance_service = BinanceService()
\ No newline at end of file
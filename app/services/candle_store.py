@@ -0,0 +1,353 @@
+import os
+import shutil
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Sequence, Union
+from app.config import settings
+
+# Colunas do arquivo e seus dtypes fixos (um arquivo binário por coluna)
+COLUMNS = {
+    'timestamp': np.dtype('<i8'),  # milissegundos (padrão do ccxt)
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8'),
+}
+
+# Colunas de dados gravadas antes do timestamp
+DATA_COLUMNS = [c for c in COLUMNS if c != 'timestamp']
+
+
+class CandleSeries:
+    """
+    Fatia de candles apontando direto para os arquivos mapeados em memória
+
+    Cada coluna é uma view numpy (zero-copy) sobre o arquivo em disco.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns['timestamp'])
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Converter para DataFrame no mesmo formato de get_ohlcv (copia os dados)
+        """
+        df = pd.DataFrame({c: np.array(self.columns[c]) for c in COLUMNS})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+
+class CandleStore:
+    """
+    Arquivo colunar de candles em disco
+
+    Layout: {root}/{SIMBOLO}/{timeframe}/{coluna}.bin, cada arquivo com
+    valores de dtype fixo. Leitura via np.memmap (não carrega na RAM),
+    busca por intervalo com searchsorted (O(log n)) e escrita append-only.
+
+    {timeframe} é um link simbólico para a versão atual da série
+    ({timeframe}.v{n}); o prepend grava uma versão nova e troca o link
+    com um único os.replace, então o caminho nunca fica ausente.
+
+    O arquivo de timestamp é gravado por último e define o tamanho
+    válido da série, então uma escrita interrompida não corrompe o
+    arquivo: colunas maiores que o timestamp são truncadas no próximo append.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.CANDLE_STORE_DIR
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, symbol: str, timeframe: str) -> threading.Lock:
+        key = (symbol, timeframe)
+        with self._locks_guard:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
+
+    def _dir(self, symbol: str, timeframe: str) -> str:
+        # BTC/USDT:USDT -> BTC_USDT_USDT
+        safe_symbol = symbol.replace('/', '_').replace(':', '_')
+        return os.path.join(self.root, safe_symbol, timeframe)
+
+    def _path(self, directory: str, column: str) -> str:
+        return os.path.join(directory, f"{column}.bin")
+
+    def _current_dir(self, symbol: str, timeframe: str) -> Optional[str]:
+        """
+        Diretório da versão atual da série (None se ainda não existe)
+
+        Quem lê resolve o link uma vez e abre todas as colunas desse
+        diretório, então um prepend no meio da leitura não mistura versões.
+        """
+        path = self._dir(symbol, timeframe)
+        if not os.path.exists(path):
+            return None
+        return os.path.realpath(path)
+
+    def _column_len(self, directory: str, column: str) -> int:
+        try:
+            return os.path.getsize(self._path(directory, column)) // COLUMNS[column].itemsize
+        except FileNotFoundError:
+            # Coluna ainda não gravada; versão removida propaga o erro
+            if os.path.isdir(directory):
+                return 0
+            raise
+
+    def _new_version(self, symbol: str, timeframe: str) -> str:
+        path = self._dir(symbol, timeframe)
+        version = f"{path}.v{time.time_ns()}"
+        os.makedirs(version)
+        return version
+
+    def _point_to(self, symbol: str, timeframe: str, version: str):
+        # Link temporário + os.replace: a troca é atômica para os leitores
+        path = self._dir(symbol, timeframe)
+        link = path + '.link'
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.basename(version), link)
+        os.replace(link, path)
+
+    def _recover(self, symbol: str, timeframe: str):
+        """
+        Arrumar restos de escritas interrompidas (só com o lock de escrita)
+
+        Remove versões que não viraram a atual (prepend interrompido) e
+        converte o layout antigo, com o diretório no lugar do link.
+        """
+        path = self._dir(symbol, timeframe)
+
+        # Layout antigo: prepend interrompido entre as duas trocas
+        if not os.path.lexists(path) and os.path.isdir(path + '.old'):
+            os.replace(path + '.old', path)
+        shutil.rmtree(path + '.old', ignore_errors=True)
+        shutil.rmtree(path + '.tmp', ignore_errors=True)
+
+        if os.path.isdir(path) and not os.path.islink(path):
+            # Diretório real vira a primeira versão (leitores veem a série
+            # vazia só entre as duas chamadas abaixo, uma única vez)
+            version = f"{path}.v{time.time_ns()}"
+            os.replace(path, version)
+            self._point_to(symbol, timeframe, version)
+
+        current = self._current_dir(symbol, timeframe)
+        prefix = os.path.basename(path) + '.v'
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            return
+        for name in os.listdir(parent):
+            candidate = os.path.join(parent, name)
+            if name.startswith(prefix) and candidate != current:
+                shutil.rmtree(candidate, ignore_errors=True)
+
+    def length(self, symbol: str, timeframe: str) -> int:
+        """
+        Número de candles válidos gravados
+        """
+        return len(self.open(symbol, timeframe))
+
+    def _open_column(self, directory: str, column: str, length: int) -> np.ndarray:
+        dtype = COLUMNS[column]
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(
+            self._path(directory, column),
+            dtype=dtype,
+            mode='r',
+            shape=(length,)
+        )
+
+    def open(self, symbol: str, timeframe: str) -> CandleSeries:
+        """
+        Abrir a série completa mapeada em memória (zero-copy)
+        """
+        # Um prepend pode remover a versão resolvida antes de abrirmos as
+        # colunas: resolver o link de novo
+        for _ in range(5):
+            directory = self._current_dir(symbol, timeframe)
+            if directory is None:
+                return CandleSeries({c: np.empty(0, dtype=d) for c, d in COLUMNS.items()})
+            try:
+                length = self._column_len(directory, 'timestamp')
+                return CandleSeries({
+                    column: self._open_column(directory, column, length)
+                    for column in COLUMNS
+                })
+            except FileNotFoundError:
+                continue
+        raise RuntimeError(f"Série {symbol} {timeframe} trocada durante a leitura")
+
+    def first_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        series = self.open(symbol, timeframe)
+        return int(series['timestamp'][0]) if len(series) else None
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[int]:
+        series = self.open(symbol, timeframe)
+        return int(series['timestamp'][-1]) if len(series) else None
+
+    def read_range(
+        self,
+        symbol: str,
+        timeframe: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None
+    ) -> CandleSeries:
+        """
+        Buscar candles no intervalo [start, end) por timestamp
+
+        Args:
+            symbol: Par de trading (ex: 'BTC/USDT')
+            timeframe: Timeframe ('1m', '1h', ...)
+            start: Timestamp inicial em ms (inclusive)
+            end: Timestamp final em ms (exclusivo)
+
+        Returns:
+            CandleSeries com views sobre o arquivo (sem cópia)
+        """
+        series = self.open(symbol, timeframe)
+        timestamps = series['timestamp']
+
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+
+        return CandleSeries({c: arr[lo:hi] for c, arr in series.columns.items()})
+
+    def _to_columns(self, candles: Union[pd.DataFrame, Sequence[Sequence[float]]]) -> Dict[str, np.ndarray]:
+        """
+        Normalizar candles (lista do ccxt ou DataFrame de get_ohlcv) em colunas
+        """
+        if isinstance(candles, pd.DataFrame):
+            timestamps = candles['timestamp']
+            if pd.api.types.is_datetime64_any_dtype(timestamps):
+                timestamps = timestamps.astype('datetime64[ms]').astype('int64')
+            columns = {'timestamp': np.asarray(timestamps, dtype=COLUMNS['timestamp'])}
+            for column in DATA_COLUMNS:
+                columns[column] = np.asarray(candles[column], dtype=COLUMNS[column])
+            return columns
+
+        raw = np.asarray(candles, dtype='f8').reshape(-1, len(COLUMNS))
+        columns = {'timestamp': raw[:, 0].astype(COLUMNS['timestamp'])}
+        for i, column in enumerate(DATA_COLUMNS, start=1):
+            columns[column] = raw[:, i].astype(COLUMNS[column])
+        return columns
+
+    def append(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: Union[pd.DataFrame, List[List[float]]]
+    ) -> int:
+        """
+        Acrescentar candles ao final da série
+
+        Candles com timestamp menor ou igual ao último gravado são
+        ignorados, então reenviar dados já salvos é seguro.
+
+        Args:
+            symbol: Par de trading
+            timeframe: Timeframe
+            candles: Lista OHLCV do ccxt ou DataFrame com as colunas OHLCV
+
+        Returns:
+            Número de candles gravados
+        """
+        columns = self._to_columns(candles)
+        if len(columns['timestamp']) == 0:
+            return 0
+
+        # Ordenar e remover timestamps duplicados
+        timestamps, index = np.unique(columns['timestamp'], return_index=True)
+        columns = {c: arr[index] for c, arr in columns.items()}
+
+        with self._lock(symbol, timeframe):
+            self._recover(symbol, timeframe)
+            directory = self._current_dir(symbol, timeframe)
+            if directory is None:
+                directory = self._new_version(symbol, timeframe)
+                self._point_to(symbol, timeframe, directory)
+
+            length = self._column_len(directory, 'timestamp')
+            last = self.last_timestamp(symbol, timeframe)
+            if last is not None:
+                keep = timestamps > last
+                columns = {c: arr[keep] for c, arr in columns.items()}
+
+            count = len(columns['timestamp'])
+            if count == 0:
+                return 0
+
+            # Colunas de dados primeiro, timestamp por último (commit)
+            for column in DATA_COLUMNS + ['timestamp']:
+                path = self._path(directory, column)
+                with open(path, 'ab') as f:
+                    # Descartar restos de uma escrita interrompida
+                    f.truncate(length * COLUMNS[column].itemsize)
+                    f.write(columns[column].tobytes())
+
+            return count
+
+    def prepend(
+        self,
+        symbol: str,
+        timeframe: str,
+        candles: Union[pd.DataFrame, List[List[float]]]
+    ) -> int:
+        """
+        Inserir candles mais antigos no início da série
+
+        Reescreve a série em uma versão nova e troca o link no final, então
+        leitores veem a versão antiga ou a nova inteira, nunca colunas
+        desalinhadas nem a série ausente.
+        Custo O(n): use em lotes grandes (ex: backfill para trás).
+
+        Returns:
+            Número de candles gravados
+        """
+        columns = self._to_columns(candles)
+        timestamps, index = np.unique(columns['timestamp'], return_index=True)
+        columns = {c: arr[index] for c, arr in columns.items()}
+
+        with self._lock(symbol, timeframe):
+            self._recover(symbol, timeframe)
+            first = self.first_timestamp(symbol, timeframe)
+            if first is not None:
+                keep = timestamps < first
+                columns = {c: arr[keep] for c, arr in columns.items()}
+
+            count = len(columns['timestamp'])
+            if count == 0:
+                return 0
+
+            previous = self._current_dir(symbol, timeframe)
+            current = self.open(symbol, timeframe)
+            version = self._new_version(symbol, timeframe)
+            for column in COLUMNS:
+                with open(self._path(version, column), 'wb') as f:
+                    f.write(columns[column].tobytes())
+                    f.write(np.asarray(current[column]).tobytes())
+
+            self._point_to(symbol, timeframe, version)
+            # Memmaps já abertos continuam válidos (o arquivo só some no close)
+            if previous is not None:
+                shutil.rmtree(previous, ignore_errors=True)
+
+            return count
+
+
+# Instância global
+candle_store = CandleStore()
@@ -0,0 +1,126 @@
+"""
+Dados de gráfico (candles + séries de indicadores) a partir do arquivo
+local de candles (app/services/candle_store.py, preenchido pelo backfill)
+
+Os indicadores são calculados sobre o intervalo pedido mais os candles de
+aquecimento anteriores a ele (mesmo lookback usado na análise), e depois
+o intervalo é reduzido a no máximo `points` pontos (app/services/downsampling.py):
+o payload tem o mesmo tamanho para um dia ou dois anos de candles.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from app.config import settings
+from app.services.cache import TTLCache
+from app.services.candle_store import candle_store, COLUMNS
+from app.services.downsampling import aggregate_ohlcv, downsample_line, METHODS
+from app.services.technical_analysis import technical_analysis, resolve_indicators, INDICATORS
+
+_chart_cache = TTLCache(maxsize=256, ttl=settings.CHART_CACHE_TTL_SECONDS)
+
+
+class ChartError(Exception):
+    """Parâmetros inválidos"""
+
+
+class ChartNotFound(ChartError):
+    """Sem candles no arquivo local para o par/timeframe"""
+
+
+def to_ms(value: Optional[datetime]) -> Optional[int]:
+    """Datetime -> timestamp em ms (sem fuso = UTC, como os candles)"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _lists(columns: Dict[str, np.ndarray]) -> Dict[str, List]:
+    return {name: values.tolist() for name, values in columns.items()}
+
+
+def build_chart(
+    symbol: str,
+    timeframe: str,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    points: int = 1000,
+    indicators: Optional[List[str]] = None,
+    method: str = "lttb"
+) -> Dict:
+    """
+    Candles e indicadores de um intervalo, reduzidos para o gráfico
+    
+    Args:
+        symbol: Par como gravado pelo backfill (ex: 'BTC/USDT:USDT')
+        timeframe: Timeframe
+        start: Timestamp inicial em ms (inclusive; None = início do arquivo)
+        end: Timestamp final em ms (exclusivo; None = último candle)
+        points: Máximo de pontos por série
+        indicators: Indicadores (None = todos os registrados)
+        method: Redução das linhas: lttb ou minmax
+    
+    Returns:
+        Dicionário com candles e indicadores em colunas (timestamps em ms)
+    
+    Raises:
+        ChartNotFound: par/timeframe sem candles no arquivo
+        ChartError: indicador/método desconhecido ou intervalo grande demais
+    """
+    if method not in METHODS:
+        raise ChartError(f"Método deve ser um de: {', '.join(METHODS)}")
+    if not 2 <= points <= settings.CHART_MAX_POINTS:
+        raise ChartError(f"Pontos deve estar entre 2 e {settings.CHART_MAX_POINTS}")
+    names = list(INDICATORS) if indicators is None else indicators
+    try:
+        ordered = resolve_indicators(names)
+    except ValueError as e:
+        raise ChartError(str(e))
+    
+    key = (symbol, timeframe, start, end, points, tuple(names), method)
+    cached = _chart_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    series = candle_store.open(symbol, timeframe)
+    if series.empty:
+        raise ChartNotFound(f"Sem candles de {symbol} {timeframe} no arquivo local")
+    
+    timestamps = series['timestamp']
+    lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+    if hi - lo > settings.CHART_MAX_CANDLES:
+        raise ChartError(
+            f"Intervalo com {hi - lo} candles (máximo {settings.CHART_MAX_CANDLES}); use um timeframe maior"
+        )
+    
+    # Candles de aquecimento antes do intervalo (mesmo cálculo da análise)
+    warmup = technical_analysis.required_candles(ordered) if ordered else 0
+    first = max(0, lo - warmup)
+    df = pd.DataFrame({column: np.array(series[column][first:hi]) for column in COLUMNS})
+    if ordered:
+        technical_analysis.calculate_indicators(df, ordered)
+    df = df.iloc[lo - first:]
+    
+    x = df['timestamp'].to_numpy()
+    candles = aggregate_ohlcv({column: df[column].to_numpy() for column in COLUMNS}, points)
+    lines = {
+        name: _lists(downsample_line(x, df[name].to_numpy(), points, method))
+        for name in names
+    }
+    
+    chart = {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "inicio": int(x[0]) if len(x) else None,
+        "fim": int(x[-1]) if len(x) else None,
+        "candles_total": len(df),
+        "pontos": len(candles['timestamp']),
+        "metodo": method,
+        "candles": _lists(candles),
+        "indicadores": lines
+    }
+    _chart_cache.set(key, chart)
+    return chart
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""
+Correlação móvel entre símbolos e supressão de sinais redundantes
+
+Mantém, por timeframe, um buffer circular com os log-retornos dos
+últimos N candles fechados de cada símbolo e somas mascaradas por par:
+    
+    N = Mᵀ·M    S = Xᵀ·M    Q = (X²)ᵀ·M    P = Xᵀ·X
+
+(X = retornos com 0 onde falta dado, M = 1 onde há dado). A correlação de
+Pearson de cada par sai dessas somas usando só os candles que os dois
+têm em comum. Cada ciclo só retira a contribuição antiga das linhas
+(candles) que mudaram e soma a nova: O(k·n²) para k candles novos, em
+vez de recalcular a janela inteira.
+"""
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+
+
+def closed_returns(df: pd.DataFrame, timeframe_ms: int, now_ms: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Log-retornos dos candles fechados de um DataFrame OHLCV
+    
+    Returns:
+        (timestamps em ms, retornos) só de candles consecutivos
+    """
+    timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    closes = df['close'].to_numpy(dtype=float)
+    
+    # O último candle ainda está aberto enquanto ts + timeframe > agora
+    closed = timestamps + timeframe_ms <= now_ms
+    timestamps, closes = timestamps[closed], closes[closed]
+    if len(closes) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(closes[1:] / closes[:-1])
+    consecutive = (np.diff(timestamps) == timeframe_ms) & np.isfinite(returns)
+    return timestamps[1:][consecutive], returns[consecutive]
+
+
+class RollingCorrelation:
+    """
+    Matriz de correlação móvel de um timeframe
+    
+    Args:
+        timeframe_ms: Duração do candle em ms
+        window: Candles na janela
+        min_periods: Candles em comum mínimos para um par ter correlação
+    """
+    
+    def __init__(self, timeframe_ms: int, window: int = 200, min_periods: int = 30):
+        self.timeframe_ms = timeframe_ms
+        self.window = window
+        self.min_periods = min_periods
+        self.index: Dict[str, int] = {}
+        
+        # Buffer circular: slot = (ts // timeframe) % window
+        self.slot_ts = np.full(window, -1, dtype=np.int64)
+        self.returns = np.full((window, 0), np.nan)
+        self.last_ts = np.empty(0, dtype=np.int64)  # Último candle registrado por símbolo
+        
+        self.N = np.zeros((0, 0))
+        self.S = np.zeros((0, 0))
+        self.Q = np.zeros((0, 0))
+        self.P = np.zeros((0, 0))
+        
+        self._changed_rows = 0
+        self._lock = threading.Lock()
+    
+    def _grow(self, symbols: List[str]):
+        new = [s for s in symbols if s not in self.index]
+        if not new:
+            return
+        for symbol in new:
+            self.index[symbol] = len(self.index)
+        n, k = len(self.index), len(new)
+        
+        # Símbolos novos entram sem dados: somas zeradas
+        self.returns = np.hstack([self.returns, np.full((self.window, k), np.nan)])
+        self.last_ts = np.concatenate([self.last_ts, np.full(k, -1, dtype=np.int64)])
+        for name in ("N", "S", "Q", "P"):
+            old = getattr(self, name)
+            grown = np.zeros((n, n))
+            grown[:n - k, :n - k] = old
+            setattr(self, name, grown)
+    
+    def _accumulate(self, rows: np.ndarray, sign: float):
+        block = self.returns[rows]
+        mask = (~np.isnan(block)).astype(float)
+        values = np.where(mask > 0, block, 0.0)
+        self.N += sign * (mask.T @ mask)
+        self.S += sign * (values.T @ mask)
+        self.Q += sign * ((values * values).T @ mask)
+        self.P += sign * (values.T @ values)
+    
+    def _rebuild(self):
+        """Recalcular as somas do zero (evita acúmulo de erro de arredondamento)"""
+        n = len(self.index)
+        for name in ("N", "S", "Q", "P"):
+            setattr(self, name, np.zeros((n, n)))
+        self._accumulate(np.arange(self.window), 1.0)
+        self._changed_rows = 0
+    
+    def update(self, series: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+        """
+        Incorporar retornos novos (de closed_returns) de vários símbolos
+        
+        Candles já registrados são ignorados; candles mais novos que o
+        slot ocupam o lugar do candle antigo (que sai da janela).
+        """
+        with self._lock:
+            self._grow(list(series))
+            
+            latest = max((int(ts[-1]) for ts, _ in series.values() if len(ts)), default=None)
+            if latest is None:
+                return
+            oldest = latest - (self.window - 1) * self.timeframe_ms
+            
+            # Juntar as mudanças por slot antes de tocar nas somas
+            changes: Dict[int, List[Tuple[int, float]]] = {}
+            new_ts: Dict[int, int] = {}
+            for symbol, (timestamps, returns) in series.items():
+                column = self.index[symbol]
+                # Só candles depois do último já registrado (no ciclo típico, 1 por símbolo)
+                recent = timestamps >= max(oldest, int(self.last_ts[column]) + 1)
+                for ts, value in zip(timestamps[recent].tolist(), returns[recent].tolist()):
+                    slot = (ts // self.timeframe_ms) % self.window
+                    current = new_ts.get(slot, int(self.slot_ts[slot]))
+                    if ts < current:
+                        continue  # Candle que já saiu da janela
+                    if ts > current:
+                        # Candle novo no slot: descarta o que havia para o antigo
+                        new_ts[slot] = ts
+                        changes[slot] = []
+                    elif slot not in new_ts and not np.isnan(self.returns[slot, column]):
+                        continue  # Já registrado
+                    changes.setdefault(slot, []).append((column, value))
+            
+            if not changes:
+                return
+            
+            rows = np.fromiter(changes, dtype=np.int64)
+            self._accumulate(rows, -1.0)
+            for slot, values in changes.items():
+                if slot in new_ts:
+                    self.slot_ts[slot] = new_ts[slot]
+                    self.returns[slot] = np.nan
+                for column, value in values:
+                    self.returns[slot, column] = value
+            for symbol, (timestamps, _) in series.items():
+                if len(timestamps):
+                    column = self.index[symbol]
+                    self.last_ts[column] = max(self.last_ts[column], timestamps[-1])
+            self._accumulate(rows, 1.0)
+            
+            self._changed_rows += len(rows)
+            if self._changed_rows >= self.window:
+                self._rebuild()
+    
+    def matrix(self, symbols: List[str]) -> np.ndarray:
+        """
+        Correlação entre os símbolos pedidos (NaN se faltar histórico em comum)
+        """
+        with self._lock:
+            size = len(symbols)
+            known = [i for i, s in enumerate(symbols) if s in self.index]
+            idx = np.array([self.index[symbols[i]] for i in known], dtype=np.int64)
+            N = self.N[np.ix_(idx, idx)]
+            S = self.S[np.ix_(idx, idx)]
+            Q = self.Q[np.ix_(idx, idx)]
+            P = self.P[np.ix_(idx, idx)]
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_i = S / N
+            mean_j = S.T / N
+            var_i = Q / N - mean_i ** 2
+            var_j = Q.T / N - mean_j ** 2
+            cov = P / N - mean_i * mean_j
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[(N < self.min_periods) | ~np.isfinite(corr)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        
+        result = np.full((size, size), np.nan)
+        result[np.ix_(known, known)] = corr
+        np.fill_diagonal(result, 1.0)
+        return result
+
+
+class CorrelationTracker:
+    """
+    Uma RollingCorrelation por timeframe
+    """
+    
+    def __init__(self, window: int, min_periods: int):
+        self.window = window
+        self.min_periods = min_periods
+        self._matrices: Dict[str, RollingCorrelation] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, timeframe: str, timeframe_ms: int) -> RollingCorrelation:
+        with self._lock:
+            if timeframe not in self._matrices:
+                self._matrices[timeframe] = RollingCorrelation(timeframe_ms, self.window, self.min_periods)
+            return self._matrices[timeframe]
+    
+    def update(self, timeframe: str, timeframe_ms: int, frames: Dict[str, pd.DataFrame], now_ms: int):
+        """Atualizar com os DataFrames OHLCV que o lote já buscou"""
+        series = {
+            symbol: closed_returns(df, timeframe_ms, now_ms)
+            for symbol, df in frames.items()
+        }
+        self.get(timeframe, timeframe_ms).update(series)
+    
+    def matrix(self, timeframe: str, symbols: List[str]) -> Optional[np.ndarray]:
+        correlation = self._matrices.get(timeframe)
+        return correlation.matrix(symbols) if correlation else None
+
+
+def suppress_correlated(signals: List[Dict], corr: np.ndarray, threshold: float) -> List[Dict]:
+    """
+    Manter um sinal por grupo de símbolos correlacionados
+    
+    Guloso pela probabilidade: o melhor sinal abre um grupo e os demais
+    que apontam para o mesmo trade (mesma direção com correlação >=
+    threshold, ou direção oposta com correlação <= -threshold) são
+    descartados.
+    
+    Args:
+        signals: Sinais do lote, na mesma ordem das linhas de corr
+        corr: Matriz de correlação entre os símbolos dos sinais
+        threshold: Correlação mínima para considerar o mesmo trade
+    
+    Returns:
+        Sinais mantidos, do mais provável para o menos
+    """
+    order = sorted(range(len(signals)), key=lambda i: signals[i]["probabilidade"], reverse=True)
+    kept: List[int] = []
+    for i in order:
+        redundant = False
+        for j in kept:
+            same_direction = signals[i]["tipo"] == signals[j]["tipo"]
+            value = corr[i, j] if same_direction else -corr[i, j]
+            if value >= threshold:
+                redundant = True
+                break
+        if not redundant:
+            kept.append(i)
+    return [signals[i] for i in kept]
+
+
+# Instância global
+correlation_tracker = CorrelationTracker(
+    window=settings.CORRELATION_WINDOW,
+    min_periods=settings.CORRELATION_MIN_PERIODS
+)
\ No newline at end of file
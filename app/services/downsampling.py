@@ -0,0 +1,141 @@
+"""
+Redução de séries para gráficos (menos pontos, mesma forma visual)
+
+- candles: agregação OHLC em baldes de candles consecutivos (abertura do
+  primeiro, máxima/mínima do balde, fechamento do último, volume somado)
+- linhas (indicadores): LTTB (Largest-Triangle-Three-Buckets), que mantém
+  os pontos de maior área visual, ou min/max por balde, que preserva
+  todos os extremos (útil para picos de RSI/volume)
+
+Tudo em numpy; os índices devolvidos são crescentes.
+"""
+from typing import Dict
+import numpy as np
+
+METHOD_LTTB = "lttb"
+METHOD_MINMAX = "minmax"
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+
+def bucket_edges(length: int, buckets: int) -> np.ndarray:
+    """Limites [início, fim) de até `buckets` baldes de tamanho quase igual"""
+    buckets = max(1, min(buckets, length))
+    return np.unique(np.linspace(0, length, buckets + 1).astype(np.int64))
+
+
+def aggregate_ohlcv(columns: Dict[str, np.ndarray], points: int) -> Dict[str, np.ndarray]:
+    """
+    Juntar candles consecutivos em até `points` candles
+    
+    Args:
+        columns: timestamp, open, high, low, close, volume (arrays do mesmo tamanho)
+        points: Máximo de candles na saída
+    
+    Returns:
+        Colunas agregadas (timestamp = abertura do primeiro candle do balde)
+    """
+    length = len(columns['timestamp'])
+    if length <= points:
+        return {name: np.asarray(values) for name, values in columns.items()}
+    edges = bucket_edges(length, points)
+    starts, ends = edges[:-1], edges[1:]
+    return {
+        'timestamp': np.asarray(columns['timestamp'])[starts],
+        'open': np.asarray(columns['open'])[starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': np.asarray(columns['close'])[ends - 1],
+        'volume': np.add.reduceat(columns['volume'], starts),
+    }
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Índices escolhidos pelo Largest-Triangle-Three-Buckets
+    
+    Primeiro e último ponto sempre entram; os demais baldes escolhem o
+    ponto que forma o maior triângulo com o ponto escolhido no balde
+    anterior e a média do balde seguinte.
+    """
+    length = len(y)
+    if points >= length:
+        return np.arange(length)
+    if points < 3:
+        return np.array([0, length - 1])
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Baldes internos (sem o primeiro e o último ponto)
+    edges = np.linspace(1, length - 1, points - 1).astype(np.int64)
+    
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    previous = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = length - 1, length
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        px, py = x[previous], y[previous]
+        area = np.abs(
+            (px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py)
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """
+    Índices do mínimo e do máximo de cada balde (points / 2 baldes), em ordem
+    """
+    length = len(y)
+    if points >= length:
+        return np.arange(length)
+    
+    y = np.asarray(y, dtype=np.float64)
+    edges = bucket_edges(length, max(1, points // 2))
+    starts = edges[:-1]
+    bucket = np.repeat(np.arange(len(starts)), np.diff(edges))
+    
+    def first_match(extremes: np.ndarray) -> np.ndarray:
+        # Primeira posição de cada balde com o valor extremo do balde
+        hits = np.flatnonzero(y == extremes[bucket])
+        _, first = np.unique(bucket[hits], return_index=True)
+        return hits[first]
+    
+    lowest = first_match(np.minimum.reduceat(y, starts))
+    highest = first_match(np.maximum.reduceat(y, starts))
+    return np.unique(np.concatenate([lowest, highest]))
+
+
+def downsample_line(
+    x: np.ndarray,
+    y: np.ndarray,
+    points: int,
+    method: str = METHOD_LTTB
+) -> Dict[str, np.ndarray]:
+    """
+    Reduzir uma linha (ex: indicador) a no máximo `points` pontos
+    
+    Valores NaN (aquecimento do indicador) são descartados antes.
+    
+    Returns:
+        {"timestamp": x escolhidos, "value": y escolhidos}
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    valid = np.isfinite(y)
+    if not valid.all():
+        x, y = x[valid], y[valid]
+    
+    if method == METHOD_MINMAX:
+        index = minmax(y, points)
+    else:
+        index = lttb(x, y, points)
+    return {"timestamp": x[index], "value": y[index]}
\ No newline at end of file
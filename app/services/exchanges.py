@@ -0,0 +1,312 @@
+"""
+Adaptadores de exchange e fan-out concorrente
+
+ExchangeAdapter envolve qualquer objeto com a interface do ccxt usada
+aqui (fetch_ticker, fetch_tickers, fetch_ohlcv, milliseconds,
+parse_timeframe) e controla a saúde dele. MultiExchange expõe a mesma
+interface sobre várias exchanges, consultadas em paralelo:
+
+- "first": devolve a primeira resposta bem-sucedida
+- "merge": espera as respostas (até o timeout) e combina ponderando
+  pelo volume de cada exchange
+
+Por ter a mesma interface, MultiExchange entra no lugar de
+binance_service.exchange sem mudar o resto do código, e pode ser
+testada só com exchanges locais (benchmarks/fake_exchange.py).
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Optional
+import ccxt
+from app.services.resilience import is_outage
+
+FANOUT_FIRST = "first"
+FANOUT_MERGE = "merge"
+
+# Opções por exchange para usar o mercado de perpétuos USDT
+EXCHANGE_OPTIONS = {
+    "binance": {"defaultType": "future"},
+    "bybit": {"defaultType": "swap"},
+    "okx": {"defaultType": "swap"},
+    "bitget": {"defaultType": "swap"},
+}
+
+
+class ExchangeAdapter:
+    """
+    Uma exchange com controle de saúde
+    
+    Depois de max_failures quedas seguidas (resilience.is_outage) a
+    exchange fica fora do fan-out por cooldown segundos.
+    
+    Args:
+        exchange: Objeto com a interface do ccxt
+        max_failures: Quedas seguidas até marcar como indisponível
+        cooldown: Segundos fora do fan-out
+    """
+    
+    def __init__(self, exchange, max_failures: int = 3, cooldown: float = 30):
+        self.exchange = exchange
+        self.id = getattr(exchange, "id", type(exchange).__name__)
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.failures = 0
+        self.unhealthy_until = 0.0
+        self.latency: Optional[float] = None  # Média móvel em segundos
+        self._lock = threading.Lock()
+    
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+    
+    def call(self, method: str, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            result = getattr(self.exchange, method)(*args, **kwargs)
+        except Exception as e:
+            # Erro de negócio (par inválido etc.) não diz nada sobre a saúde
+            if not is_outage(e):
+                raise
+            with self._lock:
+                self.failures += 1
+                if self.failures >= self.max_failures:
+                    self.unhealthy_until = time.monotonic() + self.cooldown
+            raise
+        
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.failures = 0
+            self.unhealthy_until = 0.0
+            self.latency = elapsed if self.latency is None else 0.8 * self.latency + 0.2 * elapsed
+        return result
+    
+    def status(self) -> Dict:
+        return {
+            "id": self.id,
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+        }
+
+
+def fetch_ohlcv_paged(
+    adapter: ExchangeAdapter,
+    symbol: str,
+    timeframe: str,
+    since: Optional[int] = None,
+    limit: Optional[int] = None,
+    max_pages: int = 10
+) -> List[List[float]]:
+    """
+    fetch_ohlcv em páginas até `limit` candles
+    
+    Cada exchange tem seu máximo por requisição (ex: 1500 na Binance,
+    300 na OKX); sem paginar, a resposta menor cortaria o merge.
+    Sem since, pagina para trás a partir do candle mais antigo.
+    """
+    candles = adapter.call("fetch_ohlcv", symbol, timeframe, since=since, limit=limit)
+    if not limit or not candles:
+        return candles
+    
+    step = adapter.exchange.parse_timeframe(timeframe) * 1000
+    page_size = len(candles)  # Máximo observado da exchange
+    for _ in range(max_pages):
+        missing = limit - len(candles)
+        if missing <= 0:
+            break
+        if since is None:
+            # Página que termina logo antes do candle mais antigo (sem buraco)
+            oldest = candles[0][0]
+            size = min(missing, page_size)
+            page = adapter.call("fetch_ohlcv", symbol, timeframe, since=oldest - size * step, limit=size)
+            page = [c for c in page if c[0] < oldest]
+            candles = page + candles
+        else:
+            newest = candles[-1][0]
+            page = adapter.call("fetch_ohlcv", symbol, timeframe, since=newest + step, limit=missing)
+            page = [c for c in page if c[0] > newest]
+            candles = candles + page
+        if not page:
+            break  # Histórico acabou
+    return candles[-limit:] if since is None else candles[:limit]
+
+
+def create_ccxt_exchange(exchange_id: str):
+    """Instanciar uma exchange do ccxt (dados públicos, sem throttle próprio)"""
+    exchange_class = getattr(ccxt, exchange_id)
+    return exchange_class({
+        'enableRateLimit': False,
+        'options': dict(EXCHANGE_OPTIONS.get(exchange_id, {})),
+    })
+
+
+def merge_tickers(responses: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Combinar snapshots de tickers de várias exchanges
+    
+    Preço, variação, máxima e mínima ponderados pelo quoteVolume de cada
+    exchange; volumes somados.
+    """
+    merged: Dict[str, Dict] = {}
+    for symbol in {s for tickers in responses for s in tickers}:
+        tickers = [t[symbol] for t in responses if symbol in t]
+        if len(tickers) == 1:
+            merged[symbol] = tickers[0]
+            continue
+        
+        weights = [t.get('quoteVolume') or 0 for t in tickers]
+        if not sum(weights):
+            weights = [1] * len(tickers)
+        
+        ticker = dict(tickers[0])
+        for field in ('last', 'close', 'high', 'low', 'percentage'):
+            pairs = [(t.get(field), w) for t, w in zip(tickers, weights) if t.get(field) is not None]
+            total = sum(w for _, w in pairs)
+            if total:
+                ticker[field] = sum(v * w for v, w in pairs) / total
+        for field in ('quoteVolume', 'baseVolume'):
+            values = [t.get(field) for t in tickers if t.get(field) is not None]
+            if values:
+                ticker[field] = sum(values)
+        merged[symbol] = ticker
+    return merged
+
+
+def merge_ohlcv(responses: List[List[List[float]]]) -> List[List[float]]:
+    """
+    Combinar candles de várias exchanges
+    
+    Respostas que não cobrem o período da mais longa (par listado há
+    pouco, histórico curto) ficam de fora, para não encurtar a série.
+    Entre as demais, só entram timestamps presentes em todas; OHLC
+    ponderado pelo volume de cada exchange, volume somado.
+    """
+    longest = max(responses, key=len)
+    first, last = longest[0][0], longest[-1][0]
+    responses = [c for c in responses if c and c[0][0] <= first and c[-1][0] >= last]
+    
+    by_timestamp = [{int(c[0]): c for c in candles} for candles in responses]
+    common = set(by_timestamp[0])
+    for candles in by_timestamp[1:]:
+        common &= set(candles)
+    
+    merged = []
+    for ts in sorted(common):
+        rows = [candles[ts] for candles in by_timestamp]
+        volume = sum(r[5] for r in rows)
+        weights = [r[5] / volume for r in rows] if volume else [1 / len(rows)] * len(rows)
+        merged.append(
+            [ts] + [sum(r[i] * w for r, w in zip(rows, weights)) for i in range(1, 5)] + [volume]
+        )
+    return merged
+
+
+class MultiExchange:
+    """
+    Várias exchanges atrás da interface do ccxt
+    
+    Args:
+        adapters: Exchanges, em ordem de preferência
+        mode: FANOUT_FIRST ou FANOUT_MERGE
+        timeout: Espera máxima por respostas em segundos
+    """
+    
+    def __init__(self, adapters: List[ExchangeAdapter], mode: str = FANOUT_FIRST, timeout: float = 10):
+        if not adapters:
+            raise ValueError("MultiExchange precisa de pelo menos uma exchange")
+        if mode not in (FANOUT_FIRST, FANOUT_MERGE):
+            raise ValueError(f"Modo de fan-out desconhecido: {mode}")
+        self.adapters = adapters
+        self.mode = mode
+        self.timeout = timeout
+        self.id = "+".join(a.id for a in adapters)
+        self._pool = ThreadPoolExecutor(max_workers=max(4, 4 * len(adapters)), thread_name_prefix="exchange")
+    
+    # Utilitários do ccxt vêm da exchange preferida
+    def milliseconds(self) -> int:
+        return self.adapters[0].exchange.milliseconds()
+    
+    def parse_timeframe(self, timeframe: str) -> int:
+        return self.adapters[0].exchange.parse_timeframe(timeframe)
+    
+    def status(self) -> List[Dict]:
+        return [adapter.status() for adapter in self.adapters]
+    
+    def _targets(self) -> List[ExchangeAdapter]:
+        healthy = [a for a in self.adapters if a.healthy]
+        # Se todas estiverem fora, tentar todas mesmo assim
+        return healthy or self.adapters
+    
+    def _fanout(self, method: str, merge: Callable, *args, **kwargs):
+        return self._gather(method, merge, lambda adapter: adapter.call(method, *args, **kwargs))
+    
+    def _gather(self, method: str, merge: Callable, fetch: Callable[[ExchangeAdapter], object]):
+        futures = {
+            self._pool.submit(fetch, adapter): adapter
+            for adapter in self._targets()
+        }
+        deadline = time.monotonic() + self.timeout
+        results = []
+        error: Optional[Exception] = None
+        pending = set(futures)
+        
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if not result:
+                    continue
+                if self.mode == FANOUT_FIRST:
+                    return result
+                results.append(result)
+        
+        if results:
+            return results[0] if len(results) == 1 else merge(results)
+        if error is not None:
+            raise error
+        if pending:
+            raise ccxt.RequestTimeout(f"Sem resposta das exchanges em {self.timeout}s ({method})")
+        # Todas responderam vazio
+        return next(iter(futures)).result()
+    
+    def fetch_ticker(self, symbol: str) -> Dict:
+        return self._fanout("fetch_ticker", lambda r: merge_tickers([{symbol: t} for t in r])[symbol], symbol)
+    
+    def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict]:
+        if symbols is None:
+            return self._fanout("fetch_tickers", merge_tickers)
+        return self._fanout("fetch_tickers", merge_tickers, symbols)
+    
+    def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "1h",
+        since: Optional[int] = None,
+        limit: Optional[int] = None
+    ) -> List[List[float]]:
+        return self._gather(
+            "fetch_ohlcv",
+            merge_ohlcv,
+            lambda adapter: fetch_ohlcv_paged(adapter, symbol, timeframe, since=since, limit=limit)
+        )
+
+
+def create_exchange(exchange_ids: List[str], mode: str = FANOUT_FIRST, timeout: float = 10, cooldown: float = 30):
+    """
+    Exchange usada pelo BinanceService
+    
+    Com uma só exchange devolve o objeto do ccxt direto (sem fan-out);
+    com várias, um MultiExchange.
+    """
+    if len(exchange_ids) == 1:
+        return create_ccxt_exchange(exchange_ids[0])
+    adapters = [ExchangeAdapter(create_ccxt_exchange(e), cooldown=cooldown) for e in exchange_ids]
+    return MultiExchange(adapters, mode=mode, timeout=timeout)
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+Partições mensais da tabela signals (Postgres)
+
+A tabela é criada com PARTITION BY RANGE (criado_em); cada mês vira
+uma tabela signals_AAAA_MM e uma partição DEFAULT recebe o que cair
+fora das partições existentes. Consultas com limite em criado_em são
+podadas pelo planner para as partições do intervalo.
+
+Linhas de um mês que caíram na DEFAULT (partição ainda não existia)
+são movidas para a partição do mês quando ela é criada, e a retenção
+também arquiva/apaga as linhas antigas que estiverem na DEFAULT.
+
+No SQLite (testes/dev) a tabela é simples e as funções daqui viram no-op,
+exceto a retenção, que apaga por intervalo de datas.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from app.config import settings
+
+TABLE = "signals"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """Primeiro dia do mês de value, deslocado offset meses"""
+    index = value.year * 12 + value.month - 1 + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_{month.year:04d}_{month.month:02d}"
+
+
+def is_partitioned(engine: Engine) -> bool:
+    """Tabela signals existe e é particionada (relkind 'p')"""
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.connect() as conn:
+        kind = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+            {"name": TABLE}
+        ).scalar()
+    return kind == "p"
+
+
+def list_partitions(engine: Engine) -> List[Tuple[str, date]]:
+    """Partições mensais existentes, em ordem: [(nome, primeiro dia do mês)]"""
+    if not is_partitioned(engine):
+        return []
+    with engine.connect() as conn:
+        names = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :name"
+        ), {"name": TABLE}).scalars().all()
+    
+    partitions = []
+    for name in names:
+        try:
+            year, month = name[len(TABLE) + 1:].split("_")
+            partitions.append((name, date(int(year), int(month), 1)))
+        except ValueError:
+            continue  # signals_default ou partição criada à mão
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def ensure_partitions(engine: Engine, months_ahead: Optional[int] = None, today: Optional[date] = None) -> List[str]:
+    """
+    Criar partições do mês atual até months_ahead meses à frente (e a DEFAULT)
+    
+    Idempotente; chamar na inicialização e no job de retenção, para que
+    sempre exista a partição do próximo mês antes de ele começar.
+    
+    Returns:
+        Nomes das partições criadas agora
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    if not is_partitioned(engine):
+        print(f"⚠️ Tabela {TABLE} não é particionada; migre-a para usar partições mensais")
+        return []
+    
+    months_ahead = settings.SIGNAL_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    current = month_start(today or date.today())
+    existing = {name for name, _ in list_partitions(engine)}
+    
+    created = []
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+        for offset in range(months_ahead + 1):
+            start = month_start(current, offset)
+            name = partition_name(start)
+            if name in existing:
+                continue
+            _create_month_partition(conn, name, start, month_start(start, 1))
+            created.append(name)
+    return created
+
+
+def _create_month_partition(conn, name: str, start: date, end: date):
+    """
+    Criar a partição do mês; se a DEFAULT tiver linhas do intervalo
+    (o CREATE falharia), ela sai da tabela, as linhas vão para a
+    partição nova e ela volta, tudo na mesma transação
+    """
+    bounds = f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    where = "criado_em >= :start AND criado_em < :end"
+    params = {"start": start, "end": end}
+    has_rows = conn.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {where})"), params
+    ).scalar()
+    if not has_rows:
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {TABLE} FOR VALUES {bounds}"))
+        return
+    
+    conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    conn.execute(text(f"CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES {bounds}"))
+    conn.execute(text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {where}"), params)
+    conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {where}"), params)
+    conn.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def _archive_rows(conn, path: str, query: str, params: dict) -> int:
+    """Gravar as linhas em JSON Lines comprimido (via arquivo temporário; nada se vazio)"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        result = conn.execution_options(stream_results=True).execute(text(query), params)
+        for row in result.mappings():
+            f.write(json.dumps(dict(row), default=_json_default) + "\n")
+            count += 1
+    if count:
+        os.replace(tmp_path, path)
+    else:
+        os.remove(tmp_path)
+    return count
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo não serializável: {type(value)}")
+
+
+def archive_month(engine: Engine, month: date, archive_dir: Optional[str] = None) -> int:
+    """
+    Arquivar um mês em {archive_dir}/signals_AAAA_MM.jsonl.gz e removê-lo do banco
+    
+    Postgres: exporta a partição (e as linhas do mês na DEFAULT), faz
+    DETACH e DROP da partição (sem DELETE em massa) e apaga o mês da DEFAULT.
+    SQLite: exporta e apaga as linhas do intervalo.
+    
+    Returns:
+        Linhas arquivadas
+    """
+    archive_dir = archive_dir or settings.SIGNAL_ARCHIVE_DIR
+    name = partition_name(month)
+    path = os.path.join(archive_dir, f"{name}.jsonl.gz")
+    bounds = {"start": datetime.combine(month, datetime.min.time()),
+              "end": datetime.combine(month_start(month, 1), datetime.min.time())}
+    
+    where = "criado_em >= :start AND criado_em < :end"
+    
+    if is_partitioned(engine):
+        has_partition = name in {partition for partition, _ in list_partitions(engine)}
+        query = f"SELECT * FROM {DEFAULT_PARTITION} WHERE {where}"
+        if has_partition:
+            query = f"SELECT * FROM {name} UNION ALL {query}"
+        with engine.connect() as conn:
+            count = _archive_rows(conn, path, f"{query} ORDER BY id", bounds)
+        with engine.begin() as conn:
+            if has_partition:
+                conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+            conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {where}"), bounds)
+        return count
+    
+    with engine.connect() as conn:
+        count = _archive_rows(conn, path, f"SELECT * FROM {TABLE} WHERE {where} ORDER BY id", bounds)
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {TABLE} WHERE {where}"), bounds)
+    return count
+
+
+def expired_months(engine: Engine, retention_months: int, today: Optional[date] = None) -> List[date]:
+    """Meses inteiros anteriores à janela de retenção que ainda estão no banco"""
+    cutoff = month_start(today or date.today(), -retention_months)
+    
+    if is_partitioned(engine):
+        months = {month for _, month in list_partitions(engine) if month < cutoff}
+        # Linhas antigas que caíram na DEFAULT
+        with engine.connect() as conn:
+            stray = conn.execute(
+                text(
+                    f"SELECT DISTINCT date_trunc('month', criado_em)::date FROM {DEFAULT_PARTITION} "
+                    "WHERE criado_em < :cutoff"
+                ),
+                {"cutoff": cutoff}
+            ).scalars().all()
+        months.update(stray)
+        return sorted(months)
+    
+    with engine.connect() as conn:
+        oldest = conn.execute(text(f"SELECT MIN(criado_em) FROM {TABLE}")).scalar()
+    if oldest is None:
+        return []
+    if isinstance(oldest, str):
+        oldest = datetime.fromisoformat(oldest)
+    
+    months = []
+    month = month_start(oldest)
+    while month < cutoff:
+        months.append(month)
+        month = month_start(month, 1)
+    return months
\ No newline at end of file
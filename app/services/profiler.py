@@ -0,0 +1,211 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from app.config import settings
+
+# Folhas de pilha que indicam thread ociosa (não entram no perfil)
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+
+class ProfileSession:
+    """
+    Amostras coletadas durante uma requisição
+    """
+    
+    def __init__(self):
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+
+class StackSampler:
+    """
+    Profiler estatístico: uma thread lê as pilhas de todas as threads em
+    intervalo fixo enquanto houver pelo menos uma requisição sendo perfilada
+    
+    Captura também o trabalho síncrono que o FastAPI manda para a
+    threadpool (cProfile só enxergaria a thread do event loop). O perfil
+    cobre o processo inteiro durante a janela da requisição.
+    
+    Args:
+        interval: Intervalo entre amostras em segundos
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self) -> ProfileSession:
+        session = ProfileSession()
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return session
+    
+    def stop(self, session: ProfileSession):
+        """Depois de stop() a thread de amostragem não altera mais a sessão"""
+        with self._lock:
+            self._sessions.remove(session)
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+            
+            names = {t.ident: t.name for t in threading.enumerate()}
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._fold(frame)
+                if stack:
+                    stacks.append(f"{names.get(thread_id, thread_id)};{stack}")
+            
+            # Sob o lock: só sessões ainda ativas (stop() já pode ter
+            # devolvido a sessão para ser salva)
+            with self._lock:
+                for session in self._sessions:
+                    session.samples += 1
+                    session.stacks.update(stacks)
+            
+            time.sleep(self.interval)
+    
+    def _fold(self, frame) -> Optional[str]:
+        """
+        Pilha no formato "folded" (raiz;...;folha), usado por flamegraph/speedscope
+        """
+        leaf = (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name)
+        if leaf in IDLE_LEAVES:
+            return None
+        
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(frames))
+
+
+class ProfileStore:
+    """
+    Diretório rotativo de perfis (mantém só os N mais recentes)
+    """
+    
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+    
+    def save(self, method: str, path: str, status: int, duration_ms: float, session: ProfileSession) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+        name = f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}_{method}_{slug}_{int(duration_ms)}ms.folded"
+        
+        with open(os.path.join(self.directory, name), "w") as f:
+            f.write(f"# {method} {path} status={status} duration_ms={duration_ms:.1f} samples={session.samples}\n")
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        
+        self._rotate()
+        return name
+    
+    def _rotate(self):
+        files = self.list()
+        for item in files[self.max_files:]:
+            try:
+                os.remove(os.path.join(self.directory, item["name"]))
+            except FileNotFoundError:
+                pass
+    
+    def list(self) -> List[Dict]:
+        """Perfis salvos, do mais recente para o mais antigo"""
+        if not os.path.isdir(self.directory):
+            return []
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".folded"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append({
+                "name": name,
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat()
+            })
+        return sorted(files, key=lambda f: f["name"], reverse=True)
+    
+    def path(self, name: str) -> Optional[str]:
+        """Caminho de um perfil pelo nome (None se inválido ou inexistente)"""
+        if os.path.basename(name) != name or not name.endswith(".folded"):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila uma fração das requisições
+    
+    Uma requisição é perfilada se a rota casar com PROFILING_ROUTES ou
+    se for sorteada por PROFILING_SAMPLE_RATE. O perfil só é salvo se a
+    requisição levar pelo menos PROFILING_MIN_DURATION_MS.
+    Só é registrado em app/main.py quando PROFILING_ENABLED=true, então
+    desligado não tem custo nenhum.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.routes = [r.strip() for r in settings.PROFILING_ROUTES.split(",") if r.strip()]
+        self.min_duration_ms = settings.PROFILING_MIN_DURATION_MS
+    
+    def _should_profile(self, path: str) -> bool:
+        if any(path.startswith(route) for route in self.routes):
+            return True
+        return random.random() < self.sample_rate
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        
+        status = {"code": 0}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+        
+        session = sampler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop(session)
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.min_duration_ms and session.samples:
+                # Escrita em disco fora do event loop
+                await run_in_threadpool(
+                    profile_store.save, scope["method"], scope["path"], status["code"], duration_ms, session
+                )
+
+
+# Instâncias globais
+sampler = StackSampler(interval=settings.PROFILING_INTERVAL_MS / 1000)
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
\ No newline at end of file
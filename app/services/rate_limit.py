@@ -0,0 +1,340 @@
+"""
+Limite de requisições por cliente, ponderado pelo custo da rota
+
+Cada cliente (usuário do JWT, ou IP sem token válido) tem um token
+bucket de RATE_LIMIT_CAPACITY que repõe RATE_LIMIT_REFILL_PER_SECOND
+por segundo. Cada requisição consome o custo da rota (RATE_LIMIT_COSTS,
+pelo prefixo mais longo): uma geração de top 10 gasta o mesmo que
+dezenas de leituras simples, então poucos clientes não esgotam a cota
+da exchange nem a CPU. Sem saldo: 429 com Retry-After.
+
+Buckets em memória (por processo) ou, com RATE_LIMIT_REDIS_URL, no Redis
+(compartilhado entre workers/instâncias; script Lua atômico com o relógio
+do Redis). Se o Redis falhar, a requisição usa o bucket em memória; depois
+de algumas falhas seguidas um disjuntor deixa o Redis de lado por
+RATE_LIMIT_REDIS_RETRY_SECONDS (sem pagar o timeout em cada requisição).
+"""
+import json
+import logging
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from app.config import settings
+from app.services.auth_service import verify_token
+from app.services.resilience import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+# (permitido, saldo restante, segundos até ter saldo)
+Decision = Tuple[bool, float, float]
+
+
+def parse_costs(spec: str) -> List[Tuple[str, float]]:
+    """
+    "prefixo=custo,..." -> [(prefixo, custo)] do prefixo mais longo para o mais curto
+    """
+    costs = []
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        prefix, cost = item.rsplit("=", 1)
+        costs.append((prefix.strip(), float(cost)))
+    return sorted(costs, key=lambda rule: -len(rule[0]))
+
+
+class MemoryBuckets:
+    """
+    Token buckets em memória (LRU limitado a max_clients)
+    """
+    
+    name = "memory"
+    
+    def __init__(self, capacity: float, refill_per_second: float, max_clients: int = 100_000):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def take(self, key: str, cost: float) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.refill_per_second)
+                bucket[1] = now
+            
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True, bucket[0], 0.0
+            return False, bucket[0], (cost - bucket[0]) / self.refill_per_second
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS[1] = bucket; ARGV = capacidade, reposição/s, custo
+_REDIS_TAKE = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tostring(tokens), 'u', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(retry)}
+"""
+
+
+class RedisBuckets:
+    """
+    Token buckets no Redis (redis.asyncio), compartilhados entre processos
+    """
+    
+    name = "redis"
+    
+    def __init__(self, url: str, capacity: float, refill_per_second: float, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+        
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.prefix = prefix
+        self._client = redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._script = self._client.register_script(_REDIS_TAKE)
+    
+    async def take(self, key: str, cost: float) -> Decision:
+        allowed, tokens, retry = await self._script(
+            keys=[self.prefix + key],
+            args=[self.capacity, self.refill_per_second, cost]
+        )
+        return bool(allowed), float(tokens), float(retry)
+
+
+class RateLimiter:
+    """
+    Decide se a requisição passa e guarda as métricas
+    
+    Args:
+        costs: Regras "prefixo=custo" (custo 0 = rota livre)
+        default_cost: Custo das rotas sem regra
+        capacity: Saldo máximo por cliente
+        refill_per_second: Saldo reposto por segundo
+        redis_url: Backend compartilhado (vazio = só memória)
+        redis_retry_seconds: Tempo só com memória após falhas seguidas do Redis
+        trusted_hops: Proxies confiáveis na frente da API (0 = ignorar
+            X-Forwarded-For)
+    """
+    
+    def __init__(
+        self,
+        costs: str,
+        default_cost: float,
+        capacity: float,
+        refill_per_second: float,
+        redis_url: str = "",
+        max_clients: int = 100_000,
+        redis_retry_seconds: float = 10,
+        trusted_hops: int = 0
+    ):
+        self.costs = parse_costs(costs)
+        self.default_cost = default_cost
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.trusted_hops = trusted_hops
+        self.memory = MemoryBuckets(capacity, refill_per_second, max_clients)
+        self.shared: Optional[RedisBuckets] = None
+        self.breaker = CircuitBreaker("rate-limit-redis", failure_threshold=3, reset_timeout=redis_retry_seconds)
+        if redis_url:
+            try:
+                self.shared = RedisBuckets(redis_url, capacity, refill_per_second)
+            except ImportError:
+                logger.warning("RATE_LIMIT_REDIS_URL definido mas o pacote redis não está instalado; usando memória")
+        
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Counter] = {}
+        self._rejected_clients: Counter = Counter()
+        self.stats = {"allowed": 0, "rejected": 0, "cost_used": 0.0, "backend_errors": 0}
+    
+    def route_cost(self, method: str, path: str) -> Tuple[str, float]:
+        """(regra aplicada, custo) da rota"""
+        if method == "OPTIONS":
+            return "OPTIONS", 0.0  # Preflight de CORS
+        for prefix, cost in self.costs:
+            if path.startswith(prefix):
+                return prefix, cost
+        return "*", self.default_cost
+    
+    def client_key(self, scope) -> str:
+        """user:<sub> com JWT válido (header Bearer ou ?token=), senão ip:<endereço>"""
+        token = None
+        forwarded: List[str] = []
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                value = value.decode("latin-1")
+                if value.lower().startswith("bearer "):
+                    token = value[7:]
+            elif name == b"x-forwarded-for" and self.trusted_hops:
+                forwarded.extend(a.strip() for a in value.decode("latin-1").split(","))
+        if token is None and b"token=" in scope.get("query_string", b""):
+            token = parse_qs(scope["query_string"].decode("latin-1")).get("token", [None])[0]
+        
+        if token:
+            payload = verify_token(token)
+            if payload and payload.get("sub") is not None:
+                return f"user:{payload['sub']}"
+        
+        client = (scope.get("client") or ("unknown",))[0]
+        # Cada proxy acrescenta à direita quem o chamou: o cliente é o
+        # endereço anotado pelo proxy confiável mais externo. O que está à
+        # esquerda dele veio do próprio cliente e pode ser forjado.
+        if self.trusted_hops and len(forwarded) >= self.trusted_hops:
+            client = forwarded[-self.trusted_hops] or client
+        return f"ip:{client}"
+    
+    async def take(self, key: str, cost: float) -> Decision:
+        if self.shared is not None and self.breaker.allow():
+            decision = None
+            try:
+                decision = await self.shared.take(key, cost)
+            except Exception as e:
+                self.stats["backend_errors"] += 1
+                logger.warning("Erro no Redis do rate limit, usando memória: %s", e)
+            finally:
+                # Também em cancelamento (senão o teste do meio-aberto ficaria preso)
+                if decision is None:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+            if decision is not None:
+                return decision
+        return self.memory.take(key, cost)
+    
+    def record(self, rule: str, key: str, cost: float, allowed: bool):
+        with self._lock:
+            route = self._routes.setdefault(rule, Counter())
+            if allowed:
+                self.stats["allowed"] += 1
+                self.stats["cost_used"] += cost
+                route["allowed"] += 1
+                route["cost_used"] += cost
+            else:
+                self.stats["rejected"] += 1
+                route["rejected"] += 1
+                self._rejected_clients[key] += 1
+                # Manter só os maiores (o Counter cresceria com cada IP)
+                if len(self._rejected_clients) > 1000:
+                    self._rejected_clients = Counter(dict(self._rejected_clients.most_common(100)))
+    
+    def metrics(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.shared.name if self.shared is not None else self.memory.name,
+                "capacity": self.capacity,
+                "refill_per_second": self.refill_per_second,
+                "clients_in_memory": len(self.memory),
+                "redis_circuit": self.breaker.status() if self.shared is not None else None,
+                **self.stats,
+                "routes": {
+                    rule: {
+                        "cost": next((cost for prefix, cost in self.costs if prefix == rule), self.default_cost),
+                        **counter
+                    }
+                    for rule, counter in self._routes.items()
+                },
+                "top_rejected_clients": [
+                    {"client": key, "rejected": count}
+                    for key, count in self._rejected_clients.most_common(10)
+                ]
+            }
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI: 429 + Retry-After quando o cliente não tem saldo
+    para o custo da rota; nas demais, headers X-RateLimit-*
+    """
+    
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        self.app = app
+        self.limiter = limiter or rate_limiter
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        rule, cost = self.limiter.route_cost(scope["method"], scope["path"])
+        if cost <= 0:
+            await self.app(scope, receive, send)
+            return
+        
+        # Rota mais cara que o bucket inteiro: exige o bucket cheio
+        cost = min(cost, self.limiter.capacity)
+        key = self.limiter.client_key(scope)
+        allowed, remaining, retry_after = await self.limiter.take(key, cost)
+        self.limiter.record(rule, key, cost, allowed)
+        
+        headers = [
+            (b"x-ratelimit-limit", str(int(self.limiter.capacity)).encode()),
+            (b"x-ratelimit-remaining", str(int(remaining)).encode()),
+            (b"x-ratelimit-cost", str(int(cost) if cost == int(cost) else cost).encode()),
+        ]
+        
+        if not allowed:
+            seconds = max(1, math.ceil(retry_after))
+            body = json.dumps({
+                "detail": "Limite de requisições excedido",
+                "retry_after": seconds
+            }).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"retry-after", str(seconds).encode()),
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                ]
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+        
+        await self.app(scope, receive, send_wrapper)
+
+
+# Instância global
+rate_limiter = RateLimiter(
+    costs=settings.RATE_LIMIT_COSTS,
+    default_cost=settings.RATE_LIMIT_DEFAULT_COST,
+    capacity=settings.RATE_LIMIT_CAPACITY,
+    refill_per_second=settings.RATE_LIMIT_REFILL_PER_SECOND,
+    redis_url=settings.RATE_LIMIT_REDIS_URL,
+    max_clients=settings.RATE_LIMIT_MAX_CLIENTS,
+    redis_retry_seconds=settings.RATE_LIMIT_REDIS_RETRY_SECONDS,
+    trusted_hops=settings.RATE_LIMIT_TRUSTED_HOPS if settings.RATE_LIMIT_TRUST_FORWARDED else 0
+)
\ No newline at end of file
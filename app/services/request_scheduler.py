@@ -0,0 +1,147 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+import ccxt
+
+# Classes de prioridade (menor = atendido primeiro)
+PRIORITY_LIVE = 0  # Sinais ao vivo / rotas da API
+PRIORITY_DEFAULT = 1
+PRIORITY_BACKFILL = 2  # Backfill e tarefas em lote
+
+
+class RequestScheduler:
+    """
+    Agendador central de requisições à exchange
+    
+    - Token bucket por peso: cada chamada consome o peso que a exchange
+      cobra (ex: klines com limit=1500 custa 10 no Binance Futures)
+    - Fila por prioridade: quando falta peso, sinais ao vivo passam
+      na frente do backfill
+    - Coalescência: chamadas idênticas em andamento compartilham
+      a mesma resposta em vez de ir duas vezes à exchange
+    - Ao receber 429/418, zera o bucket e pausa todo mundo
+    
+    Args:
+        capacity: Peso máximo acumulado (limite por minuto da exchange)
+        refill_per_second: Peso reposto por segundo
+        cooldown: Pausa em segundos após um erro de rate limit
+    """
+    
+    def __init__(self, capacity: float, refill_per_second: float, cooldown: float = 30):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.cooldown = cooldown
+        
+        self._cond = threading.Condition()
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters = []  # heap de (prioridade, ordem de chegada)
+        self._sequence = itertools.count()
+        self._inflight: Dict[Hashable, Future] = {}
+        
+        # Métricas simples
+        self.stats = {"requests": 0, "coalesced": 0, "rate_limited": 0, "weight_used": 0}
+    
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+    
+    def _acquire(self, weight: float, priority: int):
+        """
+        Bloquear até haver peso disponível e ser a vez desta prioridade
+        """
+        weight = min(weight, self.capacity)
+        
+        with self._cond:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    
+                    if self._waiters[0] != ticket:
+                        # Outro pedido (de prioridade maior ou que chegou antes) está na frente
+                        self._cond.wait()
+                        continue
+                    
+                    if now < self._paused_until:
+                        self._cond.wait(self._paused_until - now)
+                        continue
+                    
+                    if self._tokens >= weight:
+                        self._tokens -= weight
+                        heapq.heappop(self._waiters)
+                        self.stats["weight_used"] += weight
+                        self._cond.notify_all()
+                        return
+                    
+                    self._cond.wait((weight - self._tokens) / self.refill_per_second)
+            except BaseException:
+                # Desistiu de esperar (ex: thread interrompida): sair da fila
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+    
+    def _on_rate_limited(self):
+        with self._cond:
+            self._tokens = 0
+            self._paused_until = time.monotonic() + self.cooldown
+            self.stats["rate_limited"] += 1
+            self._cond.notify_all()
+    
+    def submit(
+        self,
+        func: Callable[[], Any],
+        weight: float = 1,
+        priority: int = PRIORITY_DEFAULT,
+        key: Optional[Hashable] = None
+    ) -> Any:
+        """
+        Executar uma chamada à exchange respeitando peso e prioridade
+        
+        Args:
+            func: Função sem argumentos que faz a chamada
+            weight: Peso da requisição na exchange
+            priority: Classe de prioridade (PRIORITY_*)
+            key: Identificação da chamada para coalescência (None = não coalescer)
+        
+        Returns:
+            Resultado de func (compartilhado entre chamadas coalescidas)
+        """
+        leader = True
+        with self._cond:
+            if key is not None and key in self._inflight:
+                future = self._inflight[key]
+                leader = False
+                self.stats["coalesced"] += 1
+            else:
+                future = Future()
+                if key is not None:
+                    self._inflight[key] = future
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            self._acquire(weight, priority)
+            self.stats["requests"] += 1
+            result = func()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            if isinstance(e, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+                self._on_rate_limited()
+            future.set_exception(e)
+            raise
+        finally:
+            if key is not None:
+                with self._cond:
+                    self._inflight.pop(key, None)
\ No newline at end of file
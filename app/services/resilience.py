@@ -0,0 +1,234 @@
+"""
+Resiliência a quedas da exchange
+
+- call_with_timeout: prazo por chamada, independente do timeout do ccxt
+  (a thread da chamada lenta continua até o ccxt desistir, mas quem
+  chamou já foi liberado)
+- CircuitBreaker: depois de N falhas seguidas para de chamar a exchange
+  por um tempo e falha na hora; passado o tempo deixa uma chamada de
+  teste passar (meio-aberto) e fecha de novo se ela der certo
+- StaleWhileRevalidate: guarda o último valor bom; depois de vencido
+  continua servindo esse valor (marcado como velho) enquanto uma thread
+  tenta atualizar em segundo plano
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+import ccxt
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ccxt.ExchangeNotAvailable):
+    """Chamada recusada porque o circuito está aberto"""
+
+
+def is_outage(error: BaseException) -> bool:
+    """
+    Erro que indica exchange fora do ar ou lenta (conta para o circuito)
+    
+    Rate limit fica de fora: o RequestScheduler já pausa as chamadas.
+    Erros de negócio (par inválido etc.) também não contam.
+    """
+    if isinstance(error, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+        return False
+    return isinstance(error, (ccxt.NetworkError, ccxt.ExchangeNotAvailable, TimeoutError))
+
+
+_timeout_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="exchange-call")
+
+
+def call_with_timeout(func: Callable[[], Any], timeout: float) -> Any:
+    """
+    Executar func com prazo máximo
+    
+    Raises:
+        ccxt.RequestTimeout: se passar de timeout segundos
+    """
+    if not timeout or timeout <= 0:
+        return func()
+    future = _timeout_pool.submit(func)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise ccxt.RequestTimeout(f"Sem resposta da exchange em {timeout}s")
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por endpoint da exchange (thread-safe)
+    
+    Args:
+        name: Nome para logs e status
+        failure_threshold: Falhas seguidas até abrir
+        reset_timeout: Segundos aberto antes de testar de novo
+    """
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+    
+    def allow(self) -> bool:
+        """Chamada pode ir para a exchange (no meio-aberto, só uma por vez)"""
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = STATE_HALF_OPEN
+            if self.state == STATE_HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.stats["rejected"] += 1
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info("Circuito %s fechado", self.name)
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self._probing = False
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.stats["failures"] += 1
+            if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != STATE_OPEN:
+                    self.stats["opened"] += 1
+                    logger.warning("Circuito %s aberto após %d falhas", self.name, self.failures)
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+    
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        Executar func pelo disjuntor
+        
+        Raises:
+            CircuitOpenError: se o circuito estiver aberto
+        """
+        if not self.allow():
+            raise CircuitOpenError(f"Circuito {self.name} aberto")
+        self.stats["calls"] += 1
+        try:
+            result = func()
+        except Exception as e:
+            if is_outage(e):
+                self.record_failure()
+            else:
+                # Erro de negócio: a exchange respondeu
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+    
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+    
+    def status(self) -> Dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            **self.stats,
+        }
+
+
+class StaleWhileRevalidate:
+    """
+    Último valor bom por chave, com atualização em segundo plano
+    
+    - Dentro de fresh_seconds: devolve o valor guardado
+    - Vencido (até max_stale_seconds): devolve o valor guardado marcado
+      como velho e dispara uma atualização em outra thread (uma por
+      chave), que tenta de novo a cada retry_seconds enquanto a chave
+      continuar sendo pedida
+    - Sem valor ou velho demais: carrega na hora; se falhar e houver
+      valor guardado, devolve ele como velho
+    
+    Args:
+        fresh_seconds: Idade até a qual o valor é servido sem atualizar
+        max_stale_seconds: Idade máxima para servir sem esperar a carga
+        retry_seconds: Intervalo entre tentativas após falha
+    """
+    
+    def __init__(self, fresh_seconds: float, max_stale_seconds: float, retry_seconds: float = 10):
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.retry_seconds = retry_seconds
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}  # chave -> (valor, time.time())
+        self._refreshing: Set[Hashable] = set()
+        self._requested_at: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+    
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        value = loader()
+        with self._lock:
+            self._entries[key] = (value, time.time())
+        return value
+    
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]):
+        try:
+            while True:
+                try:
+                    self._load(key, loader)
+                    return
+                except Exception as e:
+                    logger.warning("Falha ao atualizar %s em segundo plano: %s", key, e)
+                with self._lock:
+                    idle = time.monotonic() - self._requested_at.get(key, 0)
+                if idle >= self.max_stale_seconds:
+                    return
+                time.sleep(self.retry_seconds)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+    
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, loader), name="swr-refresh", daemon=True).start()
+    
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Tuple[Any, bool, Optional[float]]:
+        """
+        Returns:
+            (valor, velho, time.time() da última carga bem-sucedida)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            self._requested_at[key] = time.monotonic()
+        
+        if entry is not None:
+            value, loaded_at = entry
+            age = time.time() - loaded_at
+            if age < self.fresh_seconds:
+                return value, False, loaded_at
+            if age < self.max_stale_seconds:
+                self._schedule_refresh(key, loader)
+                return value, True, loaded_at
+        
+        try:
+            return self._load(key, loader), False, time.time()
+        except Exception:
+            if entry is None:
+                raise
+            self._schedule_refresh(key, loader)
+            return entry[0], True, entry[1]
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+Regras de pontuação declarativas
+
+Uma regra é um dicionário (pode vir de JSON) com grupos de casos.
+Em cada grupo vale o primeiro caso cuja condição casar, como um if/elif:
+    
+    {"name": "rsi", "cases": [
+        {"when": {"field": "rsi.status", "eq": "NEUTRO"}, "points": 7},
+    ], "default": 0}
+
+Condições: {"field": "secao.campo", <op>: valor} com op em eq, ne, in,
+not_in, lt, le, gt, ge; ou <op>_field para comparar com outro campo
+(ex: {"field": "bollinger.current_price", "le_field": "bollinger.lower"});
+vários operadores na mesma condição valem juntos (faixa:
+{"field": "rsi.value", "ge": 30, "lt": 70});
+ou {"all": [...]} / {"any": [...]} para combinar condições.
+
+As regras são compiladas em expressões numpy que avaliam todos os
+símbolos de uma vez, e várias variantes de estratégia podem ser
+avaliadas juntas reaproveitando as condições em comum.
+"""
+import json
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+
+# Regras atuais do SignalGenerator
+DEFAULT_RULES = {
+    "base_score": 50,
+    "min_score": 0,
+    "max_score": 100,
+    "probability": [
+        # RSI (peso: 15 pontos)
+        {"name": "rsi", "cases": [
+            {"when": {"field": "rsi.status", "in": ["SOBREVENDIDO", "SOBRECOMPRADO"]}, "points": 15},
+            {"when": {"field": "rsi.status", "eq": "NEUTRO"}, "points": 7},
+        ]},
+        # MACD (peso: 20 pontos)
+        {"name": "macd", "cases": [
+            {"when": {"field": "macd.status", "in": ["COMPRA", "VENDA"]}, "points": 20},
+            {"when": {"field": "macd.status", "in": ["ALTA", "BAIXA"]}, "points": 10},
+        ]},
+        # Tendência (peso: 20 pontos)
+        {"name": "trend", "cases": [
+            {"when": {"field": "trend.trend", "in": ["ALTA_FORTE", "BAIXA_FORTE"]}, "points": 20},
+            {"when": {"field": "trend.trend", "in": ["ALTA", "BAIXA"]}, "points": 15},
+        ], "default": 5},
+        # Volume (peso: 10 pontos)
+        {"name": "volume", "cases": [
+            {"when": {"field": "volume.status", "eq": "ALTO"}, "points": 10},
+            {"when": {"field": "volume.status", "eq": "NORMAL"}, "points": 5},
+        ]},
+        # Bollinger Bands (peso: 5 pontos)
+        {"name": "bollinger", "cases": [
+            {"when": {"field": "bollinger.current_price", "le_field": "bollinger.lower"}, "points": 5},
+            {"when": {"field": "bollinger.current_price", "ge_field": "bollinger.upper"}, "points": 5},
+        ]},
+    ],
+    "direction": {
+        "min_points": 4,
+        "groups": [
+            {"name": "rsi", "cases": [
+                {"when": {"field": "rsi.status", "eq": "SOBREVENDIDO"}, "bullish": 2},
+                {"when": {"field": "rsi.status", "eq": "SOBRECOMPRADO"}, "bearish": 2},
+            ]},
+            {"name": "macd", "cases": [
+                {"when": {"field": "macd.status", "in": ["COMPRA", "ALTA"]}, "bullish": 2},
+                {"when": {"field": "macd.status", "in": ["VENDA", "BAIXA"]}, "bearish": 2},
+            ]},
+            {"name": "trend", "cases": [
+                {"when": {"field": "trend.trend", "in": ["ALTA", "ALTA_FORTE"]}, "bullish": 3},
+                {"when": {"field": "trend.trend", "in": ["BAIXA", "BAIXA_FORTE"]}, "bearish": 3},
+            ]},
+        ]
+    }
+}
+
+# Indicadores (registro de technical_analysis) por campo da análise
+FIELD_INDICATORS = {
+    "rsi": ["rsi"],
+    "macd": ["macd", "macd_signal"],
+    "macd.histogram": ["macd_diff"],
+    "trend": ["ema_20", "ema_50", "ema_200"],
+    "volume": ["volume_sma"],
+    "bollinger": ["bb_high", "bb_low"],
+    "bollinger.middle": ["bb_mid"],
+}
+
+COMPARISONS = {
+    "eq": np.equal,
+    "ne": np.not_equal,
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+}
+
+
+def _condition_fields(condition: Dict) -> List[str]:
+    if "all" in condition or "any" in condition:
+        children = condition.get("all") or condition.get("any")
+        return [f for child in children for f in _condition_fields(child)]
+    
+    fields = [condition["field"]]
+    for key, value in condition.items():
+        if key.endswith("_field"):
+            fields.append(value)
+    return fields
+
+
+class FieldColumns:
+    """
+    Colunas numpy extraídas das análises, criadas sob demanda
+    """
+    
+    def __init__(self, analyses: List[Dict]):
+        self.analyses = analyses
+        self._columns: Dict[str, np.ndarray] = {}
+    
+    def __getitem__(self, field: str) -> np.ndarray:
+        if field not in self._columns:
+            section, _, key = field.partition(".")
+            values = [a[section][key] if key else a[section] for a in self.analyses]
+            if values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                column = np.asarray(values, dtype=float)
+            else:
+                column = np.asarray(values, dtype=object)
+            self._columns[field] = column
+        return self._columns[field]
+
+
+class ConditionCache:
+    """
+    Avalia cada condição distinta uma única vez por lote
+    """
+    
+    def __init__(self, columns: FieldColumns):
+        self.columns = columns
+        self._masks: Dict[str, np.ndarray] = {}
+    
+    def mask(self, condition: Dict) -> np.ndarray:
+        key = json.dumps(condition, sort_keys=True)
+        if key not in self._masks:
+            self._masks[key] = self._evaluate(condition)
+        return self._masks[key]
+    
+    def _evaluate(self, condition: Dict) -> np.ndarray:
+        if "all" in condition:
+            return np.logical_and.reduce([self.mask(c) for c in condition["all"]])
+        if "any" in condition:
+            return np.logical_or.reduce([self.mask(c) for c in condition["any"]])
+        
+        # Vários operadores no mesmo campo valem juntos (ex: faixa ge + lt)
+        column = self.columns[condition["field"]]
+        masks = [self._operator(column, op, value) for op, value in condition.items() if op != "field"]
+        if not masks:
+            raise ValueError(f"Condição sem operador: {condition}")
+        return np.logical_and.reduce(masks)
+    
+    def _operator(self, column: np.ndarray, op: str, value) -> np.ndarray:
+        if op == "in":
+            return np.isin(column, list(value))
+        if op == "not_in":
+            return ~np.isin(column, list(value))
+        if op.endswith("_field") and op[:-len("_field")] in COMPARISONS:
+            return np.asarray(COMPARISONS[op[:-len("_field")]](column, self.columns[value]), dtype=bool)
+        if op in COMPARISONS:
+            return np.asarray(COMPARISONS[op](column, value), dtype=bool)
+        raise ValueError(f"Operador desconhecido na regra: {op}")
+
+
+def _select(cache: ConditionCache, group: Dict, key: str, size: int) -> np.ndarray:
+    """
+    Pontos do primeiro caso que casar em cada linha (np.select = if/elif)
+    """
+    cases = group["cases"]
+    points = [case.get(key, 0) for case in cases]
+    default = group.get("default", 0) if key == "points" else 0
+    dtype = np.result_type(*points, default)
+    if not cases:
+        return np.full(size, default, dtype=dtype)
+    return np.select(
+        [cache.mask(case["when"]) for case in cases],
+        [np.asarray(p, dtype=dtype) for p in points],
+        default=np.asarray(default, dtype=dtype)
+    )
+
+
+class RuleSet:
+    """
+    Conjunto de regras compilado
+    
+    Args:
+        rules: Regras no formato declarativo (ver DEFAULT_RULES)
+    """
+    
+    def __init__(self, rules: Dict):
+        self.rules = rules
+        self.base_score = rules.get("base_score", 0)
+        self.min_score = rules.get("min_score", 0)
+        self.max_score = rules.get("max_score", 100)
+        self.probability_groups = rules.get("probability", [])
+        direction = rules.get("direction", {})
+        self.direction_groups = direction.get("groups", [])
+        self.direction_min_points = direction.get("min_points", 0)
+    
+    def fields(self) -> List[str]:
+        """Campos da análise lidos pelas regras"""
+        fields = []
+        for group in self.probability_groups + self.direction_groups:
+            for case in group["cases"]:
+                for field in _condition_fields(case["when"]):
+                    if field not in fields:
+                        fields.append(field)
+        return fields
+    
+    def required_indicators(self) -> List[str]:
+        """Indicadores do registro necessários para avaliar as regras"""
+        indicators = []
+        for field in self.fields():
+            section = field.partition(".")[0]
+            for name in FIELD_INDICATORS.get(field, FIELD_INDICATORS.get(section, [])):
+                if name not in indicators:
+                    indicators.append(name)
+        return indicators
+    
+    def probability(self, cache: ConditionCache, size: int) -> np.ndarray:
+        score = np.asarray(self.base_score)
+        for group in self.probability_groups:
+            score = score + _select(cache, group, "points", size)
+        score = np.broadcast_to(score, (size,))
+        return np.clip(score, self.min_score, self.max_score)
+    
+    def direction(self, cache: ConditionCache, size: int) -> np.ndarray:
+        bullish = np.zeros(size, dtype=int)
+        bearish = np.zeros(size, dtype=int)
+        for group in self.direction_groups:
+            bullish = bullish + _select(cache, group, "bullish", size)
+            bearish = bearish + _select(cache, group, "bearish", size)
+        
+        return np.select(
+            [
+                (bullish > bearish) & (bullish >= self.direction_min_points),
+                (bearish > bullish) & (bearish >= self.direction_min_points),
+            ],
+            ["LONG", "SHORT"],
+            default=None
+        ).astype(object)
+
+
+class RuleEngine:
+    """
+    Avalia uma ou mais variantes de regras sobre um lote de análises
+    
+    Args:
+        variants: {nome da variante: regras}
+    """
+    
+    def __init__(self, variants: Dict[str, Dict]):
+        self.variants = {name: RuleSet(rules) for name, rules in variants.items()}
+    
+    def required_indicators(self) -> List[str]:
+        indicators = []
+        for rule_set in self.variants.values():
+            for name in rule_set.required_indicators():
+                if name not in indicators:
+                    indicators.append(name)
+        return indicators
+    
+    def evaluate(self, analyses: List[Dict], variants: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Pontuar todas as análises em todas as variantes
+        
+        Args:
+            analyses: Lista de análises (get_full_analysis), uma por símbolo
+            variants: Variantes a avaliar (None = todas)
+        
+        Returns:
+            {variante: {"probability": array, "direction": array de LONG/SHORT/None}}
+        """
+        size = len(analyses)
+        cache = ConditionCache(FieldColumns(analyses))
+        names = list(self.variants) if variants is None else list(variants)
+        
+        return {
+            name: {
+                "probability": self.variants[name].probability(cache, size),
+                "direction": self.variants[name].direction(cache, size),
+            }
+            for name in names
+        }
\ No newline at end of file
@@ -0,0 +1,98 @@
+import numpy as np
+from typing import Dict, List
+from app.config import settings
+
+
+class Screener:
+    """
+    Pré-filtro barato sobre o snapshot de fetch_tickers
+    
+    Avalia todos os pares USDT de uma vez com numpy (variação de preço,
+    volume e amplitude do dia) e devolve só os candidatos que merecem a
+    análise completa (get_full_analysis + SignalGenerator).
+    """
+    
+    def __init__(
+        self,
+        min_quote_volume: float = settings.SCREENER_MIN_QUOTE_VOLUME,
+        min_change_pct: float = settings.SCREENER_MIN_CHANGE_PCT,
+        min_range_pct: float = settings.SCREENER_MIN_RANGE_PCT,
+        max_candidates: int = settings.SCREENER_MAX_CANDIDATES
+    ):
+        self.min_quote_volume = min_quote_volume
+        self.min_change_pct = min_change_pct
+        self.min_range_pct = min_range_pct
+        self.max_candidates = max_candidates
+    
+    def _column(self, tickers: List[Dict], field: str) -> np.ndarray:
+        return np.array(
+            [t.get(field) if t.get(field) is not None else np.nan for t in tickers],
+            dtype=float
+        )
+    
+    def _zscore(self, values: np.ndarray) -> np.ndarray:
+        std = values.std()
+        if not np.isfinite(std) or std == 0:
+            return np.zeros_like(values)
+        return (values - values.mean()) / std
+    
+    def screen(self, tickers: Dict[str, Dict], max_candidates: int = None) -> List[str]:
+        """
+        Selecionar candidatos a partir do snapshot de tickers
+        
+        Args:
+            tickers: Resultado de fetch_tickers {symbol: ticker}
+            max_candidates: Máximo de pares devolvidos
+        
+        Returns:
+            Símbolos ordenados do mais promissor para o menos
+        """
+        max_candidates = max_candidates or self.max_candidates
+        
+        symbols = [s for s in tickers if '/USDT' in s]
+        if not symbols:
+            return []
+        rows = [tickers[s] for s in symbols]
+        
+        quote_volume = self._column(rows, 'quoteVolume')
+        change_pct = np.abs(self._column(rows, 'percentage'))
+        high = self._column(rows, 'high')
+        low = self._column(rows, 'low')
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            range_pct = (high - low) / low * 100
+        
+        # Liquidez mínima + algum movimento (variação ou amplitude)
+        mask = (
+            np.isfinite(quote_volume) & np.isfinite(change_pct) & np.isfinite(range_pct)
+            & (quote_volume >= self.min_quote_volume)
+            & ((change_pct >= self.min_change_pct) | (range_pct >= self.min_range_pct))
+        )
+        if not mask.any():
+            # Mercado parado: nenhum par passou, ficar com os de maior volume
+            liquid = np.flatnonzero(np.isfinite(quote_volume))
+            top = liquid[np.argsort(-quote_volume[liquid])][:max_candidates]
+            return [symbols[i] for i in top]
+        
+        candidates = np.flatnonzero(mask)
+        
+        # Ranking: movimento e amplitude pesam mais que volume (log1p: par
+        # com volume 0, possível com SCREENER_MIN_QUOTE_VOLUME=0, daria -inf
+        # e zeraria o peso do volume de todos)
+        score = (
+            self._zscore(change_pct[candidates])
+            + self._zscore(range_pct[candidates])
+            + 0.5 * self._zscore(np.log1p(quote_volume[candidates]))
+        )
+        
+        if len(candidates) > max_candidates:
+            top = np.argpartition(-score, max_candidates - 1)[:max_candidates]
+        else:
+            top = np.arange(len(candidates))
+        top = top[np.argsort(-score[top])]
+        
+        return [symbols[i] for i in candidates[top]]
+
+
+# Instância global
+screener = Screener()
\ No newline at end of file
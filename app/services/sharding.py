@@ -0,0 +1,128 @@
+"""
+Divisão do universo moeda x timeframe entre várias instâncias do gerador
+
+- Membros: cada instância grava um heartbeat na tabela generator_nodes;
+  vivas são as com heartbeat mais novo que NODE_TTL_SECONDS
+- Anel de hash consistente (NODE_VIRTUAL_NODES pontos por instância):
+  cada par "moeda|timeframe" pertence ao primeiro ponto do anel depois
+  do seu hash. Quando uma instância entra ou morre, só os pares dela (ou
+  ~1/N dos pares, na entrada) mudam de dono; o resto fica onde estava
+
+Todas as instâncias leem a mesma tabela, então chegam ao mesmo anel sem
+coordenação. Durante a troca (até um heartbeat) um par pode ser gerado
+por duas instâncias ou ficar um ciclo sem dono; o save_signals reaproveita
+o sinal ativo equivalente, então a sobreposição não duplica cards.
+"""
+import hashlib
+import os
+import socket
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.generator_node import GeneratorNode
+
+Job = Tuple[str, str]  # (moeda, timeframe)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+def job_key(job: Job) -> str:
+    return f"{job[0]}|{job[1]}"
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class HashRing:
+    """
+    Anel de hash consistente com nós virtuais
+    
+    Args:
+        nodes: IDs das instâncias
+        vnodes: Pontos no anel por instância (mais pontos = divisão mais uniforme)
+    """
+    
+    def __init__(self, nodes: Iterable[str], vnodes: int = 64):
+        self.nodes = sorted(set(nodes))
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in self.nodes
+            for i in range(vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+    
+    def owner(self, key: str) -> Optional[str]:
+        if not self._hashes:
+            return None
+        index = bisect_right(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+    
+    def assign(self, jobs: Iterable[Job]) -> Dict[str, List[Job]]:
+        """Pares de cada instância"""
+        assignment: Dict[str, List[Job]] = {node: [] for node in self.nodes}
+        for job in jobs:
+            owner = self.owner(job_key(job))
+            if owner is not None:
+                assignment[owner].append(job)
+        return assignment
+    
+    def jobs_for(self, node_id: str, jobs: Iterable[Job]) -> List[Job]:
+        return [job for job in jobs if self.owner(job_key(job)) == node_id]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def heartbeat(db: Session, node_id: str, jobs: Optional[int] = None, cycle_ms: Optional[int] = None):
+    """Registrar/renovar a instância (commit)"""
+    now = _now()
+    node = db.get(GeneratorNode, node_id)
+    if node is None:
+        node = GeneratorNode(
+            node_id=node_id,
+            hostname=socket.gethostname(),
+            pid=os.getpid(),
+            iniciado_em=now,
+            heartbeat_em=now
+        )
+        db.add(node)
+    node.heartbeat_em = now
+    if jobs is not None:
+        node.jobs = jobs
+    if cycle_ms is not None:
+        node.ultimo_ciclo_ms = cycle_ms
+    db.commit()
+
+
+def leave(db: Session, node_id: str):
+    """Sair do anel na hora (desligamento limpo)"""
+    db.query(GeneratorNode).filter(GeneratorNode.node_id == node_id).delete()
+    db.commit()
+
+
+def alive_nodes(db: Session, ttl: Optional[float] = None) -> List[GeneratorNode]:
+    ttl = settings.NODE_TTL_SECONDS if ttl is None else ttl
+    cutoff = _now() - timedelta(seconds=ttl)
+    return db.query(GeneratorNode).filter(
+        GeneratorNode.heartbeat_em >= cutoff
+    ).order_by(GeneratorNode.node_id).all()
+
+
+def prune_dead(db: Session, older_than: Optional[float] = None) -> int:
+    """Apagar instâncias sem heartbeat há muito tempo (só limpeza; o anel já as ignora)"""
+    older_than = settings.NODE_TTL_SECONDS * 10 if older_than is None else older_than
+    cutoff = _now() - timedelta(seconds=older_than)
+    count = db.query(GeneratorNode).filter(GeneratorNode.heartbeat_em < cutoff).delete()
+    db.commit()
+    return count
+
+
+def build_ring(db: Session) -> HashRing:
+    return HashRing([node.node_id for node in alive_nodes(db)], vnodes=settings.NODE_VIRTUAL_NODES)
\ No newline at end of file
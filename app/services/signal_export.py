@@ -0,0 +1,238 @@
+"""
+Exportação do histórico de sinais em CSV ou Parquet, por streaming
+
+As linhas saem do banco com cursor do lado do servidor (stream_results)
+em lotes de EXPORT_CHUNK_SIZE e cada lote é codificado e entregue antes
+de ler o próximo: a memória fica constante, seja qual for o tamanho da
+tabela. Usa Core (não ORM) para não acumular objetos na sessão.
+
+Parquet depende do pyarrow (opcional): cada lote vira um row group.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.models.signal import Signal
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv",
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+}
+
+# (coluna, tipo no Parquet)
+EXPORT_COLUMNS = [
+    ("id", "int64"),
+    ("moeda", "string"),
+    ("tipo", "string"),
+    ("timeframe", "string"),
+    ("preco_entrada", "float64"),
+    ("stop_loss", "float64"),
+    ("take_profit_1", "float64"),
+    ("take_profit_2", "float64"),
+    ("take_profit_3", "float64"),
+    ("alavancagem", "int64"),
+    ("probabilidade", "float64"),
+    ("status", "string"),
+    ("rsi_valor", "float64"),
+    ("macd_histograma", "float64"),
+    ("tendencia", "string"),
+    ("volume_status", "string"),
+    ("indicadores", "json"),
+    ("analise", "json"),
+    ("criado_em", "timestamp"),
+    ("atualizado_em", "timestamp"),
+    ("expira_em", "timestamp"),
+    ("preco_saida", "float64"),
+    ("resultado_percentual", "float64"),
+]
+
+COLUMN_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+
+class ExportError(Exception):
+    """Formato inválido ou dependência ausente"""
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def check_format(fmt: str):
+    """
+    Raises:
+        ExportError: formato desconhecido ou Parquet sem pyarrow
+    """
+    if fmt not in MEDIA_TYPES:
+        raise ExportError(f"Formato deve ser {FORMAT_CSV} ou {FORMAT_PARQUET}")
+    if fmt == FORMAT_PARQUET and not parquet_available():
+        raise ExportError("Exportação em Parquet requer o pacote pyarrow")
+
+
+def build_query(
+    moeda: Optional[str] = None,
+    tipo: Optional[str] = None,
+    timeframe: Optional[str] = None,
+    status: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    ate: Optional[datetime] = None
+):
+    """SELECT das colunas exportadas com filtros, em ordem de criação"""
+    query = select(*[getattr(Signal, name) for name in COLUMN_NAMES])
+    if moeda:
+        query = query.where(Signal.moeda == moeda)
+    if tipo:
+        query = query.where(Signal.tipo == tipo.upper())
+    if timeframe:
+        query = query.where(Signal.timeframe == timeframe)
+    if status:
+        query = query.where(Signal.status == status.upper())
+    # Intervalo em criado_em (no Postgres, só as partições do período)
+    if desde:
+        query = query.where(Signal.criado_em >= desde)
+    if ate:
+        query = query.where(Signal.criado_em < ate)
+    return query.order_by(Signal.criado_em, Signal.id)
+
+
+def iter_chunks(engine: Engine, query, chunk_size: Optional[int] = None) -> Iterator[Sequence]:
+    """
+    Lotes de linhas via cursor do lado do servidor
+    
+    A conexão fica aberta enquanto o gerador for consumido e é devolvida
+    ao pool no fim (ou se o cliente desconectar e o gerador for fechado).
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(query)
+        for rows in result.partitions(chunk_size):
+            yield rows
+
+
+def _json_cell(value) -> Optional[str]:
+    return json.dumps(value, ensure_ascii=False) if value is not None else None
+
+
+def _csv_cell(value, kind: str):
+    if value is None:
+        return ""
+    if kind == "json":
+        return _json_cell(value)
+    if kind == "timestamp":
+        return value.isoformat()
+    return value
+
+
+def encode_csv(chunks: Iterator[Sequence]) -> Iterator[bytes]:
+    """CSV (UTF-8, com cabeçalho), um bloco de bytes por lote"""
+    kinds = [kind for _, kind in EXPORT_COLUMNS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMN_NAMES)
+    yield buffer.getvalue().encode("utf-8")
+    
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [_csv_cell(value, kind) for value, kind in zip(row, kinds)]
+            for row in rows
+        )
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Destino do ParquetWriter que acumula só o que foi escrito desde a
+    última leitura (não guarda o arquivo inteiro)
+    """
+    
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+    
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "string": pa.string(),
+        "json": pa.string(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+
+def encode_parquet(chunks: Iterator[Sequence]) -> Iterator[bytes]:
+    """
+    Parquet com um row group por lote; os bytes de cada row group são
+    entregues assim que escritos e o rodapé vai no final
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = _parquet_schema()
+    json_columns = [i for i, (_, kind) in enumerate(EXPORT_COLUMNS) if kind == "json"]
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in chunks:
+            columns: List[list] = [list(column) for column in zip(*rows)]
+            for i in json_columns:
+                columns[i] = [_json_cell(value) for value in columns[i]]
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema
+            ))
+            data = sink.take()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def stream_export(engine: Engine, fmt: str, filters: Dict, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Bytes do arquivo exportado, gerados sob demanda
+    
+    Args:
+        engine: Engine do banco
+        fmt: FORMAT_CSV ou FORMAT_PARQUET
+        filters: Argumentos de build_query
+        chunk_size: Linhas por lote (padrão EXPORT_CHUNK_SIZE)
+    """
+    check_format(fmt)
+    chunks = iter_chunks(engine, build_query(**filters), chunk_size)
+    if fmt == FORMAT_PARQUET:
+        return encode_parquet(chunks)
+    return encode_csv(chunks)
\ No newline at end of file
@@ -1,71 +1,52 @@
+import logging
 import pandas as pd
 from typing import Dict, Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from app.config import settings
 from app.services.binance_service import binance_service
-from app.services.technical_analysis import technical_analysis
+from app.services.technical_analysis import technical_analysis, resolve_indicators
+from app.services.request_scheduler import PRIORITY_LIVE
+from app.services.scoring_rules import RuleEngine, DEFAULT_RULES
+from app.services.correlation import correlation_tracker, suppress_correlated
+from app.services.tracing import tracer
+from app.services.analysis_pool import analysis_pool
+
+logger = logging.getLogger(__name__)
+
+# Indicadores que o sinal montado lê além das regras
+# (preço atual/EMAs, histograma do MACD, bandas para entrada/saída, volume)
+OUTPUT_INDICATORS = [
+    'rsi',
+    'macd_diff',
+    'ema_20', 'ema_50', 'ema_200',
+    'bb_high', 'bb_low',
+    'volume_sma'
+]
 
 class SignalGenerator:
     
-    def __init__(self):
+    def __init__(self, rules: Dict = DEFAULT_RULES):
         self.min_probability = 60  # Probabilidade mínima para gerar sinal
+        self.rule_variants = {"default": rules}
+        self.rules = RuleEngine(self.rule_variants)
+        # Só os indicadores que as regras e o sinal consomem (bb_mid fica de fora)
+        self.indicators = resolve_indicators(self.rules.required_indicators() + OUTPUT_INDICATORS)
+        # Candles suficientes para aquecer todos os indicadores (inclusive EMA 200)
+        self.candles_limit = technical_analysis.required_candles(self.indicators)
     
     def calculate_probability(self, analysis: Dict) -> float:
         """
         Calcular probabilidade do sinal baseado em múltiplos indicadores
         
+        Pesos e limites vêm das regras declarativas (DEFAULT_RULES)
+        
         Args:
             analysis: Análise técnica completa
         
         Returns:
             Probabilidade de 0 a 100
         """
-        score = 50  # Score base
-        
-        # RSI (peso: 15 pontos)
-        rsi_status = analysis['rsi']['status']
-        if rsi_status == "SOBREVENDIDO":
-            score += 15  # Bom para LONG
-        elif rsi_status == "SOBRECOMPRADO":
-            score += 15  # Bom para SHORT
-        elif rsi_status == "NEUTRO":
-            score += 7
-        
-        # MACD (peso: 20 pontos)
-        macd_status = analysis['macd']['status']
-        if macd_status == "COMPRA":
-            score += 20
-        elif macd_status == "VENDA":
-            score += 20
-        elif macd_status in ["ALTA", "BAIXA"]:
-            score += 10
-        
-        # Tendência (peso: 20 pontos)
-        trend = analysis['trend']['trend']
-        if trend in ["ALTA_FORTE", "BAIXA_FORTE"]:
-            score += 20
-        elif trend in ["ALTA", "BAIXA"]:
-            score += 15
-        else:
-            score += 5
-        
-        # Volume (peso: 10 pontos)
-        volume_status = analysis['volume']['status']
-        if volume_status == "ALTO":
-            score += 10
-        elif volume_status == "NORMAL":
-            score += 5
-        
-        # Bollinger Bands (peso: 5 pontos)
-        bb = analysis['bollinger']
-        if bb['current_price'] <= bb['lower']:
-            score += 5  # Próximo da banda inferior
-        elif bb['current_price'] >= bb['upper']:
-            score += 5  # Próximo da banda superior
-        
-        # Normalizar para 0-100
-        probability = min(100, max(0, score))
-        
-        return probability
+        return self.rules.evaluate([analysis])["default"]["probability"][0].item()
     
     def detect_signal_type(self, analysis: Dict) -> Optional[str]:
         """
@@ -74,39 +55,7 @@ class SignalGenerator:
         Returns:
             "LONG", "SHORT" ou None
         """
-        rsi = analysis['rsi']
-        macd = analysis['macd']
-        trend = analysis['trend']['trend']
-        
-        # Contadores de sinais bullish e bearish
-        bullish_signals = 0
-        bearish_signals = 0
-        
-        # RSI
-        if rsi['status'] == "SOBREVENDIDO":
-            bullish_signals += 2
-        elif rsi['status'] == "SOBRECOMPRADO":
-            bearish_signals += 2
-        
-        # MACD
-        if macd['status'] in ["COMPRA", "ALTA"]:
-            bullish_signals += 2
-        elif macd['status'] in ["VENDA", "BAIXA"]:
-            bearish_signals += 2
-        
-        # Tendência
-        if trend in ["ALTA", "ALTA_FORTE"]:
-            bullish_signals += 3
-        elif trend in ["BAIXA", "BAIXA_FORTE"]:
-            bearish_signals += 3
-        
-        # Decisão
-        if bullish_signals > bearish_signals and bullish_signals >= 4:
-            return "LONG"
-        elif bearish_signals > bullish_signals and bearish_signals >= 4:
-            return "SHORT"
-        else:
-            return None  # Sem sinal claro
+        return self.rules.evaluate([analysis])["default"]["direction"][0]
     
     def calculate_entry_exit(
         self, 
@@ -213,38 +162,70 @@ class SignalGenerator:
             "contexto": "Setup de probabilidade premium detectado pelo algoritmo."
         }
     
-    def generate_signal(self, symbol: str, timeframe: str = "1h") -> Optional[Dict]:
+    def fetch_candles(self, symbol: str, timeframe: str = "1h") -> Optional[pd.DataFrame]:
         """
-        Gerar sinal completo para um símbolo
-        
-        Args:
-            symbol: Par de trading (ex: 'BTC/USDT')
-            timeframe: Timeframe para análise
+        Buscar os candles necessários para a análise de um símbolo
         
         Returns:
-            Dicionário com sinal completo ou None
+            DataFrame OHLCV ou None se não houver dados
         """
-        # Buscar dados
-        df = binance_service.get_ohlcv(symbol, timeframe=timeframe, limit=200)
+        df = binance_service.get_ohlcv(
+            symbol,
+            timeframe=timeframe,
+            limit=self.candles_limit,
+            priority=PRIORITY_LIVE
+        )
         
         if df is None or df.empty:
             return None
         
-        # Fazer análise técnica
-        analysis = technical_analysis.get_full_analysis(df)
-        
-        # Detectar tipo de sinal
-        signal_type = self.detect_signal_type(analysis)
+        return df
+    
+    def fetch_analysis(self, symbol: str, timeframe: str = "1h") -> Optional[Dict]:
+        """
+        Buscar candles e fazer a análise técnica de um símbolo
         
-        if signal_type is None:
-            return None  # Não há sinal claro
+        Returns:
+            Análise técnica ou None se não houver dados
+        """
+        df = self.fetch_candles(symbol, timeframe)
         
-        # Calcular probabilidade
-        probability = self.calculate_probability(analysis)
+        if df is None:
+            return None
         
-        if probability < self.min_probability:
-            return None  # Probabilidade muito baixa
+        return technical_analysis.get_full_analysis(df, self.indicators)
+    
+    def deduplicate(self, signals: List[Dict], timeframe: str) -> List[Dict]:
+        """
+        Descartar sinais de símbolos muito correlacionados (o mesmo trade),
+        mantendo o de maior probabilidade de cada grupo
+        """
+        if not settings.CORRELATION_DEDUP or len(signals) < 2:
+            return signals
+        
+        with tracer.span("signals.deduplicate", timeframe=timeframe, signals=len(signals)) as span:
+            corr = correlation_tracker.matrix(timeframe, [s["moeda"] for s in signals])
+            if corr is None:
+                return signals
+            
+            kept = suppress_correlated(signals, corr, settings.CORRELATION_THRESHOLD)
+            span.set_attribute("suppressed", len(signals) - len(kept))
+            return kept
+    
+    def build_signal(
+        self,
+        symbol: str,
+        timeframe: str,
+        analysis: Dict,
+        signal_type: str,
+        probability: float
+    ) -> Dict:
+        """
+        Montar o sinal completo a partir da análise já pontuada
         
+        Returns:
+            Dicionário com sinal completo
+        """
         # Preço atual
         current_price = analysis['trend']['current_price']
         
@@ -254,7 +235,8 @@ class SignalGenerator:
         # Gerar textos de análise
         analysis_text = self.generate_analysis_text(analysis, signal_type)
         
-        # Montar sinal completo
+        # Montar sinal completo (horários em UTC)
+        now = datetime.now(timezone.utc)
         signal = {
             "moeda": symbol,
             "tipo": signal_type,
@@ -272,15 +254,53 @@ class SignalGenerator:
                 "macd": analysis['macd'],
                 "ema_20": analysis['trend']['ema_20'],
                 "ema_50": analysis['trend']['ema_50'],
+                "tendencia": analysis['trend']['trend'],
                 "volume": analysis['volume']
             },
             "analise": analysis_text,
-            "criado_em": datetime.now().isoformat(),
-            "expira_em": (datetime.now() + timedelta(hours=24)).isoformat()
+            "criado_em": now.isoformat(),
+            "expira_em": (now + timedelta(hours=settings.SIGNAL_EXPIRY_HOURS)).isoformat()
         }
         
         return signal
     
+    def generate_signal(self, symbol: str, timeframe: str = "1h") -> Optional[Dict]:
+        """
+        Gerar sinal completo para um símbolo
+        
+        Args:
+            symbol: Par de trading (ex: 'BTC/USDT')
+            timeframe: Timeframe para análise
+        
+        Returns:
+            Dicionário com sinal completo ou None
+        """
+        # Buscar dados e fazer análise técnica
+        with tracer.span("signals.analyze", symbol=symbol, timeframe=timeframe):
+            analysis = self.fetch_analysis(symbol, timeframe)
+        
+        if analysis is None:
+            return None
+        
+        # Candles velhos (exchange fora): não emitir como sinal novo
+        if analysis.get("stale"):
+            logger.info("Candles velhos para %s %s, sinal não gerado", symbol, timeframe)
+            return None
+        
+        # Detectar tipo de sinal
+        signal_type = self.detect_signal_type(analysis)
+        
+        if signal_type is None:
+            return None  # Não há sinal claro
+        
+        # Calcular probabilidade
+        probability = self.calculate_probability(analysis)
+        
+        if probability < self.min_probability:
+            return None  # Probabilidade muito baixa
+        
+        return self.build_signal(symbol, timeframe, analysis, signal_type, probability)
+    
     def generate_signals_batch(
         self, 
         symbols: List[str], 
@@ -289,6 +309,11 @@ class SignalGenerator:
         """
         Gerar sinais para múltiplos símbolos
         
+        A pontuação de todos os símbolos é feita de uma vez (vetorizada).
+        Símbolos cujos candles vieram velhos (exchange falhou) ficam de fora.
+        Os candles buscados também atualizam a correlação entre símbolos,
+        usada para descartar sinais redundantes.
+        
         Args:
             symbols: Lista de pares
             timeframe: Timeframe
@@ -296,18 +321,111 @@ class SignalGenerator:
         Returns:
             Lista de sinais gerados
         """
-        signals = []
+        with tracer.span("signals.batch", timeframe=timeframe, symbols=len(symbols)) as span:
+            signals = self._generate_signals_batch(symbols, timeframe)
+            span.set_attribute("signals", len(signals))
+            return signals
+    
+    def analyze_scored(self, frames: Dict[str, pd.DataFrame], timeframe: str) -> List[tuple]:
+        """
+        Análise técnica + pontuação de todos os símbolos
+        
+        Com ANALYSIS_EXECUTION=process (e lote grande o bastante) roda no
+        pool de processos; se o pool falhar, cai para a thread atual.
         
+        Returns:
+            [(symbol, análise, direção, probabilidade)]
+        """
+        if analysis_pool.should_use(len(frames)):
+            with tracer.span("signals.analysis_pool", timeframe=timeframe, symbols=len(frames),
+                             workers=analysis_pool.workers) as span:
+                try:
+                    results = analysis_pool.analyze(frames, self.rule_variants, self.indicators)
+                except Exception as e:
+                    span.record_exception(e)
+                    logger.warning("Erro no pool de análise, usando a thread atual: %s", e)
+                else:
+                    scored = []
+                    for symbol, analysis, direction, probability, error in results:
+                        if error:
+                            logger.warning("Erro ao gerar sinal para %s: %s", symbol, error)
+                            continue
+                        scored.append((symbol, analysis, direction, probability))
+                    return scored
+        
+        analyzed = []
+        for symbol, df in frames.items():
+            with tracer.span("signals.analyze", symbol=symbol, timeframe=timeframe) as span:
+                try:
+                    analyzed.append((symbol, technical_analysis.get_full_analysis(df, self.indicators)))
+                except Exception as e:
+                    span.record_exception(e)
+                    logger.warning("Erro ao gerar sinal para %s: %s", symbol, e)
+        
+        if not analyzed:
+            return []
+        
+        with tracer.span("signals.scoring", timeframe=timeframe, symbols=len(analyzed)):
+            scores = self.rules.evaluate([analysis for _, analysis in analyzed])["default"]
+        
+        return [
+            (symbol, analysis, direction, probability.item())
+            for (symbol, analysis), direction, probability in zip(
+                analyzed, scores["direction"], scores["probability"]
+            )
+        ]
+    
+    def _generate_signals_batch(self, symbols: List[str], timeframe: str) -> List[Dict]:
+        frames = {}
+        
+        # I/O fica sempre no processo atual (scheduler, rate limit, cache)
         for symbol in symbols:
+            with tracer.span("signals.fetch", symbol=symbol, timeframe=timeframe) as span:
+                try:
+                    df = self.fetch_candles(symbol, timeframe)
+                    if df is None:
+                        continue
+                    # Candles velhos (exchange fora): nem sinal nem correlação
+                    if df.attrs.get('stale'):
+                        span.set_attribute("stale", True)
+                        logger.info("Candles velhos para %s %s, sinal não gerado", symbol, timeframe)
+                        continue
+                    frames[symbol] = df
+                except Exception as e:
+                    span.record_exception(e)
+                    logger.warning("Erro ao gerar sinal para %s: %s", symbol, e)
+        
+        if not frames:
+            return []
+        
+        with tracer.span("signals.correlation", timeframe=timeframe, symbols=len(frames)) as span:
             try:
-                signal = self.generate_signal(symbol, timeframe)
-                if signal:
-                    signals.append(signal)
+                correlation_tracker.update(
+                    timeframe,
+                    binance_service.exchange.parse_timeframe(timeframe) * 1000,
+                    frames,
+                    binance_service.exchange.milliseconds()
+                )
             except Exception as e:
-                print(f"Erro ao gerar sinal para {symbol}: {e}")
-                continue
+                span.record_exception(e)
+                logger.warning("Erro ao atualizar correlação: %s", e)
         
-        return signals
+        scored = self.analyze_scored(frames, timeframe)
+        
+        signals = []
+        with tracer.span("signals.build", timeframe=timeframe):
+            for symbol, analysis, signal_type, probability in scored:
+                if signal_type is None or probability < self.min_probability:
+                    continue
+                try:
+                    signals.append(
+                        self.build_signal(symbol, timeframe, analysis, signal_type, probability)
+                    )
+                except Exception as e:
+                    logger.warning("Erro ao gerar sinal para %s: %s", symbol, e)
+                    continue
+        
+        return self.deduplicate(signals, timeframe)
 
 # Instância global
 signal_generator = SignalGenerator()
\ No newline at end of file
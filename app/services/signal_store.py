@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import text, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.signal import Signal
+from app.services.cache import TTLCache
+from app.services.webhooks import enqueue_signals, webhook_dispatcher
+
+# Cache de detalhes por ID (invalidado quando save_signals atualiza ou expira a linha)
+_detail_cache = TTLCache(maxsize=2048, ttl=60)
+
+SIGNAL_FIELDS = [
+    "moeda", "tipo", "timeframe",
+    "preco_entrada", "stop_loss",
+    "take_profit_1", "take_profit_2", "take_profit_3",
+    "alavancagem", "probabilidade", "status",
+    "indicadores", "analise"
+]
+
+# Campos atualizados quando um ciclo novo reaproveita o sinal ativo
+UPDATABLE_FIELDS = [
+    "preco_entrada", "stop_loss",
+    "take_profit_1", "take_profit_2", "take_profit_3",
+    "alavancagem", "probabilidade",
+    "indicadores", "analise"
+]
+
+OPPOSITE = {"LONG": "SHORT", "SHORT": "LONG"}
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _parse_datetime(value) -> Optional[datetime]:
+    """ISO 8601/datetime -> datetime com fuso (sem fuso = UTC, como o gerador)"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def to_dict(row: Signal) -> Dict:
+    """
+    Serializar um Signal no mesmo formato do SignalGenerator (com id)
+    """
+    data = {"id": row.id}
+    for field in SIGNAL_FIELDS:
+        data[field] = getattr(row, field)
+    for field in ["criado_em", "atualizado_em", "expira_em"]:
+        value = getattr(row, field)
+        data[field] = value.isoformat() if value else None
+    data["preco_saida"] = row.preco_saida
+    data["resultado_percentual"] = row.resultado_percentual
+    return data
+
+def indicator_columns(indicadores: Optional[Dict]) -> Dict:
+    """
+    Valores das colunas tipadas (rsi_valor, macd_histograma, ...) a partir de indicadores
+    """
+    indicadores = indicadores or {}
+    return {
+        "rsi_valor": (indicadores.get("rsi") or {}).get("value"),
+        "macd_histograma": (indicadores.get("macd") or {}).get("histogram"),
+        "tendencia": indicadores.get("tendencia"),
+        "volume_status": (indicadores.get("volume") or {}).get("status"),
+    }
+
+def _indicator_contains(db: Session, section: str, key: str, value: str):
+    """
+    Filtro indicadores[section][key] == value
+    
+    No Postgres vira contenção JSONB (@>), que usa o índice GIN;
+    nos demais bancos, extração do campo JSON.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return type_coerce(Signal.indicadores, JSONB).contains({section: {key: value}})
+    return Signal.indicadores[section][key].as_string() == value
+
+def _active_query(db: Session, now: datetime):
+    # Um sinal ativo foi criado há no máximo SIGNAL_EXPIRY_HOURS; o limite
+    # em criado_em deixa o Postgres ler só as partições recentes
+    return db.query(Signal).filter(
+        Signal.criado_em >= now - timedelta(hours=settings.SIGNAL_EXPIRY_HOURS),
+        Signal.status == "ATIVO",
+        Signal.expira_em > now
+    )
+
+def _lock_keys(db: Session, keys):
+    """
+    Serializar gravações concorrentes da mesma moeda/timeframe (refresh
+    da API e instâncias do gerador) até o commit; a chave não inclui o
+    tipo porque uma virada LONG/SHORT mexe nas duas linhas
+    
+    Sem isso, duas transações leem "nenhum sinal ativo" e ambas inserem.
+    No Postgres: advisory lock por chave, em ordem fixa (sem deadlock);
+    um índice único não serve porque a tabela particionada exigiria
+    criado_em na chave. No SQLite: lock de escrita do banco antes da leitura.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(
+            text(
+                "SELECT pg_advisory_xact_lock(hashtext(k)) "
+                "FROM (SELECT unnest(CAST(:keys AS text[])) AS k ORDER BY hashtext(k), k) AS ordered"
+            ),
+            {"keys": sorted({"signal:" + "|".join(key) for key in keys})}
+        )
+    elif dialect == "sqlite":
+        db.execute(text("UPDATE signals SET id = id WHERE 0"))
+
+def save_signals(db: Session, signals: List[Dict]) -> List[Dict]:
+    """
+    Persistir sinais gerados, reaproveitando sinais ativos equivalentes
+    
+    Um sinal ativo (não expirado) para a mesma moeda/timeframe/tipo
+    mantém a linha e o ID originais, então o card que o usuário abriu
+    continua apontando para o mesmo sinal entre ciclos; preços,
+    probabilidade e indicadores são atualizados com o ciclo atual.
+    Se a direção virou, o sinal ativo da direção oposta é expirado na
+    mesma transação.
+    
+    Returns:
+        Sinais salvos (com id), na mesma ordem
+    """
+    if not signals:
+        return []
+    
+    _lock_keys(db, {(s["moeda"], s["timeframe"]) for s in signals})
+    now = _utcnow()
+    existing = {
+        (row.moeda, row.timeframe, row.tipo): row
+        for row in _active_query(db, now).filter(
+            Signal.moeda.in_({s["moeda"] for s in signals})
+        ).order_by(Signal.criado_em)
+    }
+    
+    keys = {(s["moeda"], s["timeframe"], s["tipo"]) for s in signals}
+    rows = []
+    created = []
+    for signal in signals:
+        key = (signal["moeda"], signal["timeframe"], signal["tipo"])
+        
+        # Direção virou: encerrar o sinal oposto (se ele não veio neste lote)
+        opposite = (signal["moeda"], signal["timeframe"], OPPOSITE.get(signal["tipo"]))
+        if opposite not in keys and opposite in existing:
+            stale = existing.pop(opposite)
+            stale.status = "EXPIRADO"
+            _detail_cache.delete(stale.id)
+        
+        row = existing.get(key)
+        if row is not None and row not in created:
+            for field in UPDATABLE_FIELDS:
+                setattr(row, field, signal[field])
+            for column, value in indicator_columns(signal.get("indicadores")).items():
+                setattr(row, column, value)
+            _detail_cache.delete(row.id)
+        elif row is None:
+            row = Signal(
+                **{field: signal[field] for field in SIGNAL_FIELDS},
+                **indicator_columns(signal.get("indicadores")),
+                criado_em=_parse_datetime(signal.get("criado_em")),
+                expira_em=_parse_datetime(signal["expira_em"])
+            )
+            db.add(row)
+            existing[key] = row
+            created.append(row)
+        rows.append(row)
+    
+    # Sinais novos vão para a fila de webhooks na mesma transação
+    queued = 0
+    if created:
+        db.flush()
+        queued = enqueue_signals(db, [to_dict(row) for row in created])
+    
+    db.commit()
+    
+    if queued:
+        webhook_dispatcher.notify()
+    
+    return [to_dict(row) for row in rows]
+
+def list_active(
+    db: Session,
+    moeda: Optional[str] = None,
+    tipo: Optional[str] = None,
+    probabilidade_min: Optional[float] = None,
+    timeframe: Optional[str] = None,
+    rsi_min: Optional[float] = None,
+    rsi_max: Optional[float] = None,
+    rsi_status: Optional[str] = None,
+    macd_status: Optional[str] = None,
+    macd_histograma_min: Optional[float] = None,
+    macd_histograma_max: Optional[float] = None,
+    tendencia: Optional[str] = None,
+    volume_status: Optional[str] = None
+) -> List[Dict]:
+    """
+    Buscar sinais ativos com filtros, do mais provável para o menos
+    
+    Os filtros de indicadores rodam no banco: colunas tipadas indexadas
+    (rsi_valor, macd_histograma, tendencia, volume_status) e, para os
+    status de RSI/MACD, contenção no JSONB indexado por GIN.
+    """
+    query = _active_query(db, _utcnow())
+    
+    if moeda:
+        query = query.filter(Signal.moeda == moeda)
+    if tipo:
+        query = query.filter(Signal.tipo == tipo.upper())
+    if probabilidade_min:
+        query = query.filter(Signal.probabilidade >= probabilidade_min)
+    if timeframe:
+        query = query.filter(Signal.timeframe == timeframe)
+    
+    # Indicadores
+    if rsi_min is not None:
+        query = query.filter(Signal.rsi_valor >= rsi_min)
+    if rsi_max is not None:
+        query = query.filter(Signal.rsi_valor <= rsi_max)
+    if macd_histograma_min is not None:
+        query = query.filter(Signal.macd_histograma >= macd_histograma_min)
+    if macd_histograma_max is not None:
+        query = query.filter(Signal.macd_histograma <= macd_histograma_max)
+    if tendencia:
+        query = query.filter(Signal.tendencia == tendencia.upper())
+    if volume_status:
+        query = query.filter(Signal.volume_status == volume_status.upper())
+    if rsi_status:
+        query = query.filter(_indicator_contains(db, "rsi", "status", rsi_status.upper()))
+    if macd_status:
+        query = query.filter(_indicator_contains(db, "macd", "status", macd_status.upper()))
+    
+    return [to_dict(row) for row in query.order_by(Signal.probabilidade.desc())]
+
+def get_signal(db: Session, signal_id: int) -> Optional[Dict]:
+    """
+    Buscar sinal por ID (chave primária) com cache LRU em memória
+    """
+    signal = _detail_cache.get(signal_id)
+    if signal is not None:
+        return signal
+    
+    row = db.query(Signal).filter(Signal.id == signal_id).first()
+    if row is None:
+        return None
+    
+    signal = to_dict(row)
+    _detail_cache.set(signal_id, signal)
+    return signal
+
+def get_latest_signal(db: Session, moeda: str, timeframe: str) -> Optional[Dict]:
+    """
+    Sinal ativo mais recente de uma moeda/timeframe (IDs antigos "BTC-USDT-1h")
+    """
+    row = _active_query(db, _utcnow()).filter(
+        Signal.moeda == moeda,
+        Signal.timeframe == timeframe
+    ).order_by(Signal.criado_em.desc()).first()
+    
+    return to_dict(row) if row else None
\ No newline at end of file
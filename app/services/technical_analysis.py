@@ -1,64 +1,176 @@
 import pandas as pd
 import ta
-from typing import Dict, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from app.services.tracing import tracer
+
+# Candles para uma média exponencial "esquecer" o valor inicial:
+# depois de 3x o span o peso do seed fica abaixo de 0,3%
+EMA_WARMUP_FACTOR = 3
+
+def ema_warmup(span: int) -> int:
+    """Lookback de aquecimento para uma EMA com o span dado"""
+    return EMA_WARMUP_FACTOR * span
+
+class Indicator:
+    """
+    Indicador registrado: coluna que produz, aquecimento e dependências
+    
+    Args:
+        name: Nome da coluna gerada no DataFrame
+        compute: Função (df) -> Series
+        lookback: Candles de aquecimento próprios (além das dependências)
+        depends: Colunas que precisam existir antes
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[pd.DataFrame], pd.Series],
+        lookback: int,
+        depends: Tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.compute = compute
+        self.lookback = lookback
+        self.depends = depends
+
+# Registro de indicadores disponíveis
+INDICATORS: Dict[str, Indicator] = {}
+
+def register_indicator(name: str, lookback: int, depends: Tuple[str, ...] = ()):
+    """Decorator para registrar um indicador"""
+    def decorator(compute: Callable[[pd.DataFrame], pd.Series]):
+        INDICATORS[name] = Indicator(name, compute, lookback, depends)
+        return compute
+    return decorator
+
+# RSI (Relative Strength Index) - suavização de Wilder equivale a span 2*14-1
+@register_indicator('rsi', lookback=ema_warmup(2 * 14 - 1) + 1)
+def _rsi(df: pd.DataFrame) -> pd.Series:
+    return ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
+
+# MACD (Moving Average Convergence Divergence)
+@register_indicator('macd', lookback=ema_warmup(26))
+def _macd(df: pd.DataFrame) -> pd.Series:
+    return ta.trend.MACD(
+        close=df['close'],
+        window_slow=26,
+        window_fast=12,
+        window_sign=9
+    ).macd()
+
+@register_indicator('macd_signal', lookback=ema_warmup(9), depends=('macd',))
+def _macd_signal(df: pd.DataFrame) -> pd.Series:
+    # EMA de 9 sobre a linha do MACD (igual a ta.trend.MACD.macd_signal)
+    return ta.trend.EMAIndicator(close=df['macd'], window=9).ema_indicator()
+
+@register_indicator('macd_diff', lookback=0, depends=('macd', 'macd_signal'))
+def _macd_diff(df: pd.DataFrame) -> pd.Series:
+    return df['macd'] - df['macd_signal']
+
+# EMAs (Exponential Moving Averages)
+@register_indicator('ema_20', lookback=ema_warmup(20))
+def _ema_20(df: pd.DataFrame) -> pd.Series:
+    return ta.trend.EMAIndicator(close=df['close'], window=20).ema_indicator()
+
+@register_indicator('ema_50', lookback=ema_warmup(50))
+def _ema_50(df: pd.DataFrame) -> pd.Series:
+    return ta.trend.EMAIndicator(close=df['close'], window=50).ema_indicator()
+
+@register_indicator('ema_200', lookback=ema_warmup(200))
+def _ema_200(df: pd.DataFrame) -> pd.Series:
+    return ta.trend.EMAIndicator(close=df['close'], window=200).ema_indicator()
+
+# Bollinger Bands (janela simples: 20 candles bastam). Média e desvio
+# calculados uma vez só: a banda inferior é o espelho da superior
+# (mesmos valores de ta.volatility.BollingerBands, desvio populacional)
+@register_indicator('bb_mid', lookback=20)
+def _bb_mid(df: pd.DataFrame) -> pd.Series:
+    return df['close'].rolling(window=20).mean()
+
+@register_indicator('bb_high', lookback=0, depends=('bb_mid',))
+def _bb_high(df: pd.DataFrame) -> pd.Series:
+    return df['bb_mid'] + 2 * df['close'].rolling(window=20).std(ddof=0)
+
+@register_indicator('bb_low', lookback=0, depends=('bb_mid', 'bb_high'))
+def _bb_low(df: pd.DataFrame) -> pd.Series:
+    return 2 * df['bb_mid'] - df['bb_high']
+
+# Volume
+@register_indicator('volume_sma', lookback=20)
+def _volume_sma(df: pd.DataFrame) -> pd.Series:
+    return df['volume'].rolling(window=20).mean()
+
+def resolve_indicators(names: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Expandir dependências e ordenar para cálculo
+    
+    Args:
+        names: Indicadores pedidos (None = todos)
+    
+    Returns:
+        Lista ordenada (dependências antes)
+    """
+    names = list(INDICATORS) if names is None else list(names)
+    ordered: List[str] = []
+    visiting: Set[str] = set()
+    
+    def visit(name: str):
+        if name in ordered:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependência circular no indicador {name}")
+        if name not in INDICATORS:
+            raise ValueError(f"Indicador desconhecido: {name}")
+        visiting.add(name)
+        for dep in INDICATORS[name].depends:
+            visit(dep)
+        visiting.discard(name)
+        ordered.append(name)
+    
+    for name in names:
+        visit(name)
+    return ordered
+
+def indicator_lookback(name: str) -> int:
+    """Aquecimento total de um indicador, somando a cadeia de dependências"""
+    indicator = INDICATORS[name]
+    deps = [indicator_lookback(dep) for dep in indicator.depends]
+    return indicator.lookback + max(deps, default=0)
 
 class TechnicalAnalysis:
     
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def required_candles(self, indicators: Optional[Iterable[str]] = None) -> int:
         """
-        Calcular todos os indicadores técnicos
+        Número de candles a buscar para os indicadores ficarem aquecidos
+        
+        Args:
+            indicators: Indicadores usados (None = todos)
+        
+        Returns:
+            Maior lookback + candle anterior (cruzamento do MACD) + candle atual
+        """
+        names = resolve_indicators(indicators)
+        return max((indicator_lookback(n) for n in names), default=0) + 2
+    
+    def calculate_indicators(
+        self,
+        df: pd.DataFrame,
+        indicators: Optional[Iterable[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Calcular indicadores técnicos
         
         Args:
             df: DataFrame com OHLCV
+            indicators: Indicadores a calcular (None = todos); as
+                dependências são incluídas automaticamente
         
         Returns:
             DataFrame com indicadores adicionados
         """
-        # RSI (Relative Strength Index)
-        df['rsi'] = ta.momentum.RSIIndicator(
-            close=df['close'], 
-            window=14
-        ).rsi()
-        
-        # MACD (Moving Average Convergence Divergence)
-        macd = ta.trend.MACD(
-            close=df['close'],
-            window_slow=26,
-            window_fast=12,
-            window_sign=9
-        )
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        df['macd_diff'] = macd.macd_diff()
-        
-        # EMAs (Exponential Moving Averages)
-        df['ema_20'] = ta.trend.EMAIndicator(
-            close=df['close'], 
-            window=20
-        ).ema_indicator()
-        
-        df['ema_50'] = ta.trend.EMAIndicator(
-            close=df['close'], 
-            window=50
-        ).ema_indicator()
-        
-        df['ema_200'] = ta.trend.EMAIndicator(
-            close=df['close'], 
-            window=200
-        ).ema_indicator()
-        
-        # Bollinger Bands
-        bollinger = ta.volatility.BollingerBands(
-            close=df['close'],
-            window=20,
-            window_dev=2
-        )
-        df['bb_high'] = bollinger.bollinger_hband()
-        df['bb_mid'] = bollinger.bollinger_mavg()
-        df['bb_low'] = bollinger.bollinger_lband()
-        
-        # Volume
-        df['volume_sma'] = df['volume'].rolling(window=20).mean()
+        for name in resolve_indicators(indicators):
+            df[name] = INDICATORS[name].compute(df)
         
         return df
     
@@ -130,7 +242,6 @@ class TechnicalAnalysis:
         
         macd = last['macd']
         macd_signal = last['macd_signal']
-        macd_diff = last['macd_diff']
         
         # Detectar cruzamentos
         signal = "NEUTRO"
@@ -146,12 +257,17 @@ class TechnicalAnalysis:
         elif macd < macd_signal:
             signal = "BAIXA"
         
-        return {
+        result = {
             "macd": float(macd),
             "signal": float(macd_signal),
-            "histogram": float(macd_diff),
             "status": signal
         }
+        
+        # Histograma só se foi calculado
+        if 'macd_diff' in df:
+            result["histogram"] = float(last['macd_diff'])
+        
+        return result
     
     def analyze_volume(self, df: pd.DataFrame) -> Dict:
         """
@@ -177,31 +293,59 @@ class TechnicalAnalysis:
             "status": status
         }
     
-    def get_full_analysis(self, df: pd.DataFrame) -> Dict:
+    def get_full_analysis(
+        self,
+        df: pd.DataFrame,
+        indicators: Optional[Iterable[str]] = None
+    ) -> Dict:
         """
         Análise técnica completa
         
+        Args:
+            df: DataFrame com OHLCV
+            indicators: Indicadores a calcular (None = todos); seções
+                cujos indicadores não foram calculados ficam de fora
+        
         Returns:
-            Dicionário com todas as análises
+            Dicionário com todas as análises; "stale" = candles da última
+            resposta boa da exchange (df.attrs['stale'], busca falhou)
         """
+        with tracer.span("analysis.full_analysis", candles=len(df)):
+            return self._full_analysis(df, indicators)
+    
+    def _full_analysis(self, df: pd.DataFrame, indicators: Optional[Iterable[str]]) -> Dict:
+        stale = bool(df.attrs.get('stale', False))
+        
         # Calcular indicadores
-        df = self.calculate_indicators(df)
+        df = self.calculate_indicators(df, indicators)
         
         # Obter última linha
         last = df.iloc[-1]
         
-        return {
-            "trend": self.analyze_trend(df),
-            "rsi": self.analyze_rsi(df),
-            "macd": self.analyze_macd(df),
-            "volume": self.analyze_volume(df),
-            "bollinger": {
+        analysis = {"stale": stale}
+        
+        if {'ema_20', 'ema_50', 'ema_200'} <= set(df.columns):
+            analysis["trend"] = self.analyze_trend(df)
+        
+        if 'rsi' in df:
+            analysis["rsi"] = self.analyze_rsi(df)
+        
+        if {'macd', 'macd_signal'} <= set(df.columns):
+            analysis["macd"] = self.analyze_macd(df)
+        
+        if 'volume_sma' in df:
+            analysis["volume"] = self.analyze_volume(df)
+        
+        if {'bb_high', 'bb_low'} <= set(df.columns):
+            analysis["bollinger"] = {
                 "upper": float(last['bb_high']),
-                "middle": float(last['bb_mid']),
                 "lower": float(last['bb_low']),
                 "current_price": float(last['close'])
             }
-        }
+            if 'bb_mid' in df:
+                analysis["bollinger"]["middle"] = float(last['bb_mid'])
+        
+        return analysis
 
 # Instância global
 technical_analysis = TechnicalAnalysis()
\ No newline at end of file
@@ -0,0 +1,402 @@
+"""
+Tracing do pipeline de sinais e logging não bloqueante
+
+Spans encadeados via contextvars (o FastAPI copia o contexto para a
+threadpool, então a chamada à exchange feita dentro de um endpoint
+síncrono vira filha do span da requisição). Spans terminados vão para
+uma fila e uma thread de fundo grava em lote:
+
+- TRACING_FILE: uma linha JSON por span
+- TRACING_COLLECTOR_URL: POST no formato Zipkin v2 (Zipkin, Jaeger,
+  OpenTelemetry Collector com receiver zipkin)
+
+Com a fila cheia o span é descartado (e contado) em vez de segurar a
+requisição. Desligado (TRACING_ENABLED=false), span() devolve um span
+vazio compartilhado e não custa quase nada.
+
+O logging usa QueueHandler: quem loga só enfileira o registro, e o
+QueueListener escreve no stderr em outra thread. Cada registro leva o
+trace_id/span_id do span corrente.
+"""
+import atexit
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+from app.config import settings
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Operação cronometrada com atributos, ligada ao span pai
+    
+    Use como context manager; exceções marcam o span com erro e seguem.
+    """
+    
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "attributes",
+                 "start", "duration", "error", "_started", "_token", "_exporter")
+    
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict, exporter: "SpanExporter"):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+        self._token = None
+        self._exporter = exporter
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def record_exception(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+    
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self._started
+            self._exporter.export(self)
+    
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+        return False
+    
+    def to_dict(self) -> Dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+    
+    def to_zipkin(self) -> Dict:
+        tags = {key: str(value) for key, value in self.attributes.items()}
+        if self.error:
+            tags["error"] = self.error
+        span = {
+            "traceId": self.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": int(self.start * 1_000_000),
+            "duration": max(1, int(self.duration * 1_000_000)),
+            "localEndpoint": {"serviceName": settings.TRACING_SERVICE_NAME},
+            "tags": tags,
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Span de requisição não amostrada ou tracing desligado"""
+    
+    trace_id = span_id = parent_id = None
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def record_exception(self, exc: BaseException):
+        pass
+    
+    def end(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """
+    Fila de spans terminados + thread que grava em lote
+    
+    Args:
+        path: Arquivo JSONL (vazio = não gravar em arquivo)
+        max_bytes: Tamanho do arquivo a partir do qual ele vira .1
+        collector_url: Endpoint Zipkin v2 (vazio = não enviar)
+        queue_size: Spans aguardando exportação antes de descartar
+        batch_size: Spans por escrita/POST
+        flush_seconds: Intervalo máximo entre escritas
+    """
+    
+    def __init__(
+        self,
+        path: str = "",
+        max_bytes: int = 100 * 1024 * 1024,
+        collector_url: str = "",
+        queue_size: int = 10000,
+        batch_size: int = 512,
+        flush_seconds: float = 1.0
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.collector_url = collector_url
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"exported": 0, "dropped": 0, "errors": 0}
+    
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return
+        if self._thread is None:
+            self._start()
+    
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+    
+    def _drain(self, first: Optional[Span] = None) -> List[Span]:
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _write(self, batch: List[Span]):
+        if not batch:
+            return
+        try:
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a") as f:
+                    f.write("".join(json.dumps(s.to_dict(), default=str) + "\n" for s in batch))
+            if self.collector_url:
+                request = urllib.request.Request(
+                    self.collector_url,
+                    data=json.dumps([s.to_zipkin() for s in batch]).encode(),
+                    headers={"Content-Type": "application/json"},
+                    method="POST"
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+            self.stats["exported"] += len(batch)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning("Erro ao exportar %d spans: %s", len(batch), e)
+    
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+    
+    def flush(self):
+        """Gravar o que estiver na fila (na saída do processo)"""
+        while not self._queue.empty():
+            self._write(self._drain())
+
+
+class Tracer:
+    """
+    Cria spans filhos do span corrente (ou raiz, sorteada pela taxa)
+    
+    Args:
+        exporter: Destino dos spans terminados
+        enabled: Tracing ligado
+        sample_rate: Fração dos traces raiz gravados
+    """
+    
+    def __init__(self, exporter: SpanExporter, enabled: bool, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+    
+    def span(self, name: str, root: bool = False, **attributes):
+        """
+        Abrir um span (usar com `with`)
+        
+        Sem span pai, só abre um trace novo se root=True (requisição,
+        worker) e se sorteado; chamadas soltas fora de um trace
+        (ex: import, tarefas de manutenção) não geram spans órfãos.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            if not root or random.random() >= self.sample_rate:
+                return NOOP_SPAN
+        elif parent is NOOP_SPAN:
+            return NOOP_SPAN
+        return Span(name, parent, attributes, self.exporter)
+    
+    def traced(self, name: str, **attributes):
+        """Decorator: executa a função dentro de um span"""
+        def decorator(func: Callable):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def current_span():
+    """Span corrente (NOOP_SPAN fora de um trace amostrado)"""
+    return _current_span.get() or NOOP_SPAN
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre o span raiz de cada requisição HTTP e
+    devolve o trace id no header X-Trace-Id
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Requisições não amostradas também marcam o contexto, para que
+        # os spans filhos não abram traces próprios
+        span = tracer.span(f"{scope['method']} {scope['path']}", root=True,
+                           **{"http.method": scope["method"], "http.path": scope["path"]})
+        token = _current_span.set(span)
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and span is not NOOP_SPAN:
+                span.set_attribute("http.status_code", message["status"])
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-trace-id", span.trace_id.encode())]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+
+def instrument_engine(engine):
+    """
+    Span por comando SQL executado (filho do span corrente)
+    """
+    from sqlalchemy import event
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.span("db.query", **{"db.statement": statement[:200], "db.executemany": executemany})
+        if span is not NOOP_SPAN:
+            span.__enter__()
+            context._trace_span = span
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.__exit__(None, None, None)
+            context._trace_span = None
+    
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_trace_span", None) if context is not None else None
+        if span is not None:
+            span.__exit__(type(exception_context.original_exception), exception_context.original_exception, None)
+            context._trace_span = None
+
+
+class _TraceContextFilter(logging.Filter):
+    """Anexar trace_id/span_id do span corrente ao registro"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = getattr(span, "trace_id", None) or "-"
+        record.span_id = getattr(span, "span_id", None) or "-"
+        return True
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: str = "INFO"):
+    """
+    Logger "app" com QueueHandler: o registro é só enfileirado e o
+    QueueListener escreve no stderr em outra thread
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s [trace=%(trace_id)s span=%(span_id)s] %(message)s"
+    ))
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_TraceContextFilter())
+    
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(level.upper())
+    app_logger.addHandler(queue_handler)
+    app_logger.propagate = False
+    
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+logger = logging.getLogger(__name__)
+
+# Instâncias globais
+span_exporter = SpanExporter(
+    path=settings.TRACING_FILE,
+    max_bytes=int(settings.TRACING_FILE_MAX_MB * 1024 * 1024),
+    collector_url=settings.TRACING_COLLECTOR_URL,
+    queue_size=settings.TRACING_QUEUE_SIZE,
+    batch_size=settings.TRACING_BATCH_SIZE,
+    flush_seconds=settings.TRACING_FLUSH_SECONDS
+)
+tracer = Tracer(span_exporter, enabled=settings.TRACING_ENABLED, sample_rate=settings.TRACING_SAMPLE_RATE)
+configure_logging(settings.LOG_LEVEL)
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""
+Watchlists por usuário e casamento de sinais via índice invertido
+
+Cada item de watchlist entra em um balde (moeda|*, timeframe|*, tipo|*)
+com a lista de (probabilidade_min, user_id) ordenada. Para um sinal,
+basta olhar os 8 baldes que combinam com ele e, em cada um, cortar a
+lista com bisect na probabilidade do sinal: o custo cresce com o número
+de usuários que casam, não com o total de usuários.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.watchlist import Watchlist
+
+ANY = "*"
+
+
+def normalize_symbol(moeda: str) -> str:
+    """
+    'BTC/USDT:USDT' e 'btc/usdt' -> 'BTC/USDT'
+    
+    Os sinais usam o símbolo de futuros do ccxt (com o sufixo :SETTLE) e
+    o usuário costuma digitar só o par; os dois lados são comparados sem ele.
+    """
+    return moeda.split(":", 1)[0].strip().upper()
+
+
+def _key(moeda: Optional[str], timeframe: Optional[str], tipo: Optional[str]) -> Tuple[str, str, str]:
+    return (normalize_symbol(moeda) if moeda else ANY, timeframe or ANY, (tipo or ANY).upper())
+
+
+def entry_dict(row: Watchlist) -> Dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "moeda": row.moeda,
+        "timeframe": row.timeframe,
+        "tipo": row.tipo,
+        "probabilidade_min": row.probabilidade_min or 0,
+        "created_at": row.created_at,
+    }
+
+
+def entry_matches(entry: Dict, signal: Dict) -> bool:
+    """Um item casa com o sinal (comparação direta, sem índice)"""
+    return (
+        (not entry["moeda"] or normalize_symbol(entry["moeda"]) == normalize_symbol(signal["moeda"]))
+        and (not entry["timeframe"] or entry["timeframe"] == signal["timeframe"])
+        and (not entry["tipo"] or entry["tipo"].upper() == signal["tipo"])
+        and signal["probabilidade"] >= entry["probabilidade_min"]
+    )
+
+
+class WatchlistIndex:
+    """
+    Índice invertido em memória dos itens de watchlist (thread-safe)
+    """
+    
+    def __init__(self):
+        # balde -> limiares ordenados e (limiar, entry_id, user_id) na mesma ordem
+        self._thresholds: Dict[Tuple, List[float]] = defaultdict(list)
+        self._entries: Dict[Tuple, List[Tuple[float, int, int]]] = defaultdict(list)
+        self._keys: Dict[int, Tuple] = {}  # entry_id -> balde
+        self._user_entries: Dict[int, int] = defaultdict(int)  # user_id -> itens
+        self._lock = threading.RLock()
+        self.loaded_at: Optional[float] = None
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def add(self, entry: Dict):
+        with self._lock:
+            if entry["id"] in self._keys:
+                self.remove(entry["id"])
+            key = _key(entry["moeda"], entry["timeframe"], entry["tipo"])
+            item = (float(entry["probabilidade_min"]), entry["id"], entry["user_id"])
+            entries = self._entries[key]
+            position = bisect_right(entries, item)
+            entries.insert(position, item)
+            self._thresholds[key].insert(position, item[0])
+            self._keys[entry["id"]] = key
+            self._user_entries[entry["user_id"]] += 1
+    
+    def remove(self, entry_id: int):
+        with self._lock:
+            key = self._keys.pop(entry_id, None)
+            if key is None:
+                return
+            entries = self._entries[key]
+            for position, item in enumerate(entries):
+                if item[1] == entry_id:
+                    del entries[position]
+                    del self._thresholds[key][position]
+                    self._user_entries[item[2]] -= 1
+                    if not self._user_entries[item[2]]:
+                        del self._user_entries[item[2]]
+                    break
+            if not entries:
+                del self._entries[key]
+                del self._thresholds[key]
+    
+    def rebuild(self, entries: Iterable[Dict]):
+        """Recriar o índice do zero (ordenando cada balde uma vez só)"""
+        thresholds = defaultdict(list)
+        buckets = defaultdict(list)
+        keys = {}
+        user_entries = defaultdict(int)
+        for entry in entries:
+            key = _key(entry["moeda"], entry["timeframe"], entry["tipo"])
+            buckets[key].append((float(entry["probabilidade_min"]), entry["id"], entry["user_id"]))
+            keys[entry["id"]] = key
+            user_entries[entry["user_id"]] += 1
+        for key, items in buckets.items():
+            items.sort()
+            thresholds[key] = [item[0] for item in items]
+        
+        with self._lock:
+            self._thresholds = thresholds
+            self._entries = buckets
+            self._keys = keys
+            self._user_entries = user_entries
+            self.loaded_at = time.monotonic()
+    
+    def has_user(self, user_id: int) -> bool:
+        """Usuário tem pelo menos um item de watchlist"""
+        return user_id in self._user_entries
+    
+    def match(self, signal: Dict) -> Set[int]:
+        """
+        Usuários com algum item que casa com o sinal
+        
+        Args:
+            signal: Dicionário com moeda, timeframe, tipo e probabilidade
+        """
+        probability = signal["probabilidade"]
+        users: Set[int] = set()
+        with self._lock:
+            for moeda in (normalize_symbol(signal["moeda"]), ANY):
+                for timeframe in (signal["timeframe"], ANY):
+                    for tipo in (signal["tipo"], ANY):
+                        key = (moeda, timeframe, tipo)
+                        thresholds = self._thresholds.get(key)
+                        if not thresholds:
+                            continue
+                        end = bisect_right(thresholds, probability)
+                        users.update(item[2] for item in self._entries[key][:end])
+        return users
+
+
+def load_index(db: Session, force: bool = False) -> WatchlistIndex:
+    """
+    Índice global, carregado do banco na primeira vez e recarregado a
+    cada WATCHLIST_INDEX_REFRESH_SECONDS (alterações feitas por outros
+    processos da API)
+    """
+    index = watchlist_index
+    stale = (
+        index.loaded_at is None
+        or time.monotonic() - index.loaded_at >= settings.WATCHLIST_INDEX_REFRESH_SECONDS
+    )
+    if force or stale:
+        index.rebuild(entry_dict(row) for row in db.query(Watchlist).yield_per(5000))
+    return index
+
+
+def list_entries(db: Session, user_id: int) -> List[Dict]:
+    rows = db.query(Watchlist).filter(Watchlist.user_id == user_id).order_by(Watchlist.id)
+    return [entry_dict(row) for row in rows]
+
+
+def filter_signals(entries: List[Dict], signals: List[Dict]) -> List[Dict]:
+    """Sinais que casam com algum item da watchlist do usuário"""
+    return [s for s in signals if any(entry_matches(e, s) for e in entries)]
+
+
+# Instância global
+watchlist_index = WatchlistIndex()
\ No newline at end of file
@@ -0,0 +1,512 @@
+"""
+Entrega de sinais para webhooks e bots do Telegram
+
+Fluxo:
+1. save_signals chama enqueue_signals na mesma transação: uma linha em
+   webhook_deliveries por sinal novo x endpoint ativo (fila persistente).
+2. WebhookDispatcher roda um event loop asyncio em thread própria, pega
+   as entregas vencidas com um lease (UPDATE condicional com RETURNING:
+   só a transação que muda proxima_tentativa leva a linha, no Postgres e
+   no SQLite), no máximo batch_size x max_concorrencia por endpoint,
+   agrupa em lotes e envia com aiohttp.
+3. Sucesso marca ENTREGUE; erro reagenda com backoff exponencial até
+   WEBHOOK_MAX_ATTEMPTS, depois FALHOU. Se o processo cair, o lease
+   expira e a entrega volta para a fila.
+
+A geração de sinais só faz o INSERT na fila; endpoint lento ou fora do
+ar só ocupa os próprios slots e nunca segura o ciclo de geração.
+"""
+import asyncio
+import errno
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import random
+import socket
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit
+import aiohttp
+from aiohttp.resolver import ThreadedResolver
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.webhook import WebhookEndpoint, WebhookDelivery
+from app.services.cache import TTLCache
+from app.services.watchlists import load_index
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "PENDENTE"
+STATUS_DELIVERED = "ENTREGUE"
+STATUS_FAILED = "FALHOU"
+
+TIPO_WEBHOOK = "webhook"
+TIPO_TELEGRAM = "telegram"
+
+# Tempo que uma entrega pega pelo worker fica reservada
+LEASE_SECONDS = 120
+
+_endpoint_cache = TTLCache(maxsize=1, ttl=10)
+
+
+class UnsafeURLError(ValueError):
+    """URL de webhook inválida ou apontando para endereço não público"""
+
+
+def is_public_address(address: str) -> bool:
+    """Endereço roteável na internet (não loopback, rede privada, link-local/metadata, multicast...)"""
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _check_literal_host(host: str):
+    try:
+        ip = ipaddress.ip_address(host)
+    except ValueError:
+        return
+    if not settings.WEBHOOK_ALLOW_PRIVATE_URLS and not is_public_address(str(ip)):
+        raise UnsafeURLError(f"URL aponta para endereço não público ({ip})")
+
+
+def check_public_url(url: str):
+    """
+    Validar a URL de um webhook no cadastro (resolve o host)
+    
+    Raises:
+        UnsafeURLError: esquema não http(s), host inexistente ou algum
+            endereço resolvido não público
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise UnsafeURLError("URL inválida")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeURLError("URL inválida")
+    if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+        return
+    
+    _check_literal_host(parts.hostname)
+    try:
+        infos = socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise UnsafeURLError(f"Host não encontrado: {parts.hostname}")
+    for info in infos:
+        if not is_public_address(info[4][0]):
+            raise UnsafeURLError(f"URL aponta para endereço não público ({info[4][0]})")
+
+
+class PublicResolver(ThreadedResolver):
+    """
+    Resolver do aiohttp que recusa nomes que resolvem para endereços não
+    públicos na hora do envio (o DNS pode mudar depois do cadastro)
+    """
+    
+    async def resolve(self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET):
+        results = await super().resolve(host, port, family)
+        if not settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+            for result in results:
+                if not is_public_address(result["host"]):
+                    raise OSError(errno.EACCES, f"{host} resolve para endereço não público ({result['host']})")
+        return results
+
+
+def _endpoint_dict(endpoint: WebhookEndpoint) -> Dict:
+    return {
+        "id": endpoint.id,
+        "user_id": endpoint.user_id,
+        "tipo": endpoint.tipo,
+        "url": endpoint.url,
+        "chat_id": endpoint.chat_id,
+        "secret": endpoint.secret,
+        "max_concorrencia": endpoint.max_concorrencia or 1,
+    }
+
+
+def active_endpoints(db: Session) -> Dict[int, Dict]:
+    """Endpoints ativos de usuários ativos, por ID (cache de alguns segundos)"""
+    endpoints = _endpoint_cache.get("all")
+    if endpoints is None:
+        rows = db.query(WebhookEndpoint).join(User, User.id == WebhookEndpoint.user_id).filter(
+            WebhookEndpoint.is_active.is_(True),
+            User.is_active.is_(True)
+        )
+        endpoints = {row.id: _endpoint_dict(row) for row in rows}
+        _endpoint_cache.set("all", endpoints)
+    return endpoints
+
+
+def invalidate_endpoints():
+    """Chamar ao criar/alterar/remover endpoints"""
+    _endpoint_cache.clear()
+
+
+def enqueue_signals(db: Session, signals: List[Dict]) -> int:
+    """
+    Enfileirar sinais novos para os endpoints ativos (sem commit)
+    
+    Usuários com watchlist só recebem os sinais que casam com ela
+    (via índice invertido); usuários sem watchlist recebem todos.
+    
+    Returns:
+        Entregas criadas
+    """
+    if not signals:
+        return 0
+    endpoints = active_endpoints(db)
+    if not endpoints:
+        return 0
+    
+    by_user: Dict[int, List[int]] = defaultdict(list)
+    for endpoint in endpoints.values():
+        by_user[endpoint["user_id"]].append(endpoint["id"])
+    
+    index = load_index(db)
+    unfiltered = [user_id for user_id in by_user if not index.has_user(user_id)]
+    
+    now = datetime.now(timezone.utc)
+    rows = []
+    for signal in signals:
+        for user_id in chain(unfiltered, index.match(signal)):
+            for endpoint_id in by_user.get(user_id, ()):
+                rows.append({
+                    "endpoint_id": endpoint_id,
+                    "signal_id": signal.get("id"),
+                    "payload": signal,
+                    "status": STATUS_PENDING,
+                    "tentativas": 0,
+                    "proxima_tentativa": now,
+                })
+    
+    if rows:
+        db.execute(insert(WebhookDelivery), rows)
+    return len(rows)
+
+
+def retry_delay(attempt: int) -> float:
+    """Backoff exponencial com jitter (segundos até a próxima tentativa)"""
+    delay = min(settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempt - 1), settings.WEBHOOK_RETRY_MAX_SECONDS)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def format_telegram(signal: Dict) -> str:
+    emoji = "🟢" if signal.get("tipo") == "LONG" else "🔴"
+    return (
+        f"{emoji} {signal.get('tipo')} {signal.get('moeda')} ({signal.get('timeframe')})\n"
+        f"Entrada: {signal.get('preco_entrada')}\n"
+        f"Stop: {signal.get('stop_loss')}\n"
+        f"Alvos: {signal.get('take_profit_1')} / {signal.get('take_profit_2')} / {signal.get('take_profit_3')}\n"
+        f"Probabilidade: {signal.get('probabilidade')}%"
+    )
+
+
+def build_request(endpoint: Dict, signals: List[Dict]):
+    """
+    Corpo e headers de um lote para o endpoint
+    
+    Webhook: {"event": "signals.created", "signals": [...]}, assinado com
+    HMAC-SHA256 do corpo no header X-Signature se houver secret.
+    Telegram: uma mensagem com todos os sinais do lote.
+    """
+    if endpoint["tipo"] == TIPO_TELEGRAM:
+        body = {"chat_id": endpoint["chat_id"], "text": "\n\n".join(format_telegram(s) for s in signals)}
+    else:
+        body = {"event": "signals.created", "signals": signals}
+    
+    data = json.dumps(body).encode()
+    headers = {"Content-Type": "application/json"}
+    if endpoint.get("secret"):
+        digest = hmac.new(endpoint["secret"].encode(), data, hashlib.sha256).hexdigest()
+        headers["X-Signature"] = f"sha256={digest}"
+    return data, headers
+
+
+class WebhookDispatcher:
+    """
+    Worker de entregas (event loop asyncio em thread daemon)
+    
+    Args:
+        session_factory: Fábrica de sessões do banco
+        batch_size: Sinais por requisição
+        claim_limit: Entregas reservadas por consulta à fila
+    """
+    
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        batch_size: int = 20,
+        claim_limit: int = 1000
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.claim_limit = claim_limit
+        self.stats = {"delivered": 0, "failed": 0, "retried": 0, "requests": 0}
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._inflight: Dict[int, int] = defaultdict(int)
+        self._results: List[tuple] = []
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._thread_main, name="webhooks", daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5):
+        self._running = False
+        self.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def notify(self):
+        """Acordar o worker (há entregas novas na fila); pode ser chamado de qualquer thread"""
+        loop = self._loop
+        if loop is not None and self._wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                pass  # Loop já encerrado
+    
+    def _thread_main(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._run())
+        finally:
+            self._loop = None
+            loop.close()
+    
+    async def _run(self):
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        timeout = aiohttp.ClientTimeout(total=settings.WEBHOOK_TIMEOUT_SECONDS)
+        # IPs literais não passam pelo resolver: checados em _send
+        connector = aiohttp.TCPConnector(limit=settings.WEBHOOK_MAX_CONNECTIONS, resolver=PublicResolver())
+        
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            while self._running:
+                self._wakeup.clear()
+                claimed = 0
+                try:
+                    if self._results:
+                        results, self._results = self._results, []
+                        await loop.run_in_executor(None, self._record, results)
+                    
+                    batches = await loop.run_in_executor(None, self._claim, dict(self._inflight))
+                    for endpoint, deliveries in batches:
+                        claimed += len(deliveries)
+                        self._inflight[endpoint["id"]] += len(deliveries)
+                        task = asyncio.create_task(self._send(session, endpoint, deliveries))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+                except Exception as e:
+                    logger.warning("Erro no worker de webhooks: %s", e)
+                
+                # Fila cheia: buscar de novo sem esperar
+                if claimed >= self.claim_limit:
+                    await asyncio.sleep(0)
+                    continue
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.WEBHOOK_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+            
+            # Encerrando: esperar envios em andamento e gravar resultados
+            if self._tasks:
+                await asyncio.wait(self._tasks, timeout=settings.WEBHOOK_TIMEOUT_SECONDS)
+            if self._results:
+                await loop.run_in_executor(None, self._record, self._results)
+                self._results = []
+    
+    def _claim(self, inflight: Dict[int, int]) -> List[tuple]:
+        """
+        Reservar entregas vencidas (lease) e agrupá-las em lotes por endpoint
+        
+        Cada endpoint recebe no máximo batch_size x max_concorrencia
+        entregas em andamento: tudo o que é reservado já tem vaga no
+        semáforo do endpoint e é enviado na hora, então nenhum lote fica
+        esperando a vez até o lease vencer (o que faria a entrega sair duas
+        vezes).
+        
+        Args:
+            inflight: Entregas em andamento por endpoint
+        """
+        db = self.session_factory()
+        try:
+            now = datetime.now(timezone.utc)
+            endpoints = active_endpoints(db)
+            capacity = {
+                endpoint_id: self.batch_size * endpoint["max_concorrencia"] - inflight.get(endpoint_id, 0)
+                for endpoint_id, endpoint in endpoints.items()
+            }
+            full = [endpoint_id for endpoint_id, free in capacity.items() if free <= 0]
+            
+            # Posição de cada entrega na fila do seu endpoint
+            rank = func.row_number().over(
+                partition_by=WebhookDelivery.endpoint_id,
+                order_by=(WebhookDelivery.proxima_tentativa, WebhookDelivery.id)
+            ).label("rank")
+            due = select(WebhookDelivery.id, WebhookDelivery.endpoint_id, rank).where(
+                WebhookDelivery.status == STATUS_PENDING,
+                WebhookDelivery.proxima_tentativa <= now
+            )
+            if full:
+                due = due.where(WebhookDelivery.endpoint_id.notin_(full))
+            ranked = due.subquery()
+            largest = max([free for free in capacity.values() if free > 0], default=self.batch_size)
+            candidates = db.execute(
+                select(ranked.c.id, ranked.c.endpoint_id, ranked.c.rank)
+                .where(ranked.c.rank <= largest)
+                .order_by(ranked.c.rank, ranked.c.id)
+                .limit(self.claim_limit)
+            ).all()
+            # Endpoint inativo: só para marcar como FALHOU abaixo
+            ids = [
+                row.id for row in candidates
+                if row.rank <= capacity.get(row.endpoint_id, self.batch_size)
+            ]
+            if not ids:
+                db.rollback()
+                return []
+            
+            rows = db.execute(
+                update(WebhookDelivery)
+                .where(
+                    WebhookDelivery.id.in_(ids),
+                    WebhookDelivery.status == STATUS_PENDING,
+                    WebhookDelivery.proxima_tentativa <= now
+                )
+                .values(
+                    proxima_tentativa=now + timedelta(seconds=LEASE_SECONDS),
+                    tentativas=WebhookDelivery.tentativas + 1
+                )
+                .returning(
+                    WebhookDelivery.id,
+                    WebhookDelivery.endpoint_id,
+                    WebhookDelivery.payload,
+                    WebhookDelivery.tentativas
+                )
+                .execution_options(synchronize_session=False)
+            ).all()
+            orphans = [row.id for row in rows if row.endpoint_id not in endpoints]
+            if orphans:
+                db.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id.in_(orphans))
+                    .values(status=STATUS_FAILED, ultimo_erro="Endpoint inativo")
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        finally:
+            db.close()
+        
+        grouped: Dict[int, List[Dict]] = defaultdict(list)
+        for row in sorted(rows, key=lambda row: row.id):
+            if row.endpoint_id in endpoints:
+                grouped[row.endpoint_id].append(
+                    {"id": row.id, "payload": row.payload, "tentativas": row.tentativas}
+                )
+        
+        batches = []
+        for endpoint_id, deliveries in grouped.items():
+            for start in range(0, len(deliveries), self.batch_size):
+                batches.append((endpoints[endpoint_id], deliveries[start:start + self.batch_size]))
+        return batches
+    
+    async def _send(self, session: aiohttp.ClientSession, endpoint: Dict, deliveries: List[Dict]):
+        endpoint_id = endpoint["id"]
+        semaphore = self._semaphores.get(endpoint_id)
+        if semaphore is None:
+            semaphore = self._semaphores[endpoint_id] = asyncio.Semaphore(endpoint["max_concorrencia"])
+        
+        error = None
+        async with semaphore:
+            try:
+                _check_literal_host(urlsplit(endpoint["url"]).hostname or "")
+                data, headers = build_request(endpoint, [d["payload"] for d in deliveries])
+                self.stats["requests"] += 1
+                # Sem seguir redirecionamentos (poderiam levar a um endereço interno)
+                async with session.post(endpoint["url"], data=data, headers=headers, allow_redirects=False) as response:
+                    await response.read()
+                    if response.status >= 300:
+                        error = f"HTTP {response.status}"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"[:500]
+        
+        self._inflight[endpoint_id] -= len(deliveries)
+        self._results.append((deliveries, error))
+        self._wakeup.set()
+    
+    def _record(self, results: List[tuple]):
+        """Gravar o resultado dos envios (em lote)"""
+        now = datetime.now(timezone.utc)
+        delivered = []
+        failed = []
+        retries: Dict[int, List[int]] = defaultdict(list)
+        errors: Dict[str, List[int]] = defaultdict(list)
+        
+        for deliveries, error in results:
+            for delivery in deliveries:
+                if error is None:
+                    delivered.append(delivery["id"])
+                    continue
+                errors[error].append(delivery["id"])
+                if delivery["tentativas"] >= settings.WEBHOOK_MAX_ATTEMPTS:
+                    failed.append(delivery["id"])
+                else:
+                    retries[delivery["tentativas"]].append(delivery["id"])
+        
+        db = self.session_factory()
+        try:
+            if delivered:
+                db.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id.in_(delivered))
+                    .values(status=STATUS_DELIVERED, entregue_em=now, ultimo_erro=None)
+                )
+            for error, ids in errors.items():
+                db.execute(update(WebhookDelivery).where(WebhookDelivery.id.in_(ids)).values(ultimo_erro=error))
+            if failed:
+                db.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id.in_(failed))
+                    .values(status=STATUS_FAILED)
+                )
+            for attempt, ids in retries.items():
+                db.execute(
+                    update(WebhookDelivery)
+                    .where(WebhookDelivery.id.in_(ids))
+                    .values(proxima_tentativa=now + timedelta(seconds=retry_delay(attempt)))
+                )
+            db.commit()
+        finally:
+            db.close()
+        
+        self.stats["delivered"] += len(delivered)
+        self.stats["failed"] += len(failed)
+        self.stats["retried"] += sum(len(ids) for ids in retries.values())
+
+
+# Instância global
+webhook_dispatcher = WebhookDispatcher(
+    batch_size=settings.WEBHOOK_BATCH_SIZE,
+    claim_limit=settings.WEBHOOK_CLAIM_LIMIT
+)
\ No newline at end of file
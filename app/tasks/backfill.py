@@ -0,0 +1,239 @@
+"""
+Backfill de candles históricos para o arquivo local
+
+Uso:
+    python -m app.tasks.backfill --top 100 --timeframes 1h --since 2022-01-01
+    python -m app.tasks.backfill --symbols BTC/USDT,ETH/USDT --timeframes 1h,4h
+
+Pagina fetch_ohlcv(since=...) para frente a partir do último candle salvo
+e para trás a partir do primeiro, com concorrência limitada. O progresso
+fica no próprio arquivo de candles mais um checkpoint JSON, então rodar
+de novo (ou depois de uma interrupção) continua de onde parou.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from app.services.binance_service import binance_service
+from app.services.candle_store import candle_store, CandleStore
+
+logger = logging.getLogger(__name__)
+
+PAGE_LIMIT = 1500  # Máximo de candles por chamada no Binance Futures
+FLUSH_ROWS = 50000  # Gravar em lote a cada N candles
+MAX_RETRIES = 5
+
+
+class Checkpoint:
+    """
+    Checkpoint do backfill: até onde o histórico antigo já foi completado
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._data = json.load(f)
+
+    def _key(self, symbol: str, timeframe: str) -> str:
+        return f"{symbol}|{timeframe}"
+
+    def head_complete(self, symbol: str, timeframe: str, since: int) -> bool:
+        """
+        Histórico antigo já foi buscado até `since` (ou até a listagem)?
+        """
+        entry = self._data.get(self._key(symbol, timeframe))
+        return entry is not None and entry['head_since'] <= since
+
+    def mark_head_complete(self, symbol: str, timeframe: str, since: int):
+        with self._lock:
+            entry = self._data.get(self._key(symbol, timeframe))
+            if entry is not None:
+                since = min(since, entry['head_since'])
+            self._data[self._key(symbol, timeframe)] = {
+                'head_since': since,
+                'updated_at': datetime.now(timezone.utc).isoformat()
+            }
+            # Escrita atômica
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+class Backfill:
+
+    def __init__(
+        self,
+        store: CandleStore = candle_store,
+        concurrency: int = 8,
+        checkpoint_path: Optional[str] = None
+    ):
+        self.store = store
+        self.concurrency = concurrency
+        self.checkpoint = Checkpoint(
+            checkpoint_path or os.path.join(store.root, '_backfill.json')
+        )
+
+    def _fetch(self, symbol: str, timeframe: str, since: int) -> List[List[float]]:
+        """
+        Buscar uma página com retry e backoff exponencial
+        """
+        for attempt in range(MAX_RETRIES):
+            try:
+                return binance_service.fetch_ohlcv_page(
+                    symbol, timeframe, since=since, limit=PAGE_LIMIT
+                )
+            except Exception as e:
+                if attempt == MAX_RETRIES - 1:
+                    raise
+                delay = 2 ** attempt
+                logger.warning(
+                    "Erro no backfill de %s %s (tentativa %d): %s. Nova tentativa em %ds",
+                    symbol, timeframe, attempt + 1, e, delay
+                )
+                time.sleep(delay)
+
+    def _backward(self, symbol: str, timeframe: str, since: int, tf_ms: int) -> int:
+        """
+        Completar o histórico antigo (antes do primeiro candle salvo)
+        """
+        end = self.store.first_timestamp(symbol, timeframe)
+        written = 0
+        buffer: List[List[float]] = []
+
+        while end > since:
+            page_since = max(since, end - PAGE_LIMIT * tf_ms)
+            rows = [r for r in self._fetch(symbol, timeframe, page_since) if r[0] < end]
+            if not rows:
+                break  # Antes da listagem do par
+
+            buffer = rows + buffer
+            end = rows[0][0]
+
+            if len(buffer) >= FLUSH_ROWS:
+                written += self.store.prepend(symbol, timeframe, buffer)
+                buffer = []
+
+        if buffer:
+            written += self.store.prepend(symbol, timeframe, buffer)
+        return written
+
+    def _forward(self, symbol: str, timeframe: str, start: int, tf_ms: int) -> int:
+        """
+        Buscar candles novos até o último candle fechado
+        """
+        now = binance_service.exchange.milliseconds()
+        cutoff = now - now % tf_ms  # Início do candle ainda aberto
+        written = 0
+        buffer: List[List[float]] = []
+
+        while start < cutoff:
+            rows = [r for r in self._fetch(symbol, timeframe, start) if start <= r[0] < cutoff]
+            if not rows:
+                break
+
+            buffer.extend(rows)
+            start = rows[-1][0] + tf_ms
+
+            if len(buffer) >= FLUSH_ROWS:
+                written += self.store.append(symbol, timeframe, buffer)
+                buffer = []
+
+        if buffer:
+            written += self.store.append(symbol, timeframe, buffer)
+        return written
+
+    def run_one(self, symbol: str, timeframe: str, since: int) -> Dict:
+        """
+        Backfill de um par/timeframe
+
+        Returns:
+            Resumo com candles gravados para trás e para frente
+        """
+        tf_ms = binance_service.exchange.parse_timeframe(timeframe) * 1000
+        backward = 0
+
+        first = self.store.first_timestamp(symbol, timeframe)
+        if first is not None and not self.checkpoint.head_complete(symbol, timeframe, since):
+            backward = self._backward(symbol, timeframe, since, tf_ms)
+
+        last = self.store.last_timestamp(symbol, timeframe)
+        start = since if last is None else last + tf_ms
+        forward = self._forward(symbol, timeframe, start, tf_ms)
+
+        self.checkpoint.mark_head_complete(symbol, timeframe, since)
+
+        return {
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "backward": backward,
+            "forward": forward,
+            "total": self.store.length(symbol, timeframe)
+        }
+
+    def run(self, symbols: List[str], timeframes: List[str], since: int) -> List[Dict]:
+        """
+        Backfill de todo o universo com concorrência limitada
+        """
+        jobs = [(s, tf) for s in symbols for tf in timeframes]
+        results = []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self.run_one, symbol, timeframe, since): (symbol, timeframe)
+                for symbol, timeframe in jobs
+            }
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future]
+                try:
+                    result = future.result()
+                    results.append(result)
+                    logger.info(
+                        "[%d/%d] %s %s: +%d antigos, +%d novos, %d no total",
+                        len(results), len(jobs), symbol, timeframe,
+                        result['backward'], result['forward'], result['total']
+                    )
+                except Exception as e:
+                    logger.error("Erro no backfill de %s %s: %s", symbol, timeframe, e)
+
+        return results
+
+
+def _parse_date(value: str) -> int:
+    date = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(date.timestamp() * 1000)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Backfill de candles históricos")
+    parser.add_argument("--symbols", help="Pares separados por vírgula (ex: BTC/USDT,ETH/USDT)")
+    parser.add_argument("--top", type=int, default=100, help="Top N pares por volume (se --symbols não for passado)")
+    parser.add_argument("--timeframes", default="1h", help="Timeframes separados por vírgula")
+    parser.add_argument("--since", default="2020-01-01", help="Data inicial (YYYY-MM-DD)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pares baixados em paralelo")
+    args = parser.parse_args(argv)
+
+    if args.symbols:
+        symbols = [s.strip() for s in args.symbols.split(",") if s.strip()]
+    else:
+        symbols = binance_service.get_top_volume_pairs(limit=args.top)
+
+    timeframes = [tf.strip() for tf in args.timeframes.split(",") if tf.strip()]
+
+    started = time.time()
+    results = Backfill(concurrency=args.concurrency).run(symbols, timeframes, _parse_date(args.since))
+    written = sum(r['backward'] + r['forward'] for r in results)
+    logger.info("Backfill concluído: %d candles em %.1fs", written, time.time() - started)
+
+
+if __name__ == "__main__":
+    main()
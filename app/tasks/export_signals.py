@@ -0,0 +1,71 @@
+"""
+Exportação do histórico de sinais para pesquisa
+
+Uso:
+    python -m app.tasks.export_signals --output signals.csv
+    python -m app.tasks.export_signals --format parquet --output signals.parquet --since 2024-01-01
+    python -m app.tasks.export_signals --timeframe 4h --output - > signals_4h.csv
+
+Mesmo streaming da rota /api/history/export: lê em lotes com cursor do
+lado do servidor e grava cada lote antes de ler o próximo.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from typing import List, Optional
+from app.config import settings
+from app.database import engine
+from app.services.signal_export import stream_export, ExportError, FORMAT_CSV, FORMAT_PARQUET
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Exportar histórico de sinais em CSV ou Parquet")
+    parser.add_argument("--format", choices=[FORMAT_CSV, FORMAT_PARQUET], default=FORMAT_CSV)
+    parser.add_argument("--output", required=True, help="Arquivo de destino (- = stdout)")
+    parser.add_argument("--moeda", help="Ex: BTC/USDT")
+    parser.add_argument("--tipo", choices=["LONG", "SHORT"])
+    parser.add_argument("--timeframe")
+    parser.add_argument("--status", help="ATIVO, TP1, TP2, TP3, SL ou EXPIRADO")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="criado_em a partir de (ISO 8601)")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="criado_em antes de (ISO 8601)")
+    parser.add_argument("--chunk-size", type=int, default=settings.EXPORT_CHUNK_SIZE, help="Linhas por lote")
+    args = parser.parse_args(argv)
+    
+    filters = {
+        "moeda": args.moeda,
+        "tipo": args.tipo,
+        "timeframe": args.timeframe,
+        "status": args.status,
+        "desde": args.since,
+        "ate": args.until,
+    }
+    try:
+        chunks = stream_export(engine, args.format, filters, args.chunk_size)
+    except ExportError as e:
+        parser.error(str(e))
+    
+    started = time.time()
+    written = 0
+    to_stdout = args.output == "-"
+    tmp_path = args.output + ".tmp"
+    out = sys.stdout.buffer if to_stdout else open(tmp_path, "wb")
+    try:
+        for data in chunks:
+            out.write(data)
+            written += len(data)
+    except BaseException:
+        if not to_stdout:
+            out.close()
+            os.remove(tmp_path)
+        raise
+    if not to_stdout:
+        out.close()
+        os.replace(tmp_path, args.output)
+    
+    print(f"Exportados {written / 1024 / 1024:.1f} MB em {time.time() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,220 @@
+"""
+Gerador de sinais distribuído
+
+Uso (uma ou mais instâncias, na mesma máquina ou em máquinas diferentes,
+todas apontando para o mesmo DATABASE_URL):
+    python -m app.tasks.generate_signals
+    python -m app.tasks.generate_signals --timeframes 1h,4h --interval 60
+    python -m app.tasks.generate_signals --node-id gen-a --once
+
+Cada instância se registra em generator_nodes e renova o heartbeat numa
+thread própria. A cada ciclo lê as instâncias vivas, monta o anel de hash
+consistente (app/services/sharding.py) e gera só os pares moeda x
+timeframe que lhe pertencem, gravando na tabela signals compartilhada.
+Quando uma instância entra, sai (SIGTERM/SIGINT remove o registro) ou
+para de responder (heartbeat mais velho que NODE_TTL_SECONDS), as outras
+assumem os pares dela no ciclo seguinte.
+
+A deduplicação por correlação (CORRELATION_DEDUP) só compara os sinais
+gerados na mesma instância: dois pares correlacionados em instâncias
+diferentes podem ambos virar sinal.
+"""
+import argparse
+import logging
+import signal
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from sqlalchemy.exc import SQLAlchemyError
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.models.signal import Signal  # noqa: F401 (registra a tabela)
+from app.services import sharding, signal_store
+from app.services.binance_service import binance_service
+from app.services.request_scheduler import PRIORITY_DEFAULT
+from app.services.signal_generator import signal_generator
+from app.services.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+def symbol_universe(min_quote_volume: float, max_symbols: int = 0) -> List[str]:
+    """
+    Pares USDT com liquidez mínima, em ordem alfabética
+    
+    Todas as instâncias leem o mesmo snapshot de tickers; pequenas
+    diferenças entre snapshots só afetam os pares na fronteira do filtro.
+    """
+    tickers = binance_service.get_tickers(priority=PRIORITY_DEFAULT)
+    liquid = [
+        (symbol, ticker.get('quoteVolume') or 0)
+        for symbol, ticker in tickers.items()
+        if '/USDT' in symbol and (ticker.get('quoteVolume') or 0) >= min_quote_volume
+    ]
+    if max_symbols:
+        liquid = sorted(liquid, key=lambda item: -item[1])[:max_symbols]
+    return sorted(symbol for symbol, _ in liquid)
+
+
+class GeneratorWorker:
+    """
+    Instância do gerador
+    
+    Args:
+        node_id: ID único no anel
+        timeframes: Timeframes gerados
+        interval: Segundos entre ciclos
+        min_quote_volume: Filtro de liquidez do universo
+        max_symbols: Limite de pares do universo (0 = sem limite)
+    """
+    
+    def __init__(
+        self,
+        node_id: str,
+        timeframes: List[str],
+        interval: float,
+        min_quote_volume: float,
+        max_symbols: int = 0
+    ):
+        self.node_id = node_id
+        self.timeframes = timeframes
+        self.interval = interval
+        self.min_quote_volume = min_quote_volume
+        self.max_symbols = max_symbols
+        self.members: List[str] = []
+        self.jobs = 0
+        self._stop = threading.Event()
+    
+    def _beat(self, **fields):
+        db = SessionLocal()
+        try:
+            sharding.heartbeat(db, self.node_id, **fields)
+        finally:
+            db.close()
+    
+    def _heartbeat_loop(self):
+        while not self._stop.wait(settings.NODE_HEARTBEAT_SECONDS):
+            try:
+                self._beat()
+            except Exception as e:
+                logger.warning("Erro no heartbeat de %s: %s", self.node_id, e)
+    
+    def run_cycle(self) -> int:
+        """Um ciclo: anel atual -> pares desta instância -> sinais salvos"""
+        started = time.perf_counter()
+        
+        db = SessionLocal()
+        try:
+            ring = sharding.build_ring(db)
+        finally:
+            db.close()
+        
+        # Registro sumiu (ex: limpeza após travar mais que o TTL): voltar ao anel
+        if self.node_id not in ring.nodes:
+            self._beat()
+            ring = sharding.HashRing(ring.nodes + [self.node_id], vnodes=settings.NODE_VIRTUAL_NODES)
+        
+        if ring.nodes != self.members:
+            joined = sorted(set(ring.nodes) - set(self.members))
+            left = sorted(set(self.members) - set(ring.nodes))
+            logger.info(
+                "Anel com %d instâncias (entraram: %s; saíram: %s)",
+                len(ring.nodes), ", ".join(joined) or "-", ", ".join(left) or "-"
+            )
+            self.members = ring.nodes
+        
+        universe = symbol_universe(self.min_quote_volume, self.max_symbols)
+        owned = ring.jobs_for(self.node_id, [
+            (symbol, timeframe) for timeframe in self.timeframes for symbol in universe
+        ])
+        
+        by_timeframe: Dict[str, List[str]] = defaultdict(list)
+        for symbol, timeframe in owned:
+            by_timeframe[timeframe].append(symbol)
+        
+        saved = 0
+        with tracer.span("generator.cycle", root=True, node=self.node_id, jobs=len(owned)):
+            for timeframe, symbols in by_timeframe.items():
+                if binance_service.degraded():
+                    logger.warning("Exchange indisponível, pulando o restante do ciclo")
+                    break
+                signals = signal_generator.generate_signals_batch(symbols, timeframe)
+                db = SessionLocal()
+                try:
+                    saved += len(signal_store.save_signals(db, signals))
+                finally:
+                    db.close()
+        
+        self.jobs = len(owned)
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        self._beat(jobs=self.jobs, cycle_ms=elapsed_ms)
+        logger.info(
+            "%s: %d/%d pares, %d sinais em %d ms",
+            self.node_id, len(owned), len(universe) * len(self.timeframes), saved, elapsed_ms
+        )
+        return saved
+    
+    def run(self, once: bool = False):
+        self._beat(jobs=0)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="generator-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.run_cycle()
+                except Exception as e:
+                    logger.warning("Erro no ciclo de %s: %s", self.node_id, e)
+                if once:
+                    break
+                self._stop.wait(self.interval)
+        finally:
+            self._stop.set()
+            heartbeat.join(timeout=5)
+            self.leave()
+    
+    def stop(self, *_):
+        self._stop.set()
+    
+    def leave(self):
+        db = SessionLocal()
+        try:
+            sharding.leave(db, self.node_id)
+            sharding.prune_dead(db)
+        finally:
+            db.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Gerador de sinais distribuído por hash consistente")
+    parser.add_argument("--node-id", default=sharding.default_node_id(), help="ID único da instância (padrão: host-pid)")
+    parser.add_argument("--timeframes", default=settings.GENERATOR_TIMEFRAMES, help="Ex: 1h,4h")
+    parser.add_argument("--interval", type=float, default=settings.GENERATOR_INTERVAL_SECONDS, help="Segundos entre ciclos")
+    parser.add_argument("--min-quote-volume", type=float, default=settings.GENERATOR_MIN_QUOTE_VOLUME)
+    parser.add_argument("--max-symbols", type=int, default=0, help="Limite de pares do universo (0 = todos)")
+    parser.add_argument("--once", action="store_true", help="Rodar um ciclo e sair")
+    args = parser.parse_args(argv)
+    
+    try:
+        Base.metadata.create_all(bind=engine)
+    except SQLAlchemyError:
+        # Outra instância criando as mesmas tabelas ao mesmo tempo
+        time.sleep(1)
+        Base.metadata.create_all(bind=engine)
+    
+    node = GeneratorWorker(
+        node_id=args.node_id,
+        timeframes=[tf.strip() for tf in args.timeframes.split(",") if tf.strip()],
+        interval=args.interval,
+        min_quote_volume=args.min_quote_volume,
+        max_symbols=args.max_symbols
+    )
+    signal.signal(signal.SIGTERM, node.stop)
+    signal.signal(signal.SIGINT, node.stop)
+    
+    logger.info("Instância %s iniciada (timeframes: %s)", node.node_id, ", ".join(node.timeframes))
+    node.run(once=args.once)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
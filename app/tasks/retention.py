@@ -0,0 +1,48 @@
+"""
+Retenção da tabela signals
+
+Uso (ex: diariamente via cron):
+    python -m app.tasks.retention
+    python -m app.tasks.retention --retention-months 12 --archive-dir /backups/signals
+    python -m app.tasks.retention --dry-run
+
+Cria as partições dos próximos meses e arquiva em .jsonl.gz os meses
+anteriores à janela de retenção, removendo-os do banco (no Postgres,
+DETACH + DROP da partição inteira).
+"""
+import argparse
+from typing import List, Optional
+from app.config import settings
+from app.database import engine, Base
+from app.models.signal import Signal  # noqa: F401 (registra a tabela)
+from app.services.partitions import ensure_partitions, expired_months, archive_month, partition_name
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Retenção e arquivamento de sinais")
+    parser.add_argument("--retention-months", type=int, default=settings.SIGNAL_RETENTION_MONTHS,
+                        help="Meses mantidos no banco (0 = não arquivar)")
+    parser.add_argument("--archive-dir", default=settings.SIGNAL_ARCHIVE_DIR, help="Destino dos arquivos .jsonl.gz")
+    parser.add_argument("--dry-run", action="store_true", help="Só listar o que seria arquivado")
+    args = parser.parse_args(argv)
+    
+    Base.metadata.create_all(bind=engine)
+    
+    created = ensure_partitions(engine)
+    for name in created:
+        print(f"Partição criada: {name}")
+    
+    if args.retention_months <= 0:
+        return
+    
+    for month in expired_months(engine, args.retention_months):
+        name = partition_name(month)
+        if args.dry_run:
+            print(f"Arquivaria {name}")
+            continue
+        count = archive_month(engine, month, args.archive_dir)
+        print(f"Arquivado {name}: {count} sinais")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Benchmark da análise técnica de um scan grande: thread x pool de processos
+
+Busca os candles de N símbolos na FakeExchange (I/O, fora da medição),
+roda análise + pontuação na thread atual e no AnalysisPool com cada
+número de processos pedido, confere que os resultados batem e mostra
+símbolos por segundo.
+
+Uso:
+    python -m benchmarks.analysis_scan --symbols 300
+    python -m benchmarks.analysis_scan --symbols 600 --workers 1,2,4,8
+"""
+import argparse
+import os
+import time
+from benchmarks.server import configure_env
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da análise em pool de processos")
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--workers", default=str(os.cpu_count() or 1), help="Lista de processos (ex: 1,2,4)")
+    parser.add_argument("--rounds", type=int, default=3, help="Repetições por modo (vale a melhor)")
+    args = parser.parse_args()
+    
+    configure_env()
+    
+    from benchmarks.fake_exchange import FakeExchange
+    from app.config import settings
+    from app.services.binance_service import binance_service
+    
+    binance_service.exchange = FakeExchange(symbols=args.symbols)
+    
+    from app.services.signal_generator import signal_generator
+    from app.services.analysis_pool import AnalysisPool, EXECUTION_PROCESS, EXECUTION_THREAD
+    import app.services.signal_generator as generator_module
+    
+    frames = {}
+    for symbol in binance_service.exchange.symbols:
+        df = signal_generator.fetch_candles(symbol, args.timeframe)
+        if df is not None:
+            frames[symbol] = df
+    print(f"{len(frames)} símbolos x {signal_generator.candles_limit} candles")
+    
+    def run() -> float:
+        best = float("inf")
+        for _ in range(args.rounds):
+            # DataFrames novos a cada rodada (a análise na thread adiciona colunas)
+            batch = {symbol: df.copy() for symbol, df in frames.items()}
+            started = time.perf_counter()
+            scored = signal_generator.analyze_scored(batch, args.timeframe)
+            best = min(best, time.perf_counter() - started)
+        return best, scored
+    
+    settings.ANALYSIS_EXECUTION = EXECUTION_THREAD
+    baseline, expected = run()
+    print(f"thread:      {baseline:.2f}s ({len(frames) / baseline:.0f} símbolos/s)")
+    
+    settings.ANALYSIS_EXECUTION = EXECUTION_PROCESS
+    for workers in [int(w) for w in args.workers.split(",")]:
+        pool = AnalysisPool(workers=workers, min_symbols=1)
+        generator_module.analysis_pool = pool
+        
+        # Primeira chamada sobe os processos (spawn); fora da medição
+        pool.analyze({s: frames[s] for s in list(frames)[:workers]}, signal_generator.rule_variants, signal_generator.indicators)
+        
+        elapsed, scored = run()
+        pool.shutdown()
+        
+        same = [(s, d, round(p, 6)) for s, _, d, p in scored] == [(s, d, round(p, 6)) for s, _, d, p in expected]
+        print(
+            f"process x{workers}: {elapsed:.2f}s ({len(frames) / elapsed:.0f} símbolos/s, "
+            f"{baseline / elapsed:.2f}x) | mesmo resultado: {'sim' if same else 'NÃO'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""
+Benchmark de carga da autenticação: logins por segundo e latência de /me
+
+Uso:
+    python -m benchmarks.auth_load --users 20 --logins 400 --me 4000 --concurrency 16
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.server import configure_env, AppServer, Client, percentiles
+
+
+def _run(concurrency: int, total: int, make_call):
+    """
+    Executar `total` chamadas com `concurrency` threads
+    
+    Returns:
+        (latências em segundos, duração total, erros)
+    """
+    latencies = []
+    failures = []
+    per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    
+    def worker(index: int, count: int):
+        call = make_call()
+        for i in range(count):
+            started = time.perf_counter()
+            ok = call(index, i)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                failures.append(i)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(worker, index, count) for index, count in enumerate(per_worker)]
+    # Exceção numa thread (ex: conexão recusada) não pode sumir em silêncio
+    for future in futures:
+        future.result()
+    return latencies, time.perf_counter() - started, len(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de login e /me")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--me", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    
+    configure_env()
+    from app.main import app
+    
+    password = "benchmark-password"
+    
+    with AppServer(app, port=args.port) as server:
+        client = Client(server.host, server.port)
+        tokens = []
+        for i in range(args.users):
+            status, body = client.request(
+                "POST", "/api/auth/register",
+                {"email": f"bench{i}@example.com", "password": password}
+            )
+            if status != 200:
+                status, body = client.request(
+                    "POST", "/api/auth/login",
+                    {"email": f"bench{i}@example.com", "password": password}
+                )
+            tokens.append(body["access_token"])
+        
+        def login_call():
+            c = Client(server.host, server.port)
+            
+            def call(worker: int, i: int) -> bool:
+                email = f"bench{(worker + i) % args.users}@example.com"
+                status, _ = c.request("POST", "/api/auth/login", {"email": email, "password": password})
+                return status == 200
+            return call
+        
+        def me_call():
+            c = Client(server.host, server.port)
+            
+            def call(worker: int, i: int) -> bool:
+                status, _ = c.request("GET", f"/api/auth/me?token={tokens[(worker + i) % len(tokens)]}")
+                return status == 200
+            return call
+        
+        latencies, elapsed, errors = _run(args.concurrency, args.logins, login_call)
+        print(f"Login: {args.logins / elapsed:.1f} logins/s, latência {percentiles(latencies)}, erros {errors}")
+        
+        latencies, elapsed, errors = _run(args.concurrency, args.me, me_call)
+        print(f"/me:   {args.me / elapsed:.1f} req/s, latência {percentiles(latencies)}, erros {errors}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""
+Exchange falsa e local com a mesma interface usada do ccxt
+
+Gera tickers e candles determinísticos (random walk por símbolo) e pode
+simular latência de rede, para testes de carga sem tocar na Binance.
+"""
+import random
+import time
+import zlib
+import ccxt
+import numpy as np
+from typing import Dict, List, Optional
+
+
+class FakeExchange:
+    """
+    Args:
+        symbols: Número de pares USDT no universo
+        latency_ms: Latência simulada por chamada
+        id: Nome da exchange
+        error_rate: Fração das chamadas que falham com NetworkError
+    """
+    
+    def __init__(self, symbols: int = 300, latency_ms: float = 0, id: str = "fake", error_rate: float = 0):
+        self.id = id
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.symbols = [f"C{i:03d}/USDT:USDT" for i in range(symbols)]
+        self.calls = {"fetch_ticker": 0, "fetch_tickers": 0, "fetch_ohlcv": 0}
+    
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            raise ccxt.NetworkError(f"{self.id}: falha simulada")
+    
+    def _rng(self, symbol: str, salt: int = 0) -> np.random.Generator:
+        return np.random.default_rng(zlib.crc32(symbol.encode()) + salt)
+    
+    def milliseconds(self) -> int:
+        return int(time.time() * 1000)
+    
+    def parse_timeframe(self, timeframe: str) -> int:
+        units = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+        return int(timeframe[:-1]) * units[timeframe[-1]]
+    
+    def _ticker(self, symbol: str) -> Dict:
+        rng = self._rng(symbol)
+        last = float(rng.lognormal(3, 2))
+        change = float(rng.normal(0, 4))
+        return {
+            "symbol": symbol,
+            "last": last,
+            "close": last,
+            "high": last * (1 + abs(float(rng.normal(0.03, 0.02)))),
+            "low": last * (1 - abs(float(rng.normal(0.03, 0.02)))),
+            "percentage": change,
+            "quoteVolume": float(rng.lognormal(16, 2)),
+            "timestamp": self.milliseconds(),
+        }
+    
+    def fetch_ticker(self, symbol: str) -> Dict:
+        self.calls["fetch_ticker"] += 1
+        self._sleep()
+        return self._ticker(symbol)
+    
+    def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict]:
+        self.calls["fetch_tickers"] += 1
+        self._sleep()
+        return {s: self._ticker(s) for s in (symbols or self.symbols)}
+    
+    def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "1h",
+        since: Optional[int] = None,
+        limit: int = 100
+    ) -> List[List[float]]:
+        self.calls["fetch_ohlcv"] += 1
+        self._sleep()
+        
+        tf_ms = self.parse_timeframe(timeframe) * 1000
+        now = self.milliseconds()
+        end = now - now % tf_ms
+        start = since if since is not None else end - (limit - 1) * tf_ms
+        start -= start % tf_ms
+        count = max(0, min(limit, (end - start) // tf_ms + 1))
+        if count == 0:
+            return []
+        
+        # Random walk determinístico pelo índice do candle
+        first_index = start // tf_ms
+        rng = self._rng(symbol, salt=int(first_index % 100000))
+        drift = float(self._rng(symbol).normal(0, 0.002))
+        close = float(self._rng(symbol).lognormal(3, 2)) * np.exp(
+            np.cumsum(rng.normal(drift, 0.01, count))
+        )
+        high = close * (1 + np.abs(rng.normal(0, 0.005, count)))
+        low = close * (1 - np.abs(rng.normal(0, 0.005, count)))
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        volume = rng.lognormal(10, 1, count)
+        
+        timestamps = start + np.arange(count) * tf_ms
+        return [
+            [int(t), float(o), float(h), float(lo), float(c), float(v)]
+            for t, o, h, lo, c, v in zip(timestamps, open_, high, low, close, volume)
+        ]
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Teste de carga da API contra exchange falsa e banco local
+
+Sobe o app em um processo separado (CLI do uvicorn sobre
+benchmarks.server:create_app) com SQLite temporário e FakeExchange,
+dispara usuários virtuais com rampa e mix de rotas a partir deste
+processo, e reporta vazão e latência p50/p95/p99 por rota.
+
+Uso:
+    python -m benchmarks.loadtest --users 50 --ramp 10 --duration 60
+    python -m benchmarks.loadtest --mix signals=5,history=3,login=1,top10=1
+    python -m benchmarks.loadtest --scenario cenario.json --output relatorio.json
+
+Formato do cenário (JSON, todos os campos opcionais):
+    {"users": 50, "ramp_seconds": 10, "duration_seconds": 60,
+     "think_time_ms": 100, "mix": {"signals": 5, "history": 3}}
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from benchmarks.server import configure_env, AppProcess, Client, percentiles
+
+DEFAULT_SCENARIO = {
+    "users": 20,
+    "ramp_seconds": 5,
+    "duration_seconds": 30,
+    "think_time_ms": 100,
+    "mix": {"signals": 4, "signal_detail": 4, "history": 3, "login": 1, "me": 2, "top10": 1},
+}
+
+LOGIN_USERS = 5
+LOGIN_PASSWORD = "loadtest-password"
+
+
+class Scenario:
+    
+    def __init__(self, config: Dict):
+        self.users = config["users"]
+        self.ramp = config["ramp_seconds"]
+        self.duration = config["duration_seconds"]
+        self.think_time = config["think_time_ms"] / 1000
+        self.mix = config["mix"]
+        self.routes = list(self.mix)
+        self.weights = [self.mix[r] for r in self.routes]
+
+
+class VirtualUser:
+    """
+    Usuário virtual: escolhe rotas pelo mix até o fim do teste
+    """
+    
+    def __init__(self, host: str, port: int, state: Dict):
+        self.client = Client(host, port)
+        self.state = state
+    
+    def call(self, route: str) -> Tuple[str, int]:
+        state = self.state
+        if route == "signals":
+            status, body = self.client.request("GET", "/api/signals/")
+            ids = [s["id"] for s in body.get("signals", []) if "id" in s]
+            if ids:
+                state["signal_ids"] = ids
+            return "GET /api/signals", status
+        if route == "signal_detail":
+            signal_id = random.choice(state["signal_ids"]) if state["signal_ids"] else 1
+            status, _ = self.client.request("GET", f"/api/signals/{signal_id}")
+            return "GET /api/signals/{id}", status
+        if route == "history":
+            status, _ = self.client.request("GET", "/api/history/")
+            return "GET /api/history", status
+        if route == "login":
+            email = f"loadtest{random.randrange(LOGIN_USERS)}@example.com"
+            status, _ = self.client.request(
+                "POST", "/api/auth/login", {"email": email, "password": LOGIN_PASSWORD}
+            )
+            return "POST /api/auth/login", status
+        if route == "me":
+            status, _ = self.client.request("GET", f"/api/auth/me?token={random.choice(state['tokens'])}")
+            return "GET /api/auth/me", status
+        if route == "top10":
+            status, _ = self.client.request("GET", "/test/generate-signals-top10")
+            return "GET /test/generate-signals-top10", status
+        raise ValueError(f"Rota desconhecida no mix: {route}")
+
+
+def run(scenario: Scenario, host: str, port: int, state: Dict) -> Dict:
+    """
+    Executar o cenário e agregar resultados por rota
+    """
+    results: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + scenario.duration
+    
+    def user_loop(index: int):
+        # Rampa: usuário i entra em i * ramp / users segundos
+        time.sleep(index * scenario.ramp / max(scenario.users, 1))
+        user = VirtualUser(host, port, state)
+        while time.perf_counter() < deadline:
+            route = random.choices(scenario.routes, scenario.weights)[0]
+            call_started = time.perf_counter()
+            try:
+                name, status = user.call(route)
+            except Exception:
+                name, status = route, 0
+            latency = time.perf_counter() - call_started
+            with lock:
+                results[name].append((latency, status))
+            if scenario.think_time:
+                time.sleep(random.expovariate(1 / scenario.think_time))
+    
+    threads = [threading.Thread(target=user_loop, args=(i,), daemon=True) for i in range(scenario.users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    
+    report = {"elapsed_seconds": round(elapsed, 2), "routes": {}}
+    total = 0
+    for name, samples in sorted(results.items()):
+        latencies = [lat for lat, _ in samples]
+        errors = sum(1 for _, status in samples if status >= 400 or status == 0)
+        total += len(samples)
+        report["routes"][name] = {
+            "requests": len(samples),
+            "errors": errors,
+            "rps": round(len(samples) / elapsed, 2),
+            **percentiles(latencies),
+        }
+    report["total_requests"] = total
+    report["total_rps"] = round(total / elapsed, 2)
+    return report
+
+
+def print_report(report: Dict):
+    print(f"{'rota':<36}{'req':>7}{'erros':>7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in report["routes"].items():
+        print(f"{name:<36}{r['requests']:>7}{r['errors']:>7}{r['rps']:>9}{r['p50']:>10}{r['p95']:>10}{r['p99']:>10}")
+    print(f"Total: {report['total_requests']} requisições em {report['elapsed_seconds']}s ({report['total_rps']} req/s)")
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for item in value.split(","):
+        route, _, weight = item.partition("=")
+        mix[route.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--scenario", help="Arquivo JSON com o cenário")
+    parser.add_argument("--users", type=int, help="Usuários virtuais simultâneos")
+    parser.add_argument("--ramp", type=float, help="Segundos até todos os usuários entrarem")
+    parser.add_argument("--duration", type=float, help="Duração total em segundos")
+    parser.add_argument("--think-time", type=float, help="Pausa média entre requisições (ms)")
+    parser.add_argument("--mix", help="Pesos por rota (ex: signals=5,history=3,login=1)")
+    parser.add_argument("--symbols", type=int, default=300, help="Pares na exchange falsa")
+    parser.add_argument("--exchange-latency-ms", type=float, default=30, help="Latência simulada da exchange")
+    parser.add_argument("--exchanges", type=int, default=1, help="Exchanges falsas em fan-out (MultiExchange)")
+    parser.add_argument("--fanout-mode", default="first", help="Modo do fan-out: first ou merge")
+    parser.add_argument("--exchange-error-rate", type=float, default=0, help="Fração de falhas por exchange falsa")
+    parser.add_argument("--exchange-weight-per-minute", type=int, help="Sobrescrever o limite de peso do scheduler")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", help="Salvar relatório em JSON")
+    args = parser.parse_args()
+    
+    config = dict(DEFAULT_SCENARIO)
+    if args.scenario:
+        with open(args.scenario) as f:
+            config.update(json.load(f))
+    overrides = {
+        "users": args.users,
+        "ramp_seconds": args.ramp,
+        "duration_seconds": args.duration,
+        "think_time_ms": args.think_time,
+        "mix": _parse_mix(args.mix) if args.mix else None,
+    }
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    scenario = Scenario(config)
+    
+    # Banco e variáveis do servidor (o processo filho herda o ambiente)
+    configure_env()
+    if args.exchange_weight_per_minute:
+        os.environ["EXCHANGE_WEIGHT_PER_MINUTE"] = str(args.exchange_weight_per_minute)
+    server_env = {
+        "BENCH_SYMBOLS": str(args.symbols),
+        "BENCH_EXCHANGE_LATENCY_MS": str(args.exchange_latency_ms),
+        "BENCH_EXCHANGES": str(args.exchanges),
+        "BENCH_FANOUT_MODE": args.fanout_mode,
+        "BENCH_EXCHANGE_ERROR_RATE": str(args.exchange_error_rate),
+    }
+    
+    with AppProcess(port=args.port, env=server_env) as server:
+        # Usuários para as rotas de login e /me
+        setup = Client(server.host, server.port)
+        tokens = []
+        for i in range(LOGIN_USERS):
+            credentials = {"email": f"loadtest{i}@example.com", "password": LOGIN_PASSWORD}
+            status, body = setup.request("POST", "/api/auth/register", credentials)
+            if status != 200:
+                status, body = setup.request("POST", "/api/auth/login", credentials)
+            tokens.append(body["access_token"])
+        
+        state = {"tokens": tokens, "signal_ids": []}
+        print(f"Cenário: {config}")
+        report = run(scenario, server.host, server.port, state)
+    
+    report["scenario"] = config
+    print_report(report)
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+Utilitários compartilhados pelos benchmarks: sobe a API (em uma thread
+ou em um processo separado) com banco SQLite local e mede latência via
+HTTP de verdade.
+
+Processo separado: create_app é a fábrica para o CLI do uvicorn
+(uvicorn benchmarks.server:create_app --factory), configurada pelas
+variáveis BENCH_* (ver AppProcess).
+"""
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def configure_env(db_path: Optional[str] = None) -> str:
+    """
+    Configurar variáveis de ambiente antes de importar o app
+    
+    Returns:
+        Caminho do banco SQLite usado
+    """
+    db_path = db_path or os.path.join(tempfile.mkdtemp(prefix="cryptosignals-bench-"), "bench.db")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{db_path}")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    os.environ.setdefault("FRONTEND_URL", "http://localhost:5173")
+    # Um cliente só gerando carga: o limite por cliente recusaria quase tudo
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    return db_path
+
+
+class AppServer:
+    """
+    Servidor uvicorn rodando em uma thread de fundo
+    """
+    
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 8765):
+        import uvicorn
+        
+        self.host = host
+        self.port = port
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+    
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+    
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def create_app():
+    """
+    Fábrica do app para o CLI do uvicorn, com a exchange falsa
+    
+    Lê BENCH_SYMBOLS, BENCH_EXCHANGE_LATENCY_MS, BENCH_EXCHANGES,
+    BENCH_FANOUT_MODE e BENCH_EXCHANGE_ERROR_RATE do ambiente.
+    """
+    configure_env()
+    
+    from benchmarks.fake_exchange import FakeExchange
+    from app.services.binance_service import binance_service
+    from app.services.exchanges import ExchangeAdapter, MultiExchange
+    
+    fakes = [
+        FakeExchange(
+            symbols=int(os.environ.get("BENCH_SYMBOLS", 300)),
+            latency_ms=float(os.environ.get("BENCH_EXCHANGE_LATENCY_MS", 0)),
+            id=f"fake{i}",
+            error_rate=float(os.environ.get("BENCH_EXCHANGE_ERROR_RATE", 0))
+        )
+        for i in range(int(os.environ.get("BENCH_EXCHANGES", 1)))
+    ]
+    if len(fakes) == 1:
+        binance_service.exchange = fakes[0]
+    else:
+        mode = os.environ.get("BENCH_FANOUT_MODE", "first")
+        binance_service.exchange = MultiExchange([ExchangeAdapter(f) for f in fakes], mode=mode)
+    
+    from app.main import app
+    return app
+
+
+class AppProcess:
+    """
+    Servidor uvicorn em um processo separado (CLI sobre create_app)
+    
+    O gerador de carga fica no processo pai, então os dois não disputam
+    o mesmo GIL e a medida reflete só o servidor.
+    
+    Args:
+        env: Variáveis extras para o servidor (ex: BENCH_SYMBOLS)
+    """
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, env: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.port = port
+        self.env = {**os.environ, **(env or {})}
+        self.process: Optional[subprocess.Popen] = None
+    
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "benchmarks.server:create_app", "--factory",
+             "--host", self.host, "--port", str(self.port),
+             "--log-level", "warning", "--no-access-log"],
+            env=self.env
+        )
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Servidor saiu com código {self.process.returncode}")
+            try:
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=1)
+                conn.request("GET", "/health")
+                if conn.getresponse().status == 200:
+                    return self
+            except (http.client.HTTPException, OSError):
+                pass
+            time.sleep(0.1)
+        self.__exit__()
+        raise RuntimeError("Servidor não respondeu em 60s")
+    
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class Client:
+    """
+    Cliente HTTP com conexão keep-alive (um por thread)
+    """
+    
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.conn = http.client.HTTPConnection(host, port, timeout=120)
+    
+    def request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+        except (http.client.HTTPException, ConnectionError):
+            # Reabrir conexão derrubada pelo servidor
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+        data = response.read()
+        try:
+            return response.status, json.loads(data)
+        except ValueError:
+            return response.status, {}
+
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    """
+    p50/p95/p99 em milissegundos
+    """
+    if not latencies:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(latencies)
+    
+    def pick(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 2)
+    
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99)}
\ No newline at end of file
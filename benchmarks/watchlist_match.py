@@ -0,0 +1,101 @@
+"""
+Benchmark do casamento de sinais com watchlists
+
+Gera usuários sintéticos (1 a 5 itens cada, com moeda/timeframe/tipo
+opcionais), monta o WatchlistIndex e compara o tempo por sinal contra
+a varredura linear de todos os itens, conferindo que os dois devolvem
+os mesmos usuários.
+
+Uso:
+    python -m benchmarks.watchlist_match --users 100000 --signals 200
+"""
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Set
+
+TIMEFRAMES = ["1h", "4h", "1d"]
+TIPOS = ["LONG", "SHORT"]
+
+
+def _entries(users: int, symbols: List[str]) -> List[Dict]:
+    entries = []
+    for user_id in range(1, users + 1):
+        for _ in range(random.randint(1, 5)):
+            entries.append({
+                "id": len(entries) + 1,
+                "user_id": user_id,
+                "moeda": random.choice(symbols) if random.random() < 0.9 else None,
+                "timeframe": random.choice(TIMEFRAMES) if random.random() < 0.5 else None,
+                "tipo": random.choice(TIPOS) if random.random() < 0.3 else None,
+                "probabilidade_min": random.choice([0, 60, 65, 70, 75, 80]),
+            })
+    return entries
+
+
+def _signal(symbols: List[str]) -> Dict:
+    return {
+        "moeda": random.choice(symbols),
+        "timeframe": random.choice(TIMEFRAMES),
+        "tipo": random.choice(TIPOS),
+        "probabilidade": round(random.uniform(55, 95), 1),
+    }
+
+
+def _linear(entries: List[Dict], signal: Dict) -> Set[int]:
+    from app.services.watchlists import entry_matches
+    
+    return {e["user_id"] for e in entries if entry_matches(e, signal)}
+
+
+def _ms(samples: List[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"média {statistics.mean(samples) * 1000:.3f}ms | p99 {p99 * 1000:.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do índice de watchlists")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=300, help="Moedas distintas")
+    parser.add_argument("--signals", type=int, default=200, help="Sinais casados")
+    parser.add_argument("--linear-signals", type=int, default=20, help="Sinais na varredura linear (lenta)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    
+    random.seed(args.seed)
+    
+    from app.services.watchlists import WatchlistIndex
+    
+    symbols = [f"C{i:03d}/USDT" for i in range(args.symbols)]
+    entries = _entries(args.users, symbols)
+    signals = [_signal(symbols) for _ in range(args.signals)]
+    print(f"{args.users} usuários, {len(entries)} itens de watchlist, {len(symbols)} moedas")
+    
+    index = WatchlistIndex()
+    started = time.perf_counter()
+    index.rebuild(entries)
+    print(f"Montagem do índice: {(time.perf_counter() - started) * 1000:.0f}ms")
+    
+    indexed, matched = [], 0
+    for signal in signals:
+        started = time.perf_counter()
+        users = index.match(signal)
+        indexed.append(time.perf_counter() - started)
+        matched += len(users)
+    print(f"Índice:    {_ms(indexed)} | {matched / len(signals):.0f} usuários por sinal")
+    
+    linear = []
+    for signal in signals[:args.linear_signals]:
+        started = time.perf_counter()
+        expected = _linear(entries, signal)
+        linear.append(time.perf_counter() - started)
+        if expected != index.match(signal):
+            raise SystemExit(f"Divergência entre índice e varredura linear: {signal}")
+    print(f"Linear:    {_ms(linear)}")
+    print(f"Mesmo resultado em {len(linear)} sinais | {statistics.mean(linear) / statistics.mean(indexed):.0f}x mais rápido")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,146 @@
+"""
+Benchmark da entrega de webhooks contra um receptor HTTP local
+
+Sobe um receptor aiohttp em uma thread (com latência e taxa de erro
+configuráveis), cadastra endpoints apontando para ele (e, opcionalmente,
+alguns endpoints "mortos" numa porta fechada), enfileira sinais e mede
+quanto tempo o WebhookDispatcher leva para entregar tudo.
+
+Uso:
+    python -m benchmarks.webhook_load --endpoints 50 --signals 200
+    python -m benchmarks.webhook_load --sink-latency-ms 50 --sink-error-rate 0.1 --dead-endpoints 5
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import Counter
+from benchmarks.server import configure_env
+
+DEAD_URL = "http://127.0.0.1:9/hook"  # Porta fechada: conexão recusada
+
+
+class Sink:
+    """
+    Receptor HTTP local que conta os sinais recebidos por endpoint
+    """
+    
+    def __init__(self, port: int, latency_ms: float = 0, error_rate: float = 0):
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.received = Counter()
+        self.requests = 0
+        self._ready = threading.Event()
+    
+    async def _handle(self, request):
+        from aiohttp import web
+        
+        body = await request.read()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.requests += 1
+        if self.error_rate and random.random() < self.error_rate:
+            return web.Response(status=503)
+        self.received[request.match_info["endpoint"]] += len(json.loads(body)["signals"])
+        return web.Response(text="ok")
+    
+    def _serve(self):
+        from aiohttp import web
+        
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_post("/hook/{endpoint}", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", self.port).start())
+        self._ready.set()
+        loop.run_forever()
+    
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+
+def _signal(i: int) -> dict:
+    return {
+        "id": i,
+        "moeda": f"C{i % 300:03d}/USDT",
+        "tipo": random.choice(["LONG", "SHORT"]),
+        "timeframe": "1h",
+        "preco_entrada": 100.0,
+        "stop_loss": 97.0,
+        "take_profit_1": 103.0,
+        "take_profit_2": 106.0,
+        "take_profit_3": 110.0,
+        "probabilidade": 75.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de entrega de webhooks")
+    parser.add_argument("--endpoints", type=int, default=50, help="Endpoints saudáveis")
+    parser.add_argument("--dead-endpoints", type=int, default=0, help="Endpoints com conexão recusada")
+    parser.add_argument("--signals", type=int, default=200, help="Sinais enfileirados")
+    parser.add_argument("--sink-latency-ms", type=float, default=0)
+    parser.add_argument("--sink-error-rate", type=float, default=0, help="Fração de respostas 503")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--timeout", type=float, default=120, help="Tempo máximo de espera (s)")
+    args = parser.parse_args()
+    
+    configure_env()
+    
+    from app.database import engine, Base, SessionLocal
+    from app.models.user import User
+    from app.models.webhook import WebhookEndpoint
+    from app.services import webhooks
+    from app.config import settings
+    
+    # Reenvio rápido para o benchmark terminar
+    settings.WEBHOOK_RETRY_BASE_SECONDS = 0.05
+    settings.WEBHOOK_RETRY_MAX_SECONDS = 0.5
+    # Receptor em 127.0.0.1
+    settings.WEBHOOK_ALLOW_PRIVATE_URLS = True
+    
+    Base.metadata.create_all(bind=engine)
+    
+    sink = Sink(args.port, args.sink_latency_ms, args.sink_error_rate)
+    sink.start()
+    
+    db = SessionLocal()
+    user = User(email=f"webhook-bench-{time.time()}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for i in range(args.endpoints):
+        db.add(WebhookEndpoint(user_id=user.id, url=f"http://127.0.0.1:{args.port}/hook/{i}", max_concorrencia=4))
+    for _ in range(args.dead_endpoints):
+        db.add(WebhookEndpoint(user_id=user.id, url=DEAD_URL, max_concorrencia=1))
+    db.commit()
+    webhooks.invalidate_endpoints()
+    
+    started = time.perf_counter()
+    queued = webhooks.enqueue_signals(db, [_signal(i) for i in range(args.signals)])
+    db.commit()
+    db.close()
+    enqueue_time = time.perf_counter() - started
+    expected = args.signals * args.endpoints
+    print(f"Enfileiradas {queued} entregas em {enqueue_time:.2f}s")
+    
+    dispatcher = webhooks.webhook_dispatcher
+    started = time.perf_counter()
+    dispatcher.start()
+    while sum(sink.received.values()) < expected and time.perf_counter() - started < args.timeout:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    dispatcher.stop()
+    
+    delivered = sum(sink.received.values())
+    print(f"Entregues {delivered}/{expected} em {elapsed:.2f}s ({delivered / elapsed:.0f} entregas/s)")
+    print(f"Requisições recebidas: {sink.requests} | stats do worker: {dispatcher.stats}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
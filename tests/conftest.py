@@ -0,0 +1,32 @@
+"""
+Ambiente dos testes: banco SQLite temporário e serviços de fundo desligados
+
+As variáveis precisam existir antes do primeiro import de app.* (settings
+e engine são criados no import).
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="cryptosignals-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:5173")
+os.environ.setdefault("WEBHOOKS_ENABLED", "0")
+os.environ.setdefault("AUTH_HASH_WORKERS", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("TRACING_ENABLED", "0")
+os.environ.setdefault("CANDLE_STORE_DIR", os.path.join(_db_dir, "candles"))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app.database import Base, engine
+    import app.models.signal  # noqa: F401 (registra as tabelas)
+    import app.models.user  # noqa: F401
+    import app.models.watchlist  # noqa: F401
+    import app.models.webhook  # noqa: F401
+    
+    Base.metadata.create_all(bind=engine)
+    yield engine
\ No newline at end of file
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from app.services.analysis_pool import AnalysisPool
+from app.services.signal_generator import signal_generator
+
+
+def _frames(count: int, rows: int = 400) -> dict:
+    rng = np.random.default_rng(3)
+    frames = {}
+    for i in range(count):
+        close = 100 + np.cumsum(rng.normal(0, 1, rows))
+        frames[f"C{i:02d}/USDT:USDT"] = pd.DataFrame({
+            "timestamp": pd.date_range("2024-01-01", periods=rows, freq="h"),
+            "open": close,
+            "high": close + rng.uniform(0, 2, rows),
+            "low": close - rng.uniform(0, 2, rows),
+            "close": close,
+            "volume": rng.uniform(100, 300, rows),
+        })
+    return frames
+
+
+def test_process_pool_matches_thread_path(monkeypatch):
+    monkeypatch.setattr("app.services.signal_generator.settings.ANALYSIS_EXECUTION", "thread")
+    frames = _frames(8)
+    expected = signal_generator.analyze_scored(frames, "1h")
+    
+    pool = AnalysisPool(workers=2)
+    try:
+        results = pool.analyze(frames, signal_generator.rule_variants, signal_generator.indicators)
+    finally:
+        pool.shutdown()
+    
+    assert [r[0] for r in results] == [e[0] for e in expected]
+    for (symbol, analysis, direction, probability, error), thread in zip(results, expected):
+        assert error is None
+        assert direction == thread[2]
+        assert probability == thread[3]
+        assert type(probability) is type(thread[3])
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import threading
+from app.services.candle_store import CandleStore
+
+HOUR = 3600 * 1000
+
+
+def _rows(start: int, end: int) -> list:
+    return [[t * HOUR, 1.0, 2.0, 0.5, 1.5, 10.0] for t in range(start, end)]
+
+
+def test_prepend_after_interrupted_swap(tmp_path):
+    # Troca anterior interrompida deixou o diretório .old para trás
+    store = CandleStore(str(tmp_path))
+    store.append("BTC/USDT:USDT", "1h", _rows(100, 200))
+    path = store._dir("BTC/USDT:USDT", "1h")
+    os.makedirs(path + ".old")
+    with open(os.path.join(path + ".old", "close.bin"), "wb") as f:
+        f.write(b"stale")
+    
+    assert store.prepend("BTC/USDT:USDT", "1h", _rows(50, 100)) == 50
+    
+    series = store.open("BTC/USDT:USDT", "1h")
+    assert list(series["timestamp"]) == [t * HOUR for t in range(50, 200)]
+    assert not os.path.exists(path + ".old")
+
+def test_readers_never_see_missing_or_misaligned_series(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append("BTC/USDT:USDT", "1h", _rows(1000, 1100))
+    errors = []
+    done = threading.Event()
+    
+    def reader():
+        while not done.is_set():
+            series = store.open("BTC/USDT:USDT", "1h")
+            timestamps = series["timestamp"]
+            if len(series) < 100 or int(timestamps[-1]) != 1099 * HOUR:
+                errors.append(len(series))
+            if not all(len(series[c]) == len(series) for c in series.columns):
+                errors.append("desalinhado")
+    
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for start in range(990, 0, -10):
+        store.prepend("BTC/USDT:USDT", "1h", _rows(start, start + 10))
+    done.set()
+    for t in threads:
+        t.join()
+    
+    assert errors == []
+    assert store.length("BTC/USDT:USDT", "1h") == 1090
+
+
+def test_interrupted_prepend_version_is_removed(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.append("BTC/USDT:USDT", "1h", _rows(100, 200))
+    path = store._dir("BTC/USDT:USDT", "1h")
+    os.makedirs(path + ".v1")
+    
+    assert store.append("BTC/USDT:USDT", "1h", _rows(200, 210)) == 10
+    
+    assert not os.path.exists(path + ".v1")
+    assert store.length("BTC/USDT:USDT", "1h") == 110
+
+
+def test_plain_directory_is_migrated_to_link(tmp_path):
+    # Série gravada antes do layout com link simbólico
+    store = CandleStore(str(tmp_path))
+    store.append("BTC/USDT:USDT", "1h", _rows(100, 200))
+    path = store._dir("BTC/USDT:USDT", "1h")
+    version = os.path.realpath(path)
+    os.remove(path)
+    os.replace(version, path)
+    
+    assert store.length("BTC/USDT:USDT", "1h") == 100
+    assert store.prepend("BTC/USDT:USDT", "1h", _rows(50, 100)) == 50
+    
+    assert os.path.islink(path)
+    series = store.open("BTC/USDT:USDT", "1h")
+    assert list(series["timestamp"]) == [t * HOUR for t in range(50, 200)]
\ No newline at end of file
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+from app.services.correlation import RollingCorrelation, closed_returns, suppress_correlated
+
+HOUR = 3600 * 1000
+SYMBOLS = ["A/USDT:USDT", "B/USDT:USDT", "C/USDT:USDT", "D/USDT:USDT"]
+
+
+def _signal(moeda: str, tipo: str, probabilidade: int) -> dict:
+    return {"moeda": moeda, "tipo": tipo, "probabilidade": probabilidade}
+
+
+def test_suppress_keeps_best_signal_per_correlated_group():
+    signals = [
+        _signal("A", "LONG", 70),
+        _signal("B", "LONG", 80),   # Mesmo trade que A (corr 0.9)
+        _signal("C", "SHORT", 60),  # Oposto de B com corr -0.85: mesmo trade
+        _signal("D", "LONG", 50),   # Sem correlação com ninguém
+    ]
+    corr = np.array([
+        [1.0, 0.9, -0.9, 0.1],
+        [0.9, 1.0, -0.85, 0.0],
+        [-0.9, -0.85, 1.0, 0.2],
+        [0.1, 0.0, 0.2, 1.0],
+    ])
+    kept = suppress_correlated(signals, corr, threshold=0.8)
+    assert [s["moeda"] for s in kept] == ["B", "D"]
+
+
+def test_suppress_keeps_opposite_direction_when_positively_correlated():
+    # Correlação alta com direções opostas não é o mesmo trade
+    signals = [_signal("A", "LONG", 70), _signal("B", "SHORT", 60)]
+    corr = np.array([[1.0, 0.95], [0.95, 1.0]])
+    assert len(suppress_correlated(signals, corr, threshold=0.8)) == 2
+
+
+def test_suppress_keeps_pairs_without_history():
+    signals = [_signal("A", "LONG", 70), _signal("B", "LONG", 60)]
+    corr = np.array([[1.0, np.nan], [np.nan, 1.0]])
+    assert len(suppress_correlated(signals, corr, threshold=0.8)) == 2
+
+
+def _returns(candles: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    base = rng.normal(0, 0.01, candles)
+    data = np.column_stack([
+        base + rng.normal(0, 0.002, candles),
+        base + rng.normal(0, 0.01, candles),
+        -base + rng.normal(0, 0.005, candles),
+        rng.normal(0, 0.01, candles),
+    ])
+    # Símbolo D listado depois e com buracos
+    data[:150, 3] = np.nan
+    data[200:210, 3] = np.nan
+    return data
+
+
+def test_incremental_matrix_matches_pandas_over_window():
+    window, min_periods, candles = 50, 10, 260
+    data = _returns(candles)
+    timestamps = np.arange(1, candles + 1, dtype=np.int64) * HOUR
+    rolling = RollingCorrelation(HOUR, window=window, min_periods=min_periods)
+    
+    # Primeiro ciclo com histórico, depois um candle por ciclo
+    def feed(lo: int, hi: int):
+        series = {}
+        for column, symbol in enumerate(SYMBOLS):
+            present = ~np.isnan(data[lo:hi, column])
+            series[symbol] = (timestamps[lo:hi][present], data[lo:hi, column][present])
+        rolling.update(series)
+    
+    feed(0, 100)
+    for t in range(100, candles):
+        feed(t, t + 1)
+    
+    expected = pd.DataFrame(data[-window:], columns=SYMBOLS).corr(min_periods=min_periods).to_numpy(copy=True)
+    np.fill_diagonal(expected, 1.0)
+    np.testing.assert_allclose(rolling.matrix(SYMBOLS), expected, atol=1e-9)
+
+
+def test_matrix_is_nan_for_unknown_or_short_history():
+    rolling = RollingCorrelation(HOUR, window=50, min_periods=30)
+    timestamps = np.arange(1, 11, dtype=np.int64) * HOUR
+    rolling.update({
+        "A/USDT:USDT": (timestamps, np.linspace(0.01, 0.02, 10)),
+        "B/USDT:USDT": (timestamps, np.linspace(0.02, 0.01, 10)),
+    })
+    matrix = rolling.matrix(["A/USDT:USDT", "B/USDT:USDT", "X/USDT:USDT"])
+    assert np.isnan(matrix[0, 1]) and np.isnan(matrix[0, 2])
+    assert list(np.diag(matrix)) == [1.0, 1.0, 1.0]
+
+
+def test_closed_returns_skips_open_candle_and_gaps():
+    df = pd.DataFrame({
+        "timestamp": pd.to_datetime([0, HOUR, 2 * HOUR, 4 * HOUR, 5 * HOUR], unit="ms"),
+        "close": [100.0, 110.0, 99.0, 100.0, 120.0],
+    })
+    # Candle das 5h ainda aberto; 2h -> 4h é um buraco
+    timestamps, returns = closed_returns(df, HOUR, now_ms=5 * HOUR + 1)
+    assert timestamps.tolist() == [HOUR, 2 * HOUR]
+    assert returns == pytest.approx([np.log(1.1), np.log(0.9)])
\ No newline at end of file
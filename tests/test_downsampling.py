@@ -0,0 +1,114 @@
+import numpy as np
+from app.services.downsampling import aggregate_ohlcv, downsample_line, lttb, minmax
+
+
+def _lttb_reference(x, y, points):
+    """LTTB ponto a ponto, como no artigo original (Steinarsson, 2013)"""
+    n = len(y)
+    every = (n - 2) / (points - 2)
+    selected = [0]
+    a = 0
+    for i in range(points - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        if next_start >= n - 1:
+            next_start, next_end = n - 1, n
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def _series(length: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    x = np.arange(length, dtype=np.float64) * 60_000
+    y = np.cumsum(rng.normal(0, 1, length))
+    return x, y
+
+
+def test_lttb_matches_reference():
+    for length, points in [(1000, 100), (1001, 37), (50, 3), (10, 9)]:
+        x, y = _series(length)
+        assert lttb(x, y, points).tolist() == _lttb_reference(x.tolist(), y.tolist(), points)
+
+
+def test_lttb_keeps_ends_and_spike():
+    x, y = _series(5000)
+    y[2345] = 1_000
+    index = lttb(x, y, 200)
+    assert len(index) == 200
+    assert index[0] == 0 and index[-1] == 4999
+    assert np.all(np.diff(index) > 0)
+    assert 2345 in index
+
+
+def test_lttb_small_inputs():
+    x, y = _series(10)
+    assert lttb(x, y, 20).tolist() == list(range(10))
+    assert lttb(x, y, 2).tolist() == [0, 9]
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = _series(1000)
+    points = 100
+    index = minmax(y, points)
+    
+    assert len(index) <= points
+    assert np.all(np.diff(index) > 0)
+    assert int(np.argmin(y)) in index and int(np.argmax(y)) in index
+    # 50 baldes de 20 pontos: mínimo e máximo de cada um
+    for start in range(0, 1000, 20):
+        bucket = y[start:start + 20]
+        assert start + int(np.argmin(bucket)) in index
+        assert start + int(np.argmax(bucket)) in index
+
+
+def test_minmax_flat_bucket_picks_one_point():
+    y = np.ones(100)
+    assert minmax(y, 10).tolist() == [0, 20, 40, 60, 80]
+
+
+def test_aggregate_ohlcv_buckets():
+    length = 10
+    columns = {
+        "timestamp": np.arange(length) * 1000,
+        "open": np.arange(length, dtype=float),
+        "high": np.arange(length, dtype=float) + 10,
+        "low": np.arange(length, dtype=float) - 10,
+        "close": np.arange(length, dtype=float) + 0.5,
+        "volume": np.ones(length),
+    }
+    result = aggregate_ohlcv(columns, 4)
+    
+    # Baldes [0, 2), [2, 5), [5, 7), [7, 10)
+    assert result["timestamp"].tolist() == [0, 2000, 5000, 7000]
+    assert result["open"].tolist() == [0, 2, 5, 7]
+    assert result["high"].tolist() == [11, 14, 16, 19]
+    assert result["low"].tolist() == [-10, -8, -5, -3]
+    assert result["close"].tolist() == [1.5, 4.5, 6.5, 9.5]
+    assert result["volume"].tolist() == [2, 3, 2, 3]
+
+
+def test_aggregate_ohlcv_short_series_unchanged():
+    columns = {name: np.arange(5, dtype=float) for name in ("timestamp", "open", "high", "low", "close", "volume")}
+    result = aggregate_ohlcv(columns, 10)
+    assert all(result[name].tolist() == list(range(5)) for name in columns)
+
+
+def test_downsample_line_drops_warmup_nan():
+    x, y = _series(500)
+    y[:20] = np.nan
+    for method in ("lttb", "minmax"):
+        result = downsample_line(x, y, 50, method=method)
+        assert np.isfinite(result["value"]).all()
+        assert result["timestamp"][0] >= x[20]
+        assert len(result["value"]) <= 50
\ No newline at end of file
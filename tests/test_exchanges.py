@@ -0,0 +1,120 @@
+import ccxt
+import pytest
+from app.services.exchanges import ExchangeAdapter, MultiExchange, FANOUT_MERGE, merge_ohlcv
+
+HOUR = 3600 * 1000
+NOW = 1_700_000_000_000 // HOUR * HOUR
+
+
+class StubExchange:
+    """
+    Exchange local com histórico fixo e máximo de candles por requisição
+    
+    Args:
+        max_limit: Candles por resposta (como o limite de cada exchange)
+        history: Candles existentes até NOW (par listado há pouco = poucos)
+        price: Preço constante dos candles
+    """
+    
+    def __init__(self, exchange_id: str, max_limit: int, history: int = 5000, price: float = 100.0, volume: float = 1.0):
+        self.id = exchange_id
+        self.max_limit = max_limit
+        self.candles = [
+            [NOW - i * HOUR, price, price, price, price, volume]
+            for i in reversed(range(history))
+        ]
+        self.calls = 0
+    
+    def parse_timeframe(self, timeframe: str) -> int:
+        return 3600
+    
+    def milliseconds(self) -> int:
+        return NOW
+    
+    def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None):
+        self.calls += 1
+        limit = min(limit or self.max_limit, self.max_limit)
+        if since is None:
+            return self.candles[-limit:]
+        return [c for c in self.candles if c[0] >= since][:limit]
+
+
+def _multi(*exchanges) -> MultiExchange:
+    return MultiExchange([ExchangeAdapter(e) for e in exchanges], mode=FANOUT_MERGE, timeout=5)
+
+
+def test_merge_pages_exchanges_with_smaller_limit():
+    big = StubExchange("big", max_limit=1500, price=100.0, volume=3.0)
+    small = StubExchange("small", max_limit=200, price=200.0, volume=1.0)
+    
+    candles = _multi(big, small).fetch_ohlcv("BTC/USDT:USDT", "1h", limit=500)
+    
+    assert len(candles) == 500
+    assert candles[-1][0] == NOW
+    assert [c[0] for c in candles] == [NOW - i * HOUR for i in reversed(range(500))]
+    # Ponderado por volume: (100 * 3 + 200 * 1) / 4
+    assert candles[-1][4] == pytest.approx(125.0)
+    assert candles[-1][5] == pytest.approx(4.0)
+    assert small.calls == 3
+
+
+def test_merge_pages_forward_from_since():
+    big = StubExchange("big", max_limit=1500)
+    small = StubExchange("small", max_limit=100)
+    since = NOW - 999 * HOUR
+    
+    candles = _multi(big, small).fetch_ohlcv("BTC/USDT:USDT", "1h", since=since, limit=300)
+    
+    assert [c[0] for c in candles] == [since + i * HOUR for i in range(300)]
+
+
+def test_merge_drops_short_history():
+    # Par listado há pouco numa das exchanges: não pode encurtar a série
+    full = StubExchange("full", max_limit=1500, price=100.0)
+    listed = StubExchange("listed", max_limit=1500, history=50, price=300.0)
+    
+    candles = _multi(full, listed).fetch_ohlcv("NEW/USDT:USDT", "1h", limit=500)
+    
+    assert len(candles) == 500
+    assert all(c[4] == 100.0 for c in candles)
+
+
+def test_merge_ohlcv_keeps_common_timestamps():
+    a = [[0, 1, 1, 1, 1, 1], [1, 1, 1, 1, 1, 1], [2, 1, 1, 1, 1, 1]]
+    b = [[0, 3, 3, 3, 3, 1], [2, 3, 3, 3, 3, 1]]
+    merged = merge_ohlcv([a, b])
+    assert [c[0] for c in merged] == [0, 2]
+    assert merged[0][1:] == [2.0, 2.0, 2.0, 2.0, 2]
+
+class FailingExchange:
+    """Exchange que sempre levanta o erro informado"""
+    
+    id = "failing"
+    
+    def __init__(self, error: Exception):
+        self.error = error
+    
+    def fetch_ohlcv(self, *args, **kwargs):
+        raise self.error
+
+
+def test_business_errors_do_not_mark_adapter_unhealthy():
+    adapter = ExchangeAdapter(FailingExchange(ccxt.BadSymbol("par inválido")), max_failures=2)
+    
+    for _ in range(5):
+        with pytest.raises(ccxt.BadSymbol):
+            adapter.call("fetch_ohlcv", "XXX/USDT:USDT")
+    
+    assert adapter.failures == 0
+    assert adapter.healthy
+
+
+def test_outages_mark_adapter_unhealthy():
+    adapter = ExchangeAdapter(FailingExchange(ccxt.NetworkError("timeout")), max_failures=2)
+    
+    for _ in range(2):
+        with pytest.raises(ccxt.NetworkError):
+            adapter.call("fetch_ohlcv", "BTC/USDT:USDT")
+    
+    assert adapter.failures == 2
+    assert not adapter.healthy
\ No newline at end of file
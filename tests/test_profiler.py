@@ -0,0 +1,25 @@
+import time
+from app.services.profiler import StackSampler
+
+
+def _busy(seconds: float):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_stopped_session_is_not_updated():
+    # Outra requisição mantém a thread de amostragem rodando
+    sampler = StackSampler(interval=0.001)
+    session = sampler.start()
+    other = sampler.start()
+    _busy(0.05)
+    sampler.stop(session)
+    samples, stacks = session.samples, dict(session.stacks)
+    _busy(0.05)
+    sampler.stop(other)
+    
+    assert samples > 0
+    assert session.samples == samples
+    assert dict(session.stacks) == stacks
+    assert other.samples > samples
\ No newline at end of file
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from app.services.rate_limit import RateLimiter
+
+
+class FailingBuckets:
+    """Backend compartilhado fora do ar"""
+    
+    name = "redis"
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def take(self, key: str, cost: float):
+        self.calls += 1
+        raise ConnectionError("redis fora")
+
+
+def _limiter(**kwargs) -> RateLimiter:
+    return RateLimiter(costs="/health=0,/test=10", default_cost=2, capacity=60, refill_per_second=1, **kwargs)
+
+
+def test_admin_routes_are_not_free():
+    limiter = _limiter()
+    assert limiter.route_cost("GET", "/admin/rate-limit") == ("*", 2)
+    assert limiter.route_cost("GET", "/health") == ("/health", 0)
+
+
+def _scope(forwarded: str) -> dict:
+    return {"headers": [(b"x-forwarded-for", forwarded.encode())], "client": ("10.0.0.2", 5000)}
+
+
+def test_forwarded_for_uses_trusted_hop_not_client_supplied_entry():
+    # Cliente forjou 1.1.1.1; o proxy confiável acrescentou o endereço real
+    scope = _scope("1.1.1.1, 203.0.113.7")
+    assert _limiter(trusted_hops=1).client_key(scope) == "ip:203.0.113.7"
+    # Dois proxies confiáveis (CDN + balanceador)
+    scope = _scope("1.1.1.1, 203.0.113.7, 198.51.100.1")
+    assert _limiter(trusted_hops=2).client_key(scope) == "ip:203.0.113.7"
+
+
+def test_forwarded_for_ignored_without_trusted_hops():
+    assert _limiter().client_key(_scope("1.1.1.1")) == "ip:10.0.0.2"
+    # Cadeia menor que o número de proxies: não passou por eles
+    assert _limiter(trusted_hops=2).client_key(_scope("1.1.1.1")) == "ip:10.0.0.2"
+
+
+def test_redis_outage_opens_circuit_and_uses_memory():
+    limiter = _limiter(redis_retry_seconds=60)
+    shared = FailingBuckets()
+    limiter.shared = shared
+    
+    async def run():
+        return [await limiter.take("ip:1", 1) for _ in range(20)]
+    
+    decisions = asyncio.run(run())
+    
+    assert all(allowed for allowed, _, _ in decisions)
+    assert decisions[-1][1] == pytest.approx(40, abs=0.5)
+    # Depois das falhas seguidas o Redis não é mais chamado
+    assert shared.calls == limiter.breaker.failure_threshold
+    assert limiter.metrics()["redis_circuit"]["state"] == "open"
\ No newline at end of file
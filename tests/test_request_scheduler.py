@@ -0,0 +1,126 @@
+import threading
+import time
+import ccxt
+import pytest
+from app.services.request_scheduler import RequestScheduler, PRIORITY_LIVE, PRIORITY_BACKFILL
+
+
+def _wait_for(condition, timeout: float = 2):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não ocorreu a tempo"
+        time.sleep(0.001)
+
+
+def test_live_request_jumps_ahead_of_waiting_backfill():
+    scheduler = RequestScheduler(capacity=1, refill_per_second=4)
+    scheduler.submit(lambda: None)  # Esvaziar o bucket
+    order = []
+    
+    backfill = threading.Thread(
+        target=scheduler.submit, args=(lambda: order.append("backfill"),), kwargs={"priority": PRIORITY_BACKFILL}
+    )
+    backfill.start()
+    _wait_for(lambda: len(scheduler._waiters) == 1)
+    
+    live = threading.Thread(
+        target=scheduler.submit, args=(lambda: order.append("live"),), kwargs={"priority": PRIORITY_LIVE}
+    )
+    live.start()
+    backfill.join()
+    live.join()
+    
+    assert order == ["live", "backfill"]
+
+
+def test_weight_waits_for_refill():
+    scheduler = RequestScheduler(capacity=10, refill_per_second=100)
+    scheduler.submit(lambda: None, weight=10)
+    
+    started = time.monotonic()
+    scheduler.submit(lambda: None, weight=10)
+    
+    # 10 de peso a 100/s: ~0.1s de espera
+    assert time.monotonic() - started >= 0.08
+    assert scheduler.stats["weight_used"] == 20
+    assert scheduler.stats["requests"] == 2
+
+
+def test_weight_above_capacity_is_capped():
+    scheduler = RequestScheduler(capacity=5, refill_per_second=1000)
+    assert scheduler.submit(lambda: "ok", weight=50) == "ok"
+    assert scheduler.stats["weight_used"] == 5
+
+
+def test_identical_calls_are_coalesced():
+    scheduler = RequestScheduler(capacity=100, refill_per_second=100)
+    release = threading.Event()
+    calls = []
+    
+    def fetch():
+        calls.append(1)
+        release.wait(2)
+        return {"BTC/USDT:USDT": 1}
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(scheduler.submit(fetch, key="tickers")))
+        for _ in range(4)
+    ]
+    threads[0].start()
+    _wait_for(lambda: calls)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for(lambda: scheduler.stats["coalesced"] == 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(result is results[0] for result in results)
+    # Terminada a chamada, a próxima vai de novo à exchange
+    scheduler.submit(fetch, key="tickers")
+    assert len(calls) == 2
+
+
+def test_coalesced_callers_get_the_error():
+    scheduler = RequestScheduler(capacity=100, refill_per_second=100)
+    release = threading.Event()
+    errors = []
+    
+    def fetch():
+        release.wait(2)
+        raise ccxt.NetworkError("timeout")
+    
+    def call():
+        try:
+            scheduler.submit(fetch, key="tickers")
+        except ccxt.NetworkError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    _wait_for(lambda: "tickers" in scheduler._inflight)
+    for thread in threads[1:]:
+        thread.start()
+    _wait_for(lambda: scheduler.stats["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+    
+    assert len(errors) == 3
+
+
+def test_rate_limit_error_pauses_scheduler():
+    scheduler = RequestScheduler(capacity=100, refill_per_second=100, cooldown=60)
+    
+    def fetch():
+        raise ccxt.RateLimitExceeded("429")
+    
+    with pytest.raises(ccxt.RateLimitExceeded):
+        scheduler.submit(fetch)
+    
+    assert scheduler.stats["rate_limited"] == 1
+    assert scheduler._tokens == 0
+    assert scheduler._paused_until > time.monotonic() + 50
\ No newline at end of file
@@ -0,0 +1,146 @@
+import itertools
+from typing import Dict, Optional
+import pytest
+from app.services.scoring_rules import DEFAULT_RULES, RuleEngine
+from app.services.signal_generator import signal_generator
+
+RSI_STATUSES = ["SOBREVENDIDO", "SOBRECOMPRADO", "NEUTRO", "OUTRO"]
+MACD_STATUSES = ["COMPRA", "VENDA", "ALTA", "BAIXA", "NEUTRO"]
+TRENDS = ["ALTA_FORTE", "ALTA", "NEUTRO", "BAIXA", "BAIXA_FORTE"]
+VOLUME_STATUSES = ["ALTO", "NORMAL", "BAIXO"]
+# Preço na banda inferior, no meio e na banda superior
+BOLLINGER_PRICES = [90.0, 100.0, 110.0]
+
+
+def legacy_probability(analysis: Dict) -> float:
+    """calculate_probability antes das regras declarativas"""
+    score = 50
+    
+    rsi_status = analysis['rsi']['status']
+    if rsi_status == "SOBREVENDIDO":
+        score += 15
+    elif rsi_status == "SOBRECOMPRADO":
+        score += 15
+    elif rsi_status == "NEUTRO":
+        score += 7
+    
+    macd_status = analysis['macd']['status']
+    if macd_status == "COMPRA":
+        score += 20
+    elif macd_status == "VENDA":
+        score += 20
+    elif macd_status in ["ALTA", "BAIXA"]:
+        score += 10
+    
+    trend = analysis['trend']['trend']
+    if trend in ["ALTA_FORTE", "BAIXA_FORTE"]:
+        score += 20
+    elif trend in ["ALTA", "BAIXA"]:
+        score += 15
+    else:
+        score += 5
+    
+    volume_status = analysis['volume']['status']
+    if volume_status == "ALTO":
+        score += 10
+    elif volume_status == "NORMAL":
+        score += 5
+    
+    bb = analysis['bollinger']
+    if bb['current_price'] <= bb['lower']:
+        score += 5
+    elif bb['current_price'] >= bb['upper']:
+        score += 5
+    
+    return min(100, max(0, score))
+
+
+def legacy_signal_type(analysis: Dict) -> Optional[str]:
+    """detect_signal_type antes das regras declarativas"""
+    rsi = analysis['rsi']
+    macd = analysis['macd']
+    trend = analysis['trend']['trend']
+    
+    bullish_signals = 0
+    bearish_signals = 0
+    
+    if rsi['status'] == "SOBREVENDIDO":
+        bullish_signals += 2
+    elif rsi['status'] == "SOBRECOMPRADO":
+        bearish_signals += 2
+    
+    if macd['status'] in ["COMPRA", "ALTA"]:
+        bullish_signals += 2
+    elif macd['status'] in ["VENDA", "BAIXA"]:
+        bearish_signals += 2
+    
+    if trend in ["ALTA", "ALTA_FORTE"]:
+        bullish_signals += 3
+    elif trend in ["BAIXA", "BAIXA_FORTE"]:
+        bearish_signals += 3
+    
+    if bullish_signals > bearish_signals and bullish_signals >= 4:
+        return "LONG"
+    elif bearish_signals > bullish_signals and bearish_signals >= 4:
+        return "SHORT"
+    else:
+        return None
+
+
+def _analysis(rsi: str, macd: str, trend: str, volume: str, price: float) -> Dict:
+    return {
+        "rsi": {"value": 50.0, "status": rsi},
+        "macd": {"macd": 0.0, "signal": 0.0, "histogram": 0.0, "status": macd},
+        "trend": {"trend": trend},
+        "volume": {"status": volume},
+        "bollinger": {"current_price": price, "lower": 90.0, "middle": 100.0, "upper": 110.0},
+    }
+
+
+ANALYSES = [
+    _analysis(*combination)
+    for combination in itertools.product(
+        RSI_STATUSES, MACD_STATUSES, TRENDS, VOLUME_STATUSES, BOLLINGER_PRICES
+    )
+]
+
+
+@pytest.mark.parametrize("analysis", ANALYSES)
+def test_single_analysis_matches_legacy(analysis):
+    probability = signal_generator.calculate_probability(analysis)
+    expected = legacy_probability(analysis)
+    assert probability == expected
+    assert type(probability) is type(expected)
+    assert signal_generator.detect_signal_type(analysis) == legacy_signal_type(analysis)
+
+
+def test_batch_matches_legacy():
+    # Mesmo caminho de generate_signals_batch: um evaluate para o lote todo
+    scores = RuleEngine({"default": DEFAULT_RULES}).evaluate(ANALYSES)["default"]
+    for analysis, direction, probability in zip(ANALYSES, scores["direction"], scores["probability"]):
+        expected = legacy_probability(analysis)
+        assert probability.item() == expected
+        assert type(probability.item()) is type(expected)
+        assert direction == legacy_signal_type(analysis)
+
+
+def test_range_condition_requires_every_operator():
+    rules = {
+        "base_score": 0,
+        "probability": [
+            {"name": "rsi", "cases": [
+                {"when": {"field": "rsi.value", "ge": 30, "lt": 70}, "points": 10},
+            ]},
+        ],
+    }
+    analyses = [{"rsi": {"value": value}} for value in (20.0, 30.0, 50.0, 69.9, 70.0, 90.0)]
+    scores = RuleEngine({"range": rules}).evaluate(analyses)["range"]
+    assert scores["probability"].tolist() == [0, 10, 10, 10, 0, 0]
+
+
+def test_unknown_operator_is_rejected():
+    rules = {"probability": [{"name": "rsi", "cases": [
+        {"when": {"field": "rsi.value", "ge": 30, "between": [1, 2]}, "points": 10},
+    ]}]}
+    with pytest.raises(ValueError):
+        RuleEngine({"bad": rules}).evaluate([{"rsi": {"value": 50.0}}])
\ No newline at end of file
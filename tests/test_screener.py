@@ -0,0 +1,56 @@
+import warnings
+from app.services.screener import Screener
+
+
+def _ticker(volume, change=0.0, high=100.0, low=100.0) -> dict:
+    return {"quoteVolume": volume, "percentage": change, "high": high, "low": low}
+
+
+def _screener(**kwargs) -> Screener:
+    options = {"min_quote_volume": 1_000_000, "min_change_pct": 3, "min_range_pct": 5, "max_candidates": 10}
+    options.update(kwargs)
+    return Screener(**options)
+
+
+def test_thresholds_require_liquidity_and_movement():
+    tickers = {
+        "MOVE/USDT:USDT": _ticker(5e6, change=-4),
+        "RANGE/USDT:USDT": _ticker(5e6, change=1, high=106, low=100),
+        "FLAT/USDT:USDT": _ticker(5e6, change=1, high=101, low=100),
+        "THIN/USDT:USDT": _ticker(5e5, change=10),
+        "NODATA/USDT:USDT": _ticker(None, change=10),
+        "MOVE/BTC": _ticker(5e6, change=10),
+    }
+    assert set(_screener().screen(tickers)) == {"MOVE/USDT:USDT", "RANGE/USDT:USDT"}
+
+
+def test_ranking_and_max_candidates():
+    tickers = {f"C{i}/USDT:USDT": _ticker(5e6, change=3 + i) for i in range(8)}
+    result = _screener().screen(tickers, max_candidates=3)
+    assert result == ["C7/USDT:USDT", "C6/USDT:USDT", "C5/USDT:USDT"]
+
+
+def test_quiet_market_falls_back_to_top_volume():
+    tickers = {
+        "A/USDT:USDT": _ticker(2e6),
+        "B/USDT:USDT": _ticker(9e6),
+        "C/USDT:USDT": _ticker(None),
+    }
+    assert _screener(max_candidates=2).screen(tickers) == ["B/USDT:USDT", "A/USDT:USDT"]
+
+
+def test_zero_volume_does_not_break_ranking():
+    # SCREENER_MIN_QUOTE_VOLUME=0 deixa passar par sem volume (log(0) = -inf)
+    tickers = {
+        "ZERO/USDT:USDT": _ticker(0, change=5),
+        "HIGH/USDT:USDT": _ticker(1e9, change=5),
+        "LOW/USDT:USDT": _ticker(1e3, change=5),
+    }
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = _screener(min_quote_volume=0).screen(tickers)
+    assert result == ["HIGH/USDT:USDT", "LOW/USDT:USDT", "ZERO/USDT:USDT"]
+
+
+def test_no_usdt_pairs():
+    assert _screener().screen({"ETH/BTC": _ticker(5e6, change=10)}) == []
\ No newline at end of file
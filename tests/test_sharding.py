@@ -0,0 +1,70 @@
+from datetime import datetime
+from app.database import SessionLocal
+from app.services import sharding
+from app.services.sharding import HashRing, job_key
+
+JOBS = [(f"C{i:03d}/USDT:USDT", tf) for tf in ("1h", "4h") for i in range(500)]
+NODES = ["node-a", "node-b", "node-c"]
+
+
+def _owners(ring: HashRing) -> dict:
+    return {job: ring.owner(job_key(job)) for job in JOBS}
+
+
+def test_every_job_has_exactly_one_owner():
+    assignment = HashRing(NODES).assign(JOBS)
+    assigned = [job for owned in assignment.values() for job in owned]
+    assert sorted(assigned) == sorted(JOBS)
+    # 64 pontos por instância: divisão perto de 1/3 para cada
+    for owned in assignment.values():
+        assert 0.2 < len(owned) / len(JOBS) < 0.47
+
+
+def test_ring_is_the_same_on_every_instance():
+    assert _owners(HashRing(NODES)) == _owners(HashRing(reversed(NODES + ["node-a"])))
+    ring = HashRing(NODES)
+    assert ring.jobs_for("node-b", JOBS) == ring.assign(JOBS)["node-b"]
+
+
+def test_join_moves_jobs_only_to_the_new_node():
+    before = _owners(HashRing(NODES))
+    after = _owners(HashRing(NODES + ["node-d"]))
+    moved = [job for job in JOBS if before[job] != after[job]]
+    
+    assert all(after[job] == "node-d" for job in moved)
+    # ~1/4 dos pares vai para a instância nova
+    assert 0.1 < len(moved) / len(JOBS) < 0.4
+
+
+def test_leave_moves_only_the_departed_node_jobs():
+    before = _owners(HashRing(NODES))
+    after = _owners(HashRing(["node-a", "node-c"]))
+    
+    for job in JOBS:
+        if before[job] != "node-b":
+            assert after[job] == before[job]
+        else:
+            assert after[job] in ("node-a", "node-c")
+
+
+def test_empty_ring_owns_nothing():
+    ring = HashRing([])
+    assert ring.owner("BTC/USDT:USDT|1h") is None
+    assert ring.assign(JOBS) == {}
+
+
+def test_build_ring_uses_alive_nodes():
+    prefix = f"test-{datetime.now().timestamp():.0f}"
+    alive, gone = f"{prefix}-alive", f"{prefix}-gone"
+    db = SessionLocal()
+    try:
+        sharding.heartbeat(db, alive, jobs=0)
+        sharding.heartbeat(db, gone, jobs=0)
+        sharding.leave(db, gone)
+        
+        nodes = sharding.build_ring(db).nodes
+        assert alive in nodes
+        assert gone not in nodes
+    finally:
+        sharding.leave(db, alive)
+        db.close()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.database import SessionLocal, engine
+from app.models.signal import Signal
+from app.services import signal_export
+from app.services.signal_export import COLUMN_NAMES, ExportError, check_format, stream_export
+
+ROWS = 5
+
+
+@pytest.fixture(scope="module")
+def moeda():
+    # Moeda própria do módulo: o banco de teste é compartilhado
+    moeda = f"EXPORT{datetime.now().timestamp():.0f}/USDT:USDT"
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db = SessionLocal()
+    try:
+        for i in range(ROWS):
+            db.add(Signal(
+                moeda=moeda, tipo="LONG" if i % 2 else "SHORT", timeframe="1h",
+                preco_entrada=100.0 + i, stop_loss=95.0, take_profit_1=105.0,
+                take_profit_2=110.0, take_profit_3=115.0, alavancagem=5,
+                probabilidade=70.0 + i, status="ATIVO",
+                indicadores={"rsi": {"value": 30 + i}}, analise=None,
+                criado_em=start + timedelta(hours=i)
+            ))
+        db.commit()
+    finally:
+        db.close()
+    return moeda
+
+
+def test_csv_streams_one_block_per_chunk(moeda):
+    blocks = list(stream_export(engine, "csv", {"moeda": moeda}, chunk_size=2))
+    
+    # Cabeçalho + ceil(5 / 2) lotes
+    assert len(blocks) == 4
+    rows = list(csv.DictReader(io.StringIO(b"".join(blocks).decode("utf-8"))))
+    assert list(rows[0]) == COLUMN_NAMES
+    assert [float(r["preco_entrada"]) for r in rows] == [100.0 + i for i in range(ROWS)]
+    assert json.loads(rows[2]["indicadores"]) == {"rsi": {"value": 32}}
+    assert rows[0]["analise"] == ""
+    assert rows[0]["criado_em"].startswith("2024-01-01T00:00:00")
+
+
+def test_csv_filters(moeda):
+    body = b"".join(stream_export(engine, "csv", {"moeda": moeda, "tipo": "long"}))
+    rows = list(csv.DictReader(io.StringIO(body.decode("utf-8"))))
+    assert [r["tipo"] for r in rows] == ["LONG", "LONG"]
+    
+    body = b"".join(stream_export(engine, "csv", {
+        "moeda": moeda,
+        "desde": datetime(2024, 1, 1, 1),
+        "ate": datetime(2024, 1, 1, 3)
+    }))
+    assert len(list(csv.DictReader(io.StringIO(body.decode("utf-8"))))) == 2
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ExportError):
+        check_format("xlsx")
+
+
+def test_parquet_without_pyarrow_is_rejected(monkeypatch):
+    monkeypatch.setattr(signal_export, "parquet_available", lambda: False)
+    with pytest.raises(ExportError):
+        stream_export(engine, "parquet", {})
+
+
+def test_parquet_row_group_per_chunk(moeda):
+    pq = pytest.importorskip("pyarrow.parquet")
+    
+    blocks = list(stream_export(engine, "parquet", {"moeda": moeda}, chunk_size=2))
+    
+    parquet = pq.ParquetFile(io.BytesIO(b"".join(blocks)))
+    assert parquet.metadata.num_row_groups == 3
+    table = parquet.read()
+    assert table.column_names == COLUMN_NAMES
+    assert table.column("probabilidade").to_pylist() == [70.0 + i for i in range(ROWS)]
+    assert json.loads(table.column("indicadores")[0].as_py()) == {"rsi": {"value": 30}}
+    assert table.column("analise").to_pylist() == [None] * ROWS
\ No newline at end of file
@@ -0,0 +1,97 @@
+import threading
+from datetime import datetime, timedelta
+from app.database import SessionLocal
+from app.models.signal import Signal
+from app.services import signal_store
+
+
+def _signal(moeda: str) -> dict:
+    return {
+        "moeda": moeda, "tipo": "LONG", "timeframe": "1h",
+        "preco_entrada": 100.0, "stop_loss": 95.0,
+        "take_profit_1": 105.0, "take_profit_2": 110.0, "take_profit_3": 115.0,
+        "alavancagem": 5, "probabilidade": 75, "status": "ATIVO",
+        "indicadores": {}, "analise": {},
+        "expira_em": (datetime.now() + timedelta(hours=24)).isoformat()
+    }
+
+
+def test_concurrent_saves_keep_one_active_signal():
+    # API e instâncias do gerador gravando o mesmo par ao mesmo tempo
+    moeda = f"RACE{datetime.now().timestamp():.0f}/USDT:USDT"
+    workers = 8
+    barrier = threading.Barrier(workers)
+    ids = []
+    errors = []
+    
+    def save():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            ids.append(signal_store.save_signals(db, [_signal(moeda)])[0]["id"])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+    
+    threads = [threading.Thread(target=save) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    db = SessionLocal()
+    count = db.query(Signal).filter(Signal.moeda == moeda).count()
+    db.close()
+    assert not errors
+    assert count == 1
+    assert len(set(ids)) == 1
+
+def _moeda(prefix: str) -> str:
+    return f"{prefix}{datetime.now().timestamp():.6f}/USDT:USDT"
+
+
+def test_reused_signal_gets_current_values():
+    moeda = _moeda("UPD")
+    db = SessionLocal()
+    first = signal_store.save_signals(db, [_signal(moeda)])[0]
+    
+    update = _signal(moeda)
+    update.update(preco_entrada=120.0, probabilidade=88, indicadores={
+        "rsi": {"value": 25.0, "status": "SOBREVENDIDO"},
+        "macd": {"histogram": 0.5, "status": "COMPRA"},
+        "tendencia": "ALTA",
+        "volume": {"status": "ALTO"},
+    })
+    second = signal_store.save_signals(db, [update])[0]
+    detail = signal_store.get_signal(db, first["id"])
+    db.close()
+    
+    assert second["id"] == first["id"]
+    assert second["preco_entrada"] == 120.0
+    assert second["probabilidade"] == 88
+    assert detail["probabilidade"] == 88
+    
+    db = SessionLocal()
+    row = db.query(Signal).filter(Signal.id == first["id"]).one()
+    db.close()
+    assert (row.rsi_valor, row.macd_histograma, row.tendencia, row.volume_status) == (25.0, 0.5, "ALTA", "ALTO")
+
+
+def test_direction_flip_expires_opposite_signal():
+    moeda = _moeda("FLIP")
+    db = SessionLocal()
+    long = signal_store.save_signals(db, [_signal(moeda)])[0]
+    
+    short = _signal(moeda)
+    short["tipo"] = "SHORT"
+    saved = signal_store.save_signals(db, [short])[0]
+    active = signal_store.list_active(db, moeda=moeda)
+    db.close()
+    
+    assert saved["id"] != long["id"]
+    assert [(s["id"], s["tipo"]) for s in active] == [(saved["id"], "SHORT")]
+    
+    db = SessionLocal()
+    assert db.query(Signal).filter(Signal.id == long["id"]).one().status == "EXPIRADO"
+    db.close()
\ No newline at end of file
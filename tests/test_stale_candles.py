@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from app.services.signal_generator import signal_generator
+from app.services.technical_analysis import technical_analysis
+
+
+def _candles(stale: bool, rows: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    df = pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=rows, freq="h"),
+        "open": close,
+        "high": close + 1,
+        "low": close - 1,
+        "close": close,
+        "volume": rng.uniform(100, 200, rows),
+    })
+    df.attrs["stale"] = stale
+    return df
+
+
+def test_full_analysis_reports_stale_candles():
+    assert technical_analysis.get_full_analysis(_candles(stale=True))["stale"] is True
+    assert technical_analysis.get_full_analysis(_candles(stale=False))["stale"] is False
+
+
+def test_batch_skips_stale_candles(monkeypatch):
+    frames = {"FRESH/USDT": _candles(stale=False), "OLD/USDT": _candles(stale=True)}
+    analyzed = []
+    
+    def analyze_scored(received, timeframe):
+        analyzed.extend(received)
+        return []
+    
+    monkeypatch.setattr(signal_generator, "fetch_candles", lambda symbol, timeframe: frames[symbol])
+    monkeypatch.setattr(signal_generator, "analyze_scored", analyze_scored)
+    signal_generator.generate_signals_batch(list(frames), "1h")
+    
+    assert analyzed == ["FRESH/USDT"]
+
+
+def test_single_signal_skips_stale_candles(monkeypatch):
+    monkeypatch.setattr(signal_generator, "fetch_candles", lambda symbol, timeframe: _candles(stale=True))
+    assert signal_generator.generate_signal("OLD/USDT", "1h") is None
\ No newline at end of file
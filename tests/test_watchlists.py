@@ -0,0 +1,50 @@
+from app.services.watchlists import WatchlistIndex, entry_matches, filter_signals
+
+
+def _entry(entry_id: int, user_id: int, moeda=None, timeframe=None, tipo=None, probabilidade_min=0) -> dict:
+    return {
+        "id": entry_id, "user_id": user_id, "moeda": moeda, "timeframe": timeframe,
+        "tipo": tipo, "probabilidade_min": probabilidade_min, "created_at": None,
+    }
+
+
+# Símbolos como o gerador grava (futuros perpétuos do ccxt)
+SIGNALS = [
+    {"moeda": "BTC/USDT:USDT", "timeframe": "1h", "tipo": "LONG", "probabilidade": 80},
+    {"moeda": "ETH/USDT:USDT", "timeframe": "4h", "tipo": "SHORT", "probabilidade": 70},
+]
+
+ENTRIES = [
+    _entry(1, 10, moeda="BTC/USDT"),
+    _entry(2, 11, moeda="BTC/USDT:USDT", tipo="long"),
+    _entry(3, 12, moeda="btc/usdt", probabilidade_min=85),
+    _entry(4, 13, timeframe="4h"),
+    _entry(5, 14, moeda="ETH/USDT", tipo="LONG"),
+]
+
+
+def test_index_matches_signal_symbols_with_settle_suffix():
+    index = WatchlistIndex()
+    index.rebuild(ENTRIES)
+    assert index.match(SIGNALS[0]) == {10, 11}
+    assert index.match(SIGNALS[1]) == {13}
+
+
+def test_index_add_matches_like_rebuild():
+    index = WatchlistIndex()
+    for entry in ENTRIES:
+        index.add(entry)
+    assert index.match(SIGNALS[0]) == {10, 11}
+    assert index.match(SIGNALS[1]) == {13}
+
+
+def test_entry_matches_agrees_with_index():
+    index = WatchlistIndex()
+    index.rebuild(ENTRIES)
+    for signal in SIGNALS:
+        expected = {entry["user_id"] for entry in ENTRIES if entry_matches(entry, signal)}
+        assert index.match(signal) == expected
+
+
+def test_filter_signals_ignores_settle_suffix():
+    assert filter_signals([_entry(1, 10, moeda="ETH/USDT")], SIGNALS) == [SIGNALS[1]]
\ No newline at end of file
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+import pytest
+from aiohttp import web
+from app.config import settings
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.webhook import WebhookEndpoint, WebhookDelivery
+from app.services import webhooks
+
+
+class SlowSink:
+    """Receptor HTTP local que conta quantas vezes cada sinal chegou"""
+    
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.received = Counter()
+        self.port = None
+        self._ready = threading.Event()
+    
+    async def _handle(self, request):
+        body = json.loads(await request.read())
+        await asyncio.sleep(self.latency)
+        for signal in body["signals"]:
+            self.received[signal["id"]] += 1
+        return web.Response(text="ok")
+    
+    def _serve(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_post("/hook", self._handle)
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        loop.run_until_complete(site.start())
+        self.port = runner.addresses[0][1]
+        self._ready.set()
+        loop.run_forever()
+    
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+
+
+@pytest.fixture
+def clean_queue():
+    db = SessionLocal()
+    db.query(WebhookDelivery).delete()
+    db.query(WebhookEndpoint).delete()
+    db.commit()
+    db.close()
+    webhooks.invalidate_endpoints()
+    yield
+    webhooks.invalidate_endpoints()
+
+
+def _signal(i: int) -> dict:
+    return {"id": i, "moeda": "BTC/USDT:USDT", "tipo": "LONG", "timeframe": "1h", "probabilidade": 75}
+
+
+def test_slow_sink_receives_each_signal_once(clean_queue, monkeypatch):
+    # Lease curto e receptor lento: sem o limite por endpoint, lotes
+    # esperando o semáforo tinham o lease vencido e eram enviados de novo
+    monkeypatch.setattr(webhooks, "LEASE_SECONDS", 1)
+    monkeypatch.setattr(settings, "WEBHOOK_ALLOW_PRIVATE_URLS", True)
+    sink = SlowSink(latency=0.4)
+    sink.start()
+    
+    db = SessionLocal()
+    user = User(email=f"webhook-test-{time.time()}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(WebhookEndpoint(user_id=user.id, url=f"http://127.0.0.1:{sink.port}/hook", max_concorrencia=2))
+    db.commit()
+    webhooks.invalidate_endpoints()
+    webhooks.enqueue_signals(db, [_signal(i) for i in range(200)])
+    db.commit()
+    db.close()
+    
+    dispatcher = webhooks.WebhookDispatcher(batch_size=20, claim_limit=1000)
+    dispatcher.start()
+    try:
+        deadline = time.time() + 30
+        while sum(sink.received.values()) < 200 and time.time() < deadline:
+            time.sleep(0.05)
+        # Tempo para um reenvio indevido aparecer (mais que o lease)
+        time.sleep(1.5)
+    finally:
+        dispatcher.stop()
+    
+    assert len(sink.received) == 200
+    assert set(sink.received.values()) == {1}
+    
+    db = SessionLocal()
+    rows = db.query(WebhookDelivery.status, WebhookDelivery.tentativas).all()
+    db.close()
+    assert len(rows) == 200
+    assert {(status, attempts) for status, attempts in rows} == {(webhooks.STATUS_DELIVERED, 1)}
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://localhost:8080/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.1.1/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://2130706433/hook",
+    "ftp://8.8.8.8/hook",
+    "http:///hook",
+])
+def test_check_public_url_rejects_internal_addresses(url):
+    with pytest.raises(webhooks.UnsafeURLError):
+        webhooks.check_public_url(url)
+
+
+def test_check_public_url_accepts_public_address():
+    webhooks.check_public_url("https://8.8.8.8/hook")
+
+
+def test_dispatcher_refuses_private_endpoint(clean_queue):
+    # Cadastrado antes (ou DNS trocado depois): o envio também recusa
+    sink = SlowSink(latency=0)
+    sink.start()
+    
+    db = SessionLocal()
+    user = User(email=f"webhook-test-{time.time()}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(WebhookEndpoint(user_id=user.id, url=f"http://127.0.0.1:{sink.port}/hook"))
+    db.add(WebhookEndpoint(user_id=user.id, url=f"http://localhost:{sink.port}/hook"))
+    db.commit()
+    webhooks.invalidate_endpoints()
+    webhooks.enqueue_signals(db, [_signal(1)])
+    db.commit()
+    db.close()
+    
+    dispatcher = webhooks.WebhookDispatcher()
+    dispatcher.start()
+    try:
+        deadline = time.time() + 10
+        while time.time() < deadline:
+            db = SessionLocal()
+            errors = [row.ultimo_erro for row in db.query(WebhookDelivery).all() if row.ultimo_erro]
+            db.close()
+            if len(errors) == 2:
+                break
+            time.sleep(0.05)
+    finally:
+        dispatcher.stop()
+    
+    assert not sink.received
+    assert len(errors) == 2
+    assert all("não público" in error for error in errors)
\ No newline at end of file